@@ -0,0 +1,116 @@
+""" app_log.py
+
+Leveled logging for the application, off by default.
+
+Messages use the lazy %-formatting of the logging module, so a disabled
+message costs one level check and its arguments are never formatted. An
+optional JSON-lines sink records the name, duration and sizes of load, save
+and generate operations.
+
+Both are enabled with environment variables read by configure_logging():
+
+    ROTATION_LOG_LEVEL=DEBUG     (DEBUG, INFO, WARNING or ERROR, printed to stderr)
+    ROTATION_LOG_JSON=ops.jsonl  (file the operation records are appended to)
+"""
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+OFF = logging.CRITICAL + 10
+
+logger = logging.getLogger('rotation_config')
+logger.addHandler(logging.NullHandler())
+logger.setLevel(OFF)
+logger.propagate = False
+
+_operation_sink = None  # Open file of the JSON-lines sink, or None
+
+
+def configure_logging(level=None, json_log_path=None):
+    """
+    Enables console logging and the operation sink.
+
+    Arguments that are None are read from the ROTATION_LOG_LEVEL and
+    ROTATION_LOG_JSON environment variables. Without either, logging stays off.
+
+    Parameters
+    ----------
+    level : str or int, optional
+        The lowest level printed to stderr, e.g. 'DEBUG' or logging.INFO.
+    json_log_path : str, optional
+        The file operation records are appended to, one JSON object per line.
+    """
+    global _operation_sink
+    if level is None:
+        level = os.environ.get('ROTATION_LOG_LEVEL')
+    if json_log_path is None:
+        json_log_path = os.environ.get('ROTATION_LOG_JSON')
+
+    if level:
+        name = level
+        if isinstance(level, str):
+            level = logging.getLevelName(level.upper())
+        if not isinstance(level, int):
+            print(f"Warning: unknown log level {name!r}, logging stays off", file=sys.stderr)
+        else:
+            handler = logging.StreamHandler(sys.stderr)
+            handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+            logger.addHandler(handler)
+            logger.setLevel(level)
+
+    if json_log_path:
+        if _operation_sink is not None:
+            _operation_sink.close()
+        try:
+            _operation_sink = open(json_log_path, 'a', buffering=1)
+        except OSError as e:
+            print(f"Warning: cannot open operation log {json_log_path}: {e}", file=sys.stderr)
+            _operation_sink = None
+
+
+def operations_enabled():
+    """
+    Returns True if operations are recorded, so callers can skip computing
+    sizes that would not be logged.
+    """
+    return _operation_sink is not None or logger.isEnabledFor(logging.INFO)
+
+
+@contextmanager
+def log_operation(operation, **sizes):
+    """
+    Context manager timing an operation for the operation log.
+
+    Yields a dict of sizes the body can add to, e.g. sizes['bytes'] = n. When
+    the body ends, the duration is logged at INFO level and a record is
+    written to the JSON-lines sink. Does nothing while both are off.
+
+    Parameters
+    ----------
+    operation : str
+        The operation name, e.g. 'load', 'save' or 'generate'.
+    **sizes
+        Sizes known before the operation starts.
+    """
+    if not operations_enabled():
+        yield sizes
+        return
+    start = time.perf_counter()
+    error = None
+    try:
+        yield sizes
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        duration_ms = (time.perf_counter() - start) * 1000
+        logger.info("%s took %.1f ms %s", operation, duration_ms, sizes)
+        if _operation_sink is not None:
+            record = {'time': time.time(), 'operation': operation, 'duration_ms': round(duration_ms, 3)}
+            record.update(sizes)
+            if error is not None:
+                record['error'] = error
+            _operation_sink.write(json.dumps(record) + '\n')
@@ -1,23 +1,33 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk
+from rotation_model import Command, render_command
+from command_templates import command_templates
 
 class CommandFrame(ttk.Frame):
-    def __init__(self, parent, command_types, remove_callback, spells_tab, variable_names):
+    def __init__(self, parent, command_types, remove_callback, spells_tab, variable_names, command=None, render_scheduler=None):
         """
         Constructor for CommandFrame.
 
         Parameters:
             parent (ttk.Frame): The parent widget.
             command_types (dict): A dictionary of command types.
-            remove_callback (callable): A callback to remove the command frame.
+            remove_callback (callable): A callback to remove the command frame. Can be set later with bind_command.
             spells_tab (SpellsTab): The SpellsTab instance.
-            variable_names (list): A list of variable names.
+            variable_names (VariableNames): The shared list of variable names.
+            command (Command): The model object this frame edits. A new one is created if not given.
+            render_scheduler (RenderScheduler): Coalesces preview renders. Previews render immediately if not given.
         """
         super().__init__(parent)
         self.command_types = command_types
         self.remove_callback = remove_callback
         self.spells_tab = spells_tab
-        self.variable_names = variable_names  # List of variable names
+        self.variable_names = variable_names  # Shared VariableNames, read when a dropdown opens
+        self.command = command if command is not None else Command()
+        self.render_scheduler = render_scheduler
+        self.parameter_entries = []  # Rows of parameter_rows used by the current command type
+        self.parameter_rows = []  # Pool of parameter rows, reused between command types
+        self.parameters_changed_callback = None  # Called after the user changes the command type
+        self.command_changed_callback = None  # Called with the command after every edit of the model
         self.create_widgets()
 
     def create_widgets(self):
@@ -26,11 +36,12 @@ class CommandFrame(ttk.Frame):
         Creates the widgets for the command frame.
 
         Configures the grid layout, adds a delete button, a command type combobox, a parameters frame, and an info label.
+        If the command model already has a command type, its parameter widgets are created from it.
         """
         self.grid_columnconfigure(3, weight=1)
 
         # Delete button
-        self.delete_button = ttk.Button(self, text="X", width=2, command=self.remove_callback)
+        self.delete_button = ttk.Button(self, text="X", width=2, command=lambda: self.remove_callback())
         self.delete_button.grid(row=0, column=0, padx=(0, 5), sticky='w')
 
         # Command type combobox
@@ -51,89 +62,216 @@ class CommandFrame(ttk.Frame):
         self.info_label = ttk.Label(self, text="", anchor='w')
         self.info_label.grid(row=0, column=3, padx=5, sticky='ew')
 
+        # Show an already populated command model
+        if self.command.command_type:
+            self.command_type.set(self.command.command_type)
+            self.update_parameters()
+
+    def bind_command(self, command, remove_callback):
+        """
+        Rebinds the frame to another command model, so pooled frames can be reused for other rows.
+
+        :param command: The Command model to edit
+        :param remove_callback: A callback to remove the command
+        :return: None
+        """
+        self.command = command
+        self.remove_callback = remove_callback
+        self.command_type.set(command.command_type)
+        self.update_parameters()
+
     def update_parameters(self, event=None):
-        # Clear existing parameter widgets
         """
         Updates the parameter widgets when the command type is changed.
 
-        Clears any existing parameter widgets, gets the new command type, and creates parameter labels and input widgets.
+        Gets the new command type and shows one parameter row per parameter. Rows are kept in the
+        `parameter_rows` pool and reused between command type changes; rows that are not needed
+        are hidden rather than destroyed.
 
-        For each parameter, creates a label, a toggle button to switch between 'Value' and 'Var', an entry widget for literal values, and a combobox for variable or spell selection.
+        Each row has a label, a toggle button to switch between 'Value' and 'Var', and the editor
+        matching the parameter's toggle state: an entry widget for literal values or a combobox
+        for variable or spell selection. The other editor is only created when first toggled.
 
-        Stores the parameter widgets and toggle states in the `parameter_entries` list.
+        Stores the rows in use in the `parameter_entries` list.
 
         Finally, calls `update_preview` to update the preview text.
         """
-        for widget in self.parameters_frame.winfo_children():
-            widget.destroy()
-
         command_type = self.command_type.get()
+        if event is not None or command_type != self.command.command_type:
+            # The user picked a new command type, start with empty parameters
+            self.command.set_command_type(command_type, self.command_types)
+        params = self.command_types[command_type].get('params', []) if command_type else []
+
+        # Hide pooled rows that the new command type does not need
+        for widgets in self.parameter_rows[len(params):]:
+            if widgets['visible']:
+                widgets['label'].grid_remove()
+                widgets['frame'].grid_remove()
+                widgets['visible'] = False
+
+        for idx, param in enumerate(params):
+            if idx == len(self.parameter_rows):
+                self.parameter_rows.append(self.create_parameter_row(idx))
+            widgets = self.parameter_rows[idx]
+            parameter = self.command.parameters[idx]
+
+            widgets['param_name'] = param.lower()
+            widgets['label'].config(text=param)
+            widgets['toggle_var'].set(parameter.type)
+            if not widgets['visible']:
+                widgets['label'].grid()
+                widgets['frame'].grid()
+                widgets['visible'] = True
+
+            # Show the editor matching the parameter's toggle state
+            if parameter.type == 'Var':
+                self.show_combobox(widgets)
+                widgets['combobox'].set(parameter.value)
+                if widgets['entry'] is not None:
+                    widgets['entry'].delete(0, tk.END)
+            else:
+                self.show_entry(widgets)
+                widgets['entry'].delete(0, tk.END)
+                widgets['entry'].insert(0, parameter.value)
+                if widgets['combobox'] is not None:
+                    widgets['combobox'].set('')
+
+        self.parameter_entries = self.parameter_rows[:len(params)]
         if not command_type:
             self.info_label.config(text="")
-            return
+        else:
+            self.update_preview()
+        if event is not None:
+            self.notify_command_changed()
+            if self.parameters_changed_callback is not None:
+                self.parameters_changed_callback()
 
-        command = self.command_types[command_type]
-        self.parameter_entries = []
-
-        for idx, param in enumerate(command.get('params', [])):
-            # Parameter label
-            label = ttk.Label(self.parameters_frame, text=param, width=20)
-            label.grid(row=idx, column=0, padx=2, pady=2, sticky='w')
-
-            # Frame to hold toggle and input widgets
-            param_frame = ttk.Frame(self.parameters_frame)
-            param_frame.grid(row=idx, column=1, padx=2, pady=2, sticky='w')
-
-            # Toggle variable between 'Value' and 'Var'
-            toggle_var = tk.StringVar(value='Value')
-
-            # Toggle button
-            toggle_button = ttk.Checkbutton(
-                param_frame,
-                text='Var',
-                variable=toggle_var,
-                onvalue='Var',
-                offvalue='Value',
-                command=lambda sv=toggle_var, idx=idx: self.toggle_variable(sv, idx)
+    def create_parameter_row(self, idx):
+        """
+        Creates the label, frame and toggle button of a pooled parameter row.
+
+        The entry and combobox are created lazily by show_entry and show_combobox.
+
+        :param idx: Index of the row in self.parameter_rows
+        :return: Dictionary of the row's widgets and state
+        """
+        # Parameter label
+        label = ttk.Label(self.parameters_frame, text="", width=20)
+        label.grid(row=idx, column=0, padx=2, pady=2, sticky='w')
+
+        # Frame to hold toggle and input widgets
+        param_frame = ttk.Frame(self.parameters_frame)
+        param_frame.grid(row=idx, column=1, padx=2, pady=2, sticky='w')
+
+        # Toggle variable between 'Value' and 'Var'
+        toggle_var = tk.StringVar(value='Value')
+
+        # Toggle button
+        toggle_button = ttk.Checkbutton(
+            param_frame,
+            text='Var',
+            variable=toggle_var,
+            onvalue='Var',
+            offvalue='Value',
+            command=lambda sv=toggle_var, idx=idx: self.toggle_variable(sv, idx)
+        )
+        toggle_button.pack(side='left')
+
+        return {
+            'idx': idx,
+            'param_name': '',
+            'label': label,
+            'frame': param_frame,
+            'toggle_var': toggle_var,
+            'entry': None,
+            'combobox': None,
+            'shown': None,  # The editor currently packed, 'entry' or 'combobox'
+            'values_version': None,  # Version of variable_names last copied into the combobox
+            'visible': True
+        }
+
+    def show_entry(self, widgets):
+        """
+        Shows the entry widget of a parameter row, creating it on first use, and hides the combobox.
+
+        :param widgets: Dictionary of the row's widgets, see create_parameter_row
+        :return: None
+        """
+        if widgets['entry'] is None:
+            idx = widgets['idx']
+            entry = ttk.Entry(widgets['frame'], width=25)
+            entry.bind("<KeyRelease>", lambda event, idx=idx: self.on_entry_change(idx))
+            entry.bind("<FocusOut>", lambda event, idx=idx: self.on_entry_change(idx))
+            widgets['entry'] = entry
+        if widgets['shown'] != 'entry':
+            if widgets['combobox'] is not None:
+                widgets['combobox'].pack_forget()
+            widgets['entry'].pack(side='left')
+            widgets['shown'] = 'entry'
+
+    def show_combobox(self, widgets):
+        """
+        Shows the combobox of a parameter row, creating it on first use, and hides the entry widget.
+
+        The values of the combobox are filled in by refresh_combobox_values when its dropdown opens.
+
+        :param widgets: Dictionary of the row's widgets, see create_parameter_row
+        :return: None
+        """
+        if widgets['combobox'] is None:
+            idx = widgets['idx']
+            combobox = ttk.Combobox(
+                widgets['frame'], width=25, state='readonly',
+                postcommand=lambda widgets=widgets: self.refresh_combobox_values(widgets)
             )
-            toggle_button.pack(side='left')
-
-            # Entry widget for literal value
-            entry = ttk.Entry(param_frame, width=25)
-            entry.pack(side='left')
-            entry.bind("<KeyRelease>", self.update_preview)
-
-            # Combobox for variable or spell selection
-            if param.lower() == 'slot number':
-                # For 'Slot Number', display spells when 'Var' is selected
-                combobox = ttk.Combobox(
-                    param_frame,
-                    values=[spell[0] for spell in self.spells_tab.get_selected_spells()],
-                    width=25,
-                    state='readonly'
-                )
-            else:
-                # For other parameters, display variables
-                combobox = ttk.Combobox(
-                    param_frame,
-                    values=self.variable_names,
-                    width=25,
-                    state='readonly'
-                )
-            combobox.pack(side='left')
-            combobox.bind("<<ComboboxSelected>>", self.update_preview)
-
-            # Initially hide combobox
-            combobox.pack_forget()
-
-            # Store widgets and toggle state
-            self.parameter_entries.append({
-                'param_name': param.lower(),
-                'toggle_var': toggle_var,
-                'entry': entry,
-                'combobox': combobox
-            })
+            combobox.bind("<<ComboboxSelected>>", lambda event, idx=idx: self.on_combobox_change(idx))
+            widgets['combobox'] = combobox
+        if widgets['shown'] != 'combobox':
+            if widgets['entry'] is not None:
+                widgets['entry'].pack_forget()
+            widgets['combobox'].pack(side='left')
+            widgets['shown'] = 'combobox'
+
+    def refresh_combobox_values(self, widgets):
+        """
+        Fills the dropdown of a parameter combobox right before it opens.
+
+        'Slot Number' parameters list the selected spells, other parameters list the variables. The variable
+        list is only copied into the combobox when the shared list changed since the last time it was opened.
+
+        :param widgets: Dictionary of the row's widgets, see create_parameter_row
+        :return: None
+        """
+        if widgets['param_name'] == 'slot number':
+            widgets['combobox']['values'] = [spell[0] for spell in self.spells_tab.get_selected_spells()]
+            widgets['values_version'] = None
+        elif widgets['values_version'] != self.variable_names.version:
+            widgets['combobox']['values'] = self.variable_names.values()
+            widgets['values_version'] = self.variable_names.version
+
+    def on_entry_change(self, idx):
+        """
+        Copies the text of a parameter entry into the command model and updates the preview.
+
+        :param idx: Index of parameter entry in self.parameter_entries
+        :return: None
+        """
+        parameter = self.command.parameters[idx]
+        value = self.parameter_entries[idx]['entry'].get()
+        if parameter.value != value:
+            parameter.value = value
+            self.notify_command_changed()
+        self.update_preview()
 
+    def on_combobox_change(self, idx):
+        """
+        Copies the selection of a parameter combobox into the command model and updates the preview.
+
+        :param idx: Index of parameter entry in self.parameter_entries
+        :return: None
+        """
+        self.command.parameters[idx].value = self.parameter_entries[idx]['combobox'].get()
+        self.notify_command_changed()
         self.update_preview()
 
     def toggle_variable(self, toggle_var, idx):
@@ -142,195 +280,88 @@ class CommandFrame(ttk.Frame):
 
         If toggle_var is set to 'Var', shows the combobox for selecting a variable or spell.
         If toggle_var is set to 'Value', shows the entry widget for entering a literal value.
+        The command model takes the toggle state and the value of the widget being shown.
 
         :param toggle_var: StringVar with values 'Var' or 'Value'
         :param idx: Index of parameter entry in self.parameter_entries
         :return: None
         """
         widgets = self.parameter_entries[idx]
-        param_name = widgets['param_name']
-        if toggle_var.get() == 'Var':
-            widgets['entry'].pack_forget()
-            if param_name == 'slot number':
-                # Update combobox with latest spells
-                widgets['combobox']['values'] = [spell[0] for spell in self.spells_tab.get_selected_spells()]
-            else:
-                widgets['combobox']['values'] = self.variable_names
-            widgets['combobox'].pack(side='left')
+        parameter = self.command.parameters[idx]
+        parameter.type = toggle_var.get()
+        if parameter.type == 'Var':
+            self.show_combobox(widgets)
+            parameter.value = widgets['combobox'].get()
         else:
-            widgets['combobox'].pack_forget()
-            widgets['entry'].pack(side='left')
+            self.show_entry(widgets)
+            parameter.value = widgets['entry'].get()
+        self.notify_command_changed()
         self.update_preview()
 
+    def notify_command_changed(self):
+        """
+        Calls command_changed_callback with the command after the user edited it.
+
+        :return: None
+        """
+        if self.command_changed_callback is not None:
+            self.command_changed_callback(self.command)
+
     def update_variable_names(self, variable_names):
         """
-        Updates the list of variable names that can be selected in parameter entries.
-        Clears comboboxes that have values that are no longer valid.
-        :param variable_names: List of variable names
+        Clears comboboxes that have values that are no longer valid after variables were removed.
+        The dropdown values themselves are refreshed when a dropdown opens.
+        :param variable_names: The shared VariableNames
         :return: None
         """
         self.variable_names = variable_names
-        for widgets in self.parameter_entries:
+        for widgets, parameter in zip(self.parameter_entries, self.command.parameters):
             param_name = widgets['param_name']
-            if param_name != 'slot number':
-                combobox = widgets['combobox']
-                combobox['values'] = self.variable_names
+            combobox = widgets['combobox']
+            if param_name != 'slot number' and combobox is not None:
                 # If combobox is visible and value is no longer valid, clear it
                 if str(combobox.get()) not in self.variable_names:
                     combobox.set('')
+                    if parameter.type == 'Var':
+                        parameter.value = ''
 
     def update_preview(self, event=None):
         """
-        Updates the preview text when a parameter is changed or when the command type is changed.
+        Requests an update of the preview text when a parameter is changed or when the command type is changed.
 
-        Gets the current command type and parameters, formats them according to the command format, and displays the result in the info_label.
+        With a render scheduler, repeated requests (e.g. while a key is held down in a parameter entry)
+        are coalesced into one render_preview call per render pass.
+
+        :param event: Optional event argument for tkinter's bind method.
+        :return: None
+        """
+        if self.render_scheduler is not None:
+            self.render_scheduler.request(self)
+        else:
+            self.render_preview()
+
+    def render_preview(self):
+        """
+        Updates the preview text from the command model.
+
+        Renders the command model through its precompiled template and displays the result in the info_label.
 
         If the formatted string is too long, truncates it to 30 characters and adds an ellipsis ('...').
 
-        :param event: Optional event argument for tkinter's bind method.
         :return: None
         """
-        command_type = self.command_type.get()
+        command_type = self.command.command_type
         if not command_type:
             self.info_label.config(text="")
             return
 
-        command = self.command_types[command_type]
-        params = []
-        for widgets in self.parameter_entries:
-            toggle_state = widgets['toggle_var'].get()
-            if toggle_state == 'Var':
-                param_value = widgets['combobox'].get()
-                if widgets['param_name'] == 'slot number':
-                    # Get spell_id from spell name
-                    spell = next(
-                        (s for s in self.spells_tab.get_selected_spells() if s[0] == param_value),
-                        None
-                    )
-                    if spell:
-                        param_value = spell[1]  # Assuming spell[1] is the ID
-                        params.append(f"(VAR % {param_value})")
-                    else:
-                        params.append(f"(VAR % )")  # Handle missing spell_id
-                else:
-                    params.append(f"(VAR % {param_value})" if param_value else "")
-            else:
-                param_value = widgets['entry'].get()
-                params.append(param_value)
-
         try:
-            preview = command['format'].format(*params)
+            preview = render_command(self.command, command_templates, self.spells_tab.get_spell_ids())
         except IndexError:
             preview = "Incomplete parameters"
         except Exception as e:
             preview = f"Error: {e}"
 
-        description = command['description'][:30] + ('...' if len(command['description']) > 30 else '')
+        description = command_templates[command_type].short_description
         preview_display = preview[:30] + ('...' if len(preview) > 30 else '')
         self.info_label.config(text=f"{description} | {preview_display}")
-
-    def get_command(self):
-        """
-        Returns the formatted command based on the current command type and parameters.
-
-        :return: Formatted command string
-        """
-        command_type = self.command_type.get()
-        if not command_type:
-            return ""
-        command = self.command_types[command_type]
-        if command_type == "Custom Command":
-            return self.parameter_entries[0]['entry'].get()
-        params = []
-        for widgets in self.parameter_entries:
-            toggle_state = widgets['toggle_var'].get()
-            if toggle_state == 'Var':
-                param_value = widgets['combobox'].get()
-                if widgets['param_name'] == 'slot number':
-                    # Get spell_id from spell name
-                    spell = next(
-                        (s for s in self.spells_tab.get_selected_spells() if s[0] == param_value),
-                        None
-                    )
-                    if spell:
-                        param_value = spell[1]  # Assuming spell[1] is the ID
-                        params.append(f"(VAR % {param_value})")
-                    else:
-                        params.append(f"(VAR % )")  # Handle missing spell_id
-                else:
-                    if param_value:
-                        params.append(f"(VAR % {param_value})")
-                    else:
-                        params.append("")  # Or handle as needed
-            else:
-                param_value = widgets['entry'].get()
-                params.append(param_value)
-        try:
-            return command['format'].format(*params)
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to generate command: {e}")
-            return ""
-
-    def get_command_data(self):
-        """
-        Returns a dictionary containing the command type and parameters as values.
-        The 'parameters' key contains a list of dictionaries, each with a 'type' and 'value' key.
-        The 'type' key is either 'Value' or 'Var' depending on the toggle state of the parameter.
-        The 'value' key is the value in the parameter entry widget, or the selected value in the combobox for 'Var' parameters.
-        """        
-        command_type = self.command_type.get()
-        parameters = []
-        for widgets in self.parameter_entries:
-            toggle_state = widgets['toggle_var'].get()
-            if toggle_state == 'Var':
-                param_value = widgets['combobox'].get()
-                parameters.append({'type': 'Var', 'value': param_value})
-            else:
-                param_value = widgets['entry'].get()
-                parameters.append({'type': 'Value', 'value': param_value})
-        return {
-            'command_type': command_type,
-            'parameters': parameters
-        }
-
-    def set_command_data(self, data):
-        """
-        Sets the command type and parameter values based on a dictionary of data.
-        
-        The dictionary should have the following keys:
-        - 'command_type': A string representing the command type.
-        - 'parameters': A list of dictionaries, each with two keys: 'type' and 'value'. The 'type' key is either 'Value' or 'Var', and the 'value' key is the value for the parameter.
-        
-        If the 'parameters' key is not present, or if the value is not a list, the function will do nothing.
-        
-        The function will also handle the old format where 'parameters' is a list of strings, and update the toggle state and value accordingly.
-        """
-        command_type = data.get('command_type', '')
-        self.command_type.set(command_type)
-        self.update_parameters()  # Recreate parameter entries based on command_type
-        parameters = data.get('parameters', [])
-
-        for widgets, param_data in zip(self.parameter_entries, parameters):
-            if isinstance(param_data, dict):
-                toggle_state = param_data.get('type', 'Value')
-                param_value = param_data.get('value', '')
-            else:
-                # Handle the old format where param_data is a string
-                toggle_state = 'Value'
-                param_value = param_data
-
-            widgets['toggle_var'].set(toggle_state)
-            if toggle_state == 'Var':
-                widgets['entry'].pack_forget()
-                widgets['combobox'].pack(side='left')
-                if widgets['param_name'] == 'slot number':
-                    # Update combobox with spells
-                    widgets['combobox']['values'] = [spell[0] for spell in self.spells_tab.get_selected_spells()]
-                else:
-                    widgets['combobox']['values'] = self.variable_names
-                widgets['combobox'].set(param_value)
-            else:
-                widgets['combobox'].pack_forget()
-                widgets['entry'].pack(side='left')
-                widgets['entry'].delete(0, tk.END)
-                widgets['entry'].insert(0, param_value)
@@ -0,0 +1,151 @@
+""" command_templates.py
+
+Compiles the formats in command_types once into CommandTemplate objects.
+"""
+from string import Formatter
+from command_types import command_types
+
+# Parameters that are single-character flags and are meant to be glued to the
+# next placeholder, e.g. "te{}{}" with '*' to also rotate the camera
+FLAG_PARAMS = ('*', '-')
+
+
+class CommandTemplate:
+    """
+    A command format compiled into its literal fragments and placeholders.
+
+    Attributes
+    ----------
+    name : str
+        The command type name.
+    format : str
+        The original str.format string.
+    params : list[str]
+        The parameter names from command_types.
+    description : str
+        The command description.
+    short_description : str
+        The description truncated to 30 characters for the preview label.
+    fragments : tuple[str]
+        The literal text around the placeholders, always arity + 1 entries.
+    positions : tuple[int]
+        The index into the parameter list used by each placeholder.
+    arity : int
+        The number of placeholders.
+    problems : list[str]
+        Mismatches between the format and its params found at compile time.
+    """
+    __slots__ = ('name', 'format', 'params', 'description', 'short_description',
+                 'fragments', 'positions', 'arity', 'problems', '_required', '_template', '_fallback')
+
+    def __init__(self, name, spec):
+        self.name = name
+        self.format = spec['format']
+        self.params = spec.get('params', [])
+        self.description = spec.get('description', '')
+        self.short_description = self.description[:30] + ('...' if len(self.description) > 30 else '')
+        self.problems = []
+
+        fragments = []
+        positions = []
+        literal = ''
+        auto_index = 0
+        self._fallback = False
+        for text, field_name, format_spec, conversion in Formatter().parse(self.format):
+            literal += text
+            if field_name is None:
+                continue
+            if field_name == '':
+                position = auto_index
+                auto_index += 1
+            elif field_name.isdigit():
+                position = int(field_name)
+            else:
+                # Attribute or keyword fields are left to str.format
+                position = auto_index
+                self._fallback = True
+            if format_spec or conversion:
+                self._fallback = True
+            fragments.append(literal)
+            positions.append(position)
+            literal = ''
+        fragments.append(literal)
+
+        self.fragments = tuple(fragments)
+        self.positions = tuple(positions)
+        self.arity = len(positions)
+        self._required = max(positions) + 1 if positions else 0
+        if positions:
+            self._template = '%s'.join(fragment.replace('%', '%%') for fragment in fragments)
+        else:
+            self._template = literal
+        self.check()
+
+    def check(self):
+        """
+        Records mismatches between the placeholders and the params in self.problems.
+        """
+        if self.arity != len(self.params):
+            self.problems.append(
+                f"'{self.name}': format {self.format!r} has {self.arity} placeholder(s) "
+                f"but {len(self.params)} param(s)"
+            )
+        for idx in range(1, self.arity):
+            previous = self.positions[idx - 1]
+            if self.fragments[idx] == '' and previous < len(self.params) and self.params[previous] not in FLAG_PARAMS:
+                self.problems.append(
+                    f"'{self.name}': placeholders {idx} and {idx + 1} of format {self.format!r} "
+                    f"have no separator between them"
+                )
+
+    def render(self, params):
+        """
+        Returns the command text for a list of parameter strings.
+
+        Extra parameters are ignored. Missing parameters raise IndexError, like
+        str.format does.
+
+        Parameters
+        ----------
+        params : list[str]
+            The resolved parameter strings.
+
+        Returns
+        -------
+        str
+            The rendered command.
+        """
+        if len(params) < self._required:
+            raise IndexError(f"Replacement index {len(params)} out of range for positional args tuple")
+        if self._fallback:
+            return self.format.format(*params)
+        if not self.arity:
+            return self._template
+        return self._template % tuple([params[position] for position in self.positions])
+
+
+def compile_command_types(types):
+    """
+    Compiles a command_types dictionary into CommandTemplate objects.
+
+    Parameters
+    ----------
+    types : dict
+        The dictionary of available command types.
+
+    Returns
+    -------
+    dict[str, CommandTemplate]
+        The templates keyed by command type name.
+    """
+    return {name: CommandTemplate(name, spec) for name, spec in types.items()}
+
+
+def template_problems(templates):
+    """
+    Returns the problems of all templates as a flat list of messages.
+    """
+    return [problem for template in templates.values() for problem in template.problems]
+
+
+command_templates = compile_command_types(command_types)
@@ -4,528 +4,655 @@ command_types = {
         "format": "!eq % shouldUseSpell{},true",
         "params": ["Slot Number"],
         "description": "Checks if a spell should be used",
-        "example": "!eq %  shouldUseSpell1,true"
+        "example": "!eq %  shouldUseSpell1,true",
+        "cost": 1,
+        "condition": True
     },
     "Check Hotbar": {
         "format": "ch{}, {}",
         "params": ["Slot Number", "Delay Variable"],
         "description": "Checks if a hotbar slot is ready to use",
-        "example": "ch1, queueDelay"
+        "example": "ch1, queueDelay",
+        "cost": 4,
+        "condition": True
     },
     "Check Range": {
         "format": " {}",
         "params": ["Range Variable"],
         "description": "Checks a range condition",
-        "example": " inRangedAttackRange"
+        "example": " inRangedAttackRange",
+        "cost": 40,
+        "condition": True
     },
     "Press Key": {
         "format": " spell{}d",
         "params": ["Spell Number"],
         "description": "Presses a key to cast a spell",
-        "example": " spell1d"
+        "example": " spell1d",
+        "cost": 1
     },
     "Store Key": {
         "format": "store % key, spell{}",
         "params": ["Spell Number"],
         "description": "Stores the key of a spell",
-        "example": "store % key, spell1"
+        "example": "store % key, spell1",
+        "cost": 1
     },
     "Go To": {
         "format": "gt{}",
         "params": ["Line Number"],
         "description": "Jumps to a specific line in the macro",
-        "example": "gt16"
+        "example": "gt16",
+        "cost": 1
     },
     "Equal To": {
         "format": "eq % {},{}",
         "params": ["Variable (prefix with VAR if needed", "Value"],
         "description": "Checks if a variable is equal to a value",
-        "example": "eq %  mobCount,5"
+        "example": "eq %  mobCount,5",
+        "cost": 1,
+        "condition": True
     },
     "Not Equal To": {
         "format": "!eq % {},{}",
         "params": ["Variable (prefix with VAR if needed", "Value"],
         "description": "Checks if a variable is not equal to a value",
-        "example": "!eq %  mobCount,0"
+        "example": "!eq %  mobCount,0",
+        "cost": 1,
+        "condition": True
     },
     "Less Than": {
         "format": "cmp % {},{}",
         "params": ["Value1 (prefix with VAR if needed", "Value2 (prefix with VAR if needed"],
         "description": "Checks if Value1 is less than Value2",
-        "example": "cmp %  playerHP,0.5"
+        "example": "cmp %  playerHP,0.5",
+        "cost": 1,
+        "condition": True
     },
     "Greater Than or Equal": {
         "format": "!cmp % {},{}",
         "params": ["Value1 (prefix with VAR if needed", "Value2 (prefix with VAR if needed"],
         "description": "Checks if Value1 is greater than or equal to Value2",
-        "example": "!cmp %  playerMP,0.7"
+        "example": "!cmp %  playerMP,0.7",
+        "cost": 1,
+        "condition": True
     },
     "Set Release Timer": {
         "format": "ct % releaseTimer",
         "params": [],
         "description": "Checks the release timer",
-        "example": "ct % releaseTimer"
+        "example": "ct % releaseTimer",
+        "cost": 1,
+        "condition": True
     },
     "Store Release Timer": {
         "format": "store % releaseTimer,{}",
         "params": ["Value"],
         "description": "Stores a value in releaseTimer",
-        "example": "store % releaseTimer,0"
+        "example": "store % releaseTimer,0",
+        "cost": 1
     },
     "Random Range": {
         "format": "rand{},{}",
         "params": ["Min", "Max"],
         "description": "Generates a random number between Min and Max",
-        "example": "rand100,500"
+        "example": "rand100,500",
+        "cost": 1
     },
     "Multiply Random": {
         "format": "mul % RAND,{}",
         "params": ["Multiplier"],
         "description": "Multiplies RAND by Multiplier",
-        "example": "mul % RAND,0.001"
+        "example": "mul % RAND,0.001",
+        "cost": 1
     },
     "Store Queue Delay": {
         "format": "store % queueDelay, RAND",
         "params": [],
         "description": "Stores RAND into queueDelay",
-        "example": "store % queueDelay, RAND"
+        "example": "store % queueDelay, RAND",
+        "cost": 1
     },
     "Custom Command": {
         "format": "{}",
         "params": ["Command Text"],
         "description": "Enter a custom command",
-        "example": "your custom command here"
+        "example": "your custom command here",
+        "cost": 1
     },
     "Hold Key Down": {
         "format": "[key code]d",
         "params": ["Key Code"],
         "description": "Holds down the key",
-        "example": "87d"
+        "example": "87d",
+        "cost": 1
     },
     "Release Key": {
         "format": "[key code]u",
         "params": ["Key Code"],
         "description": "Releases the key",
-        "example": "87u"
+        "example": "87u",
+        "cost": 1
     },
     "Move Mouse": {
         "format": "m{},{}",
         "params": ["X", "Y"],
         "description": "Moves mouse cursor to (X, Y",
-        "example": "m100,200"
+        "example": "m100,200",
+        "cost": 2
     },
     "Random Move Mouse": {
         "format": "rm{}",
         "params": ["[x1],[y1];[x2],[y2];..."],
         "description": "Randomly moves mouse to one of the specified positions",
-        "example": "rm100,200;150,250"
+        "example": "rm100,200;150,250",
+        "cost": 2
     },
     "Random Key Down": {
         "format": "rkd{},{}",
         "params": ["Key1", "Key2"],
         "description": "Holds down a random key from the list",
-        "example": "rkd87,65,83"
+        "example": "rkd87,65,83",
+        "cost": 1
     },
     "Random Key Up": {
         "format": "rku",
         "params": [],
         "description": "Releases the key held by the last rkd command",
-        "example": "rku"
+        "example": "rku",
+        "cost": 1
     },
     "Key Down Conditional": {
         "format": "kd{}",
         "params": ["Key Code"],
         "description": "If the key is pressed, processes the rest of the line",
-        "example": "kd87|87d|s1000|87u"
+        "example": "kd87|87d|s1000|87u",
+        "cost": 2,
+        "condition": True
     },
     "Key Down Physical": {
         "format": "kd*{}",
         "params": ["Key Code"],
         "description": "Checks if the physical key is pressed",
-        "example": "kd*87|87d|s1000|87u"
+        "example": "kd*87|87d|s1000|87u",
+        "cost": 2,
+        "condition": True
     },
     "Sleep": {
         "format": "s{}",
         "params": ["Milliseconds"],
         "description": "Waits for specified milliseconds",
-        "example": "s1000"
+        "example": "s1000",
+        "cost": 1
     },
     "Random Sleep": {
         "format": "rs{},{}",
         "params": ["Min Milliseconds", "Max Milliseconds"],
         "description": "Waits for a random time between min and max milliseconds",
-        "example": "rs500,1000"
+        "example": "rs500,1000",
+        "cost": 1
     },
     "Set Timer": {
         "format": "st % {},{}",
         "params": ["Timer Name", "Delay"],
         "description": "Sets a timer",
-        "example": "st % releaseTimer,5000"
+        "example": "st % releaseTimer,5000",
+        "cost": 1
     },
     "Check Timer": {
         "format": "ct % {}",
         "params": ["Timer Name"],
         "description": "Checks if the timer has expired",
-        "example": "ct % releaseTimer"
+        "example": "ct % releaseTimer",
+        "cost": 1,
+        "condition": True
     },
     "Camera Angle": {
         "format": "c{}",
         "params": ["Angle"],
         "description": "Adjusts camera horizontal angle (-180 to 180 degrees",
-        "example": "c90"
+        "example": "c90",
+        "cost": 2
     },
     "Camera Vertical Angle": {
         "format": "cy{}",
         "params": ["Angle"],
         "description": "Adjusts camera vertical angle",
-        "example": "cy45"
+        "example": "cy45",
+        "cost": 2
     },
     "If Target is Mob": {
         "format": "it",
         "params": [],
         "description": "If targeting a mob, processes the rest of the line",
-        "example": "it|87d|s1000|87u"
+        "example": "it|87d|s1000|87u",
+        "cost": 3,
+        "condition": True
     },
     "If Being Targeted": {
         "format": "ibt{},{}",
         "params": ["Type", "Distance"],
         "description": "If being targeted by an entity of type within distance",
-        "example": "ibt1,100"
+        "example": "ibt1,100",
+        "cost": 40,
+        "condition": True
     },
     "Target": {
         "format": "tar",
         "params": [],
         "description": "Populates TN (target name and TID (target ID",
-        "example": "tar"
+        "example": "tar",
+        "cost": 3
     },
     "Target Distance": {
         "format": "td{}",
         "params": ["Distance"],
         "description": "If current target is within distance",
-        "example": "td100"
+        "example": "td100",
+        "cost": 3,
+        "condition": True
     },
     "Target Entity": {
         "format": "te{}{}",
         "params": ["*", "Entity ID"],
         "description": "Targets the entity by ID. Use '*' to also rotate camera toward the entity",
-        "example": "te*12345"
+        "example": "te*12345",
+        "cost": 10
     },
     "Target Closest Mob": {
         "format": "tcm{}{},{}",
         "params": ["*", "Max Distance", "Max Height"],
         "description": "Targets closest mob. Use '*' to rotate camera",
-        "example": "tcm*100,50"
+        "example": "tcm*100,50",
+        "cost": 40
     },
     "Target Closest Player": {
         "format": "tcp{}{},{}",
         "params": ["*", "Max Distance", "Max Height", "Type"],
         "description": "Targets closest player. Type: 0 any, 1 enemy, 2 friendly",
-        "example": "tcp*100,50,1"
+        "example": "tcp*100,50,1",
+        "cost": 40
     },
     "Target Mob with Lowest HP": {
         "format": "tmhp{}{},{}",
         "params": ["*", "Distance", "Max Height"],
         "description": "Targets mob with lowest HP. Use '*' to rotate camera",
-        "example": "tmhp*100,50"
+        "example": "tmhp*100,50",
+        "cost": 40
     },
     "Target Player with Lowest HP": {
         "format": "tphp{}{},{}",
         "params": ["*", "Distance", "Max Height"],
         "description": "Targets player with lowest HP. Use '*' to rotate camera",
-        "example": "tphp*100,50"
+        "example": "tphp*100,50",
+        "cost": 40
     },
     "Target Player with Weapon": {
         "format": "tcpw{}{},{}",
         "params": ["*", "Distance", "Weapon ID"],
         "description": "Targets player with specified weapon. Use '*' to rotate camera",
-        "example": "tcpw*100,40438765"
+        "example": "tcpw*100,40438765",
+        "cost": 40
     },
     "Target Entity by Name": {
         "format": "tce % {},{},{}",
         "params": ["*", "Entity Name", "Distance", "Max Height"],
         "description": "Targets entity by name. Use '*' to rotate camera",
-        "example": "tce % *Enemy Name,100,50"
+        "example": "tce % *Enemy Name,100,50",
+        "cost": 50
     },
     "Lock Target": {
         "format": "lt",
         "params": [],
         "description": "Locks camera to current target",
-        "example": "lt"
+        "example": "lt",
+        "cost": 2
     },
     "Unlock Target": {
         "format": "lt-",
         "params": [],
         "description": "Unlocks camera",
-        "example": "lt-"
+        "example": "lt-",
+        "cost": 1
     },
     "Ignore Players": {
         "format": "ign{}{}",
         "params": ["-", "Distance"],
         "description": "Sets nearby players as allies or resets the list. Use '-' to reset",
-        "example": "ign100"
+        "example": "ign100",
+        "cost": 40
     },
     "Rotate Camera to Target": {
         "format": "tct",
         "params": [],
         "description": "Rotates camera toward current target",
-        "example": "tct"
+        "example": "tct",
+        "cost": 2
     },
     "Target Previous Target": {
         "format": "tpt{}",
         "params": ["*"],
         "description": "Targets previous target if none selected. Use '*' to rotate camera",
-        "example": "tpt*"
+        "example": "tpt*",
+        "cost": 3
     },
     "Health Percentage": {
         "format": "hp{}",
         "params": ["Percent"],
         "description": "If HP ≤ percent (0 to 1",
-        "example": "hp0.5"
+        "example": "hp0.5",
+        "cost": 2,
+        "condition": True
     },
     "Mana Percentage": {
         "format": "mp{}",
         "params": ["Percent"],
         "description": "If MP ≤ percent (0 to 1",
-        "example": "mp0.3"
+        "example": "mp0.3",
+        "cost": 2,
+        "condition": True
     },
     "Stamina Percentage": {
         "format": "sta{}",
         "params": ["Percent"],
         "description": "If stamina ≤ percent (0 to 1",
-        "example": "sta0.8"
+        "example": "sta0.8",
+        "cost": 2,
+        "condition": True
     },
     "Player Status Effect": {
         "format": "pse{},{}",
         "params": ["Status Effect ID", "Stacks"],
         "description": "If status effect is active",
-        "example": "pse123,1"
+        "example": "pse123,1",
+        "cost": 4,
+        "condition": True
     },
     "Is Attacking": {
         "format": "ia",
         "params": [],
         "description": "If currently attacking",
-        "example": "ia"
+        "example": "ia",
+        "cost": 2,
+        "condition": True
     },
     "Current Attack": {
         "format": "att{}",
         "params": ["Attack ID"],
         "description": "If current attack matches attack ID",
-        "example": "att456"
+        "example": "att456",
+        "cost": 2,
+        "condition": True
     },
     "Check Hotbar Slot": {
         "format": "ch{},{}",
         "params": ["Hotbar Slot", "Timer"],
         "description": "If ability is ready or near ready",
-        "example": "ch1,500"
+        "example": "ch1,500",
+        "cost": 4,
+        "condition": True
     },
     "Wait for Hotbar Slot": {
         "format": "ch*{},{}",
         "params": ["Hotbar Slot", "Timeout"],
         "description": "Waits until ability is on cooldown or times out",
-        "example": "ch*1,5000"
+        "example": "ch*1,5000",
+        "cost": 20,
+        "condition": True,
+        "pure": False
     },
     "Check Hotbar ID": {
         "format": "chid{},{}",
         "params": ["Hotbar Slot", "Ability ID"],
         "description": "Checks if ability ID matches",
-        "example": "chid1,789"
+        "example": "chid1,789",
+        "cost": 4,
+        "condition": True
     },
     "Weapon Number": {
         "format": "wpn{}",
         "params": ["Weapon Number"],
         "description": "If active weapon is 1 or 2",
-        "example": "wpn1"
+        "example": "wpn1",
+        "cost": 2,
+        "condition": True
     },
     "Weapon ID": {
         "format": "wpn*{}",
         "params": ["Weapon ID"],
         "description": "If equipped weapon matches ID",
-        "example": "wpn*40438765"
+        "example": "wpn*40438765",
+        "cost": 2,
+        "condition": True
     },
     "Move To Coordinates": {
         "format": "mt{},{},{}",
         "params": ["X", "Y", "Z"],
         "description": "Moves character to coordinates",
-        "example": "mt1000,2000,300"
+        "example": "mt1000,2000,300",
+        "cost": 5
     },
     "Move Toward Mob": {
         "format": "mtm % {},{},{}",
         "params": ["Name", "Distance", "Angle", "How Far"],
         "description": "Moves toward mob",
-        "example": "mtm % Goblin,100,90,50"
+        "example": "mtm % Goblin,100,90,50",
+        "cost": 40
     },
     "Movement Speed": {
         "format": "ms{}",
         "params": ["Movement Speed"],
         "description": "Sets movement speed increase",
-        "example": "ms1.5"
+        "example": "ms1.5",
+        "cost": 1
     },
     "Load Waymark File": {
         "format": "lwf % {}",
         "params": ["Filename.ini"],
         "description": "Loads waymark file",
-        "example": "lwf % waymarks.ini"
+        "example": "lwf % waymarks.ini",
+        "cost": 20
     },
     "Check Nearby Mobs": {
         "format": "cnm{},{}{},{}",
         "params": ["Number", "Distance", "Max Height", "(X,(Y,(Z"],
         "description": "Checks for nearby mobs",
-        "example": "cnm5,100,50"
+        "example": "cnm5,100,50",
+        "cost": 40,
+        "condition": True
     },
     "Check Mobs Around Target": {
         "format": "ctnm{},{}",
         "params": ["Number", "Distance"],
         "description": "Checks mobs around the target",
-        "example": "ctnm5,100"
+        "example": "ctnm5,100",
+        "cost": 40,
+        "condition": True
     },
     "Check Mobs with HP": {
         "format": "cmhp{},{}",
         "params": ["Percent", "Distance"],
         "description": "Checks mobs with HP ≤ percent",
-        "example": "cmhp0.5,100"
+        "example": "cmhp0.5,100",
+        "cost": 40,
+        "condition": True
     },
     "Check Players with HP": {
         "format": "cphp{},{}",
         "params": ["Percent", "Distance"],
         "description": "Checks players with HP ≤ percent",
-        "example": "cphp0.5,100"
+        "example": "cphp0.5,100",
+        "cost": 40,
+        "condition": True
     },
     "Check Target HP": {
         "format": "cthp{}",
         "params": ["Percent"],
         "description": "Checks if target's HP ≤ percent",
-        "example": "cthp0.5"
+        "example": "cthp0.5",
+        "cost": 3,
+        "condition": True
     },
     "Check Players with Weapon": {
         "format": "cnpw{},{}",
         "params": ["Number", "Distance", "Weapon ID"],
         "description": "Checks for players with weapon ID",
-        "example": "cnpw5,100,40438765"
+        "example": "cnpw5,100,40438765",
+        "cost": 40,
+        "condition": True
     },
     "Check Target's Status Effects": {
         "format": "cts{},{}{},{}",
         "params": ["Status Effect ID", "Stacks", "Remaining Duration"],
         "description": "Checks target's status effects",
-        "example": "cts123,1,5000"
+        "example": "cts123,1,5000",
+        "cost": 6,
+        "condition": True
     },
     "Check Target's Weapon": {
         "format": "ctw{}{}",
         "params": ["*", "Weapon ID"],
         "description": "Checks target's weapon. Use '*' to rotate camera",
-        "example": "ctw*40438765"
+        "example": "ctw*40438765",
+        "cost": 4,
+        "condition": True
     },
     "Check Entity by Name": {
         "format": "cne % {},{},{}",
         "params": ["Entity Name", "Distance", "Max Height"],
         "description": "Checks for entity by name",
-        "example": "cne % Goblin,100,50"
+        "example": "cne % Goblin,100,50",
+        "cost": 50,
+        "condition": True
     },
     "Call Function": {
         "format": "call % {}",
         "params": ["Function Name"],
         "description": "Calls a defined function",
-        "example": "call % myFunction"
+        "example": "call % myFunction",
+        "cost": 5
     },
     "Go To Line": {
         "format": "gt{}",
         "params": ["Line Number"],
         "description": "Jumps to waymark index or macro keys section",
-        "example": "gt16"
+        "example": "gt16",
+        "cost": 1
     },
     "Toggle Macro Key": {
         "format": "to{}",
         "params": ["Macro Key"],
         "description": "Toggles a macro",
-        "example": "toF3"
+        "example": "toF3",
+        "cost": 1
     },
     "Random Number": {
         "format": "rand{},{}",
         "params": ["Min", "Max"],
         "description": "Generates a random number into RAND",
-        "example": "rand1,100"
+        "example": "rand1,100",
+        "cost": 1
     },
     "Compare Less Than": {
         "format": "cmp{},{}",
         "params": ["Value1", "Value2"],
         "description": "If Value1 < Value2",
-        "example": "cmp playerHP,0.5"
+        "example": "cmp playerHP,0.5",
+        "cost": 1,
+        "condition": True
     },
     "Store Variable": {
         "format": "store % {},{}",
         "params": ["Variable", "Value"],
         "description": "Stores value in a variable",
-        "example": "store % queueDelay,500"
+        "example": "store % queueDelay,500",
+        "cost": 1
     },
     "Retrieve Variable": {
         "format": " {}",
         "params": ["Variable"],
         "description": "Retrieves variable's value",
-        "example": " queueDelay"
+        "example": " queueDelay",
+        "cost": 1
     },
     "Equal To": {
         "format": "eq % {},{}",
         "params": ["Variable", "Value"],
         "description": "If variable equals value",
-        "example": "eq %  mobCount,5"
+        "example": "eq %  mobCount,5",
+        "cost": 1,
+        "condition": True
     },
     "Logical OR": {
         "format": "or % ({}({}...",
         "params": ["Command1", "Command2"],
         "description": "Logical OR between commands",
-        "example": "or % (eq %  mobCount,5(eq %  mobCount,10"
+        "example": "or % (eq %  mobCount,5(eq %  mobCount,10",
+        "cost": 2,
+        "condition": True
     },
     "Add": {
         "format": "add % {},{}",
         "params": ["Variable", "Value"],
         "description": "Adds value to variable",
-        "example": "add % mobCount,1"
+        "example": "add % mobCount,1",
+        "cost": 1
     },
     "Subtract": {
         "format": "sub % {},{}",
         "params": ["Variable", "Value"],
         "description": "Subtracts value from variable",
-        "example": "sub % mobCount,1"
+        "example": "sub % mobCount,1",
+        "cost": 1
     },
     "Multiply": {
         "format": "mul % {},{}",
         "params": ["Variable", "Value"],
         "description": "Multiplies variable by value",
-        "example": "mul % RAND,0.001"
+        "example": "mul % RAND,0.001",
+        "cost": 1
     },
     "Divide": {
         "format": "div % {},{}",
         "params": ["Variable", "Value"],
         "description": "Divides variable by value",
-        "example": "div % totalDamage,2"
+        "example": "div % totalDamage,2",
+        "cost": 1
     },
     "Debug Message": {
         "format": "dbg % {}",
         "params": ["Text"],
         "description": "Outputs text to console",
-        "example": "dbg % 'Debug message here'"
+        "example": "dbg % 'Debug message here'",
+        "cost": 2
     },
     "Console Command": {
         "format": "cc % {}",
         "params": ["Console Command"],
         "description": "Executes a console command",
-        "example": "cc % -cl"
+        "example": "cc % -cl",
+        "cost": 10
     },
     "Get Pixel Color": {
         "format": "gp{},{}{},{}",
         "params": ["X", "Y", "Color", "Precision"],
         "description": "Checks pixel color at coordinates",
-        "example": "gp100,200,16777215,0"
+        "example": "gp100,200,16777215,0",
+        "cost": 100,
+        "condition": True
     },
     "No Operation": {
         "format": "nop",
         "params": [],
         "description": "No operation (placeholder",
-        "example": "nop"
+        "example": "nop",
+        "cost": 0
     },
     "Config Line": {
         "format": "conf % {},{}",
         "params": ["Line", "Text"],
         "description": "Writes text to a line in config.txt",
-        "example": "conf % 1,113"
+        "example": "conf % 1,113",
+        "cost": 20
     }
 }
@@ -0,0 +1,154 @@
+""" config_compiler.py
+
+Compiles saved JSON configs into rotation_config.txt without the GUI.
+
+Usage:
+    python -m config_compiler my_config.json
+    python -m config_compiler my_config.json -o path/to/rotation_config.txt
+    python -m config_compiler configs/ --jobs 8 --output-dir out/
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from command_types import command_types
+from command_templates import command_templates
+from config_format import read_rotation
+from config_writer import DEFAULT_CONFIG_PATH, write_config
+
+
+def compile_file(input_path, output_path, fsync=False):
+    """
+    Compiles a saved config file and streams the result into output_path.
+
+    The output is replaced atomically, see config_writer.
+
+    Parameters
+    ----------
+    input_path : str
+        The JSON config to read.
+    output_path : str
+        The file to write the generated config to.
+    fsync : bool
+        Whether to fsync the output before replacing the old file.
+
+    Returns
+    -------
+    tuple[str, str, float, list[str]]
+        The input path, the output path, the elapsed time in seconds and the
+        warning messages.
+    """
+    start = time.perf_counter()
+    rotation = read_rotation(input_path, command_types)
+    warnings = []
+    write_config(
+        rotation, command_templates, output_path,
+        on_error=lambda command, e: warnings.append(f"Failed to generate command '{command.command_type}': {e}"),
+        fsync=fsync
+    )
+    return input_path, output_path, time.perf_counter() - start, warnings
+
+
+def _compile_job(job):
+    """
+    Runs compile_file for an (input_path, output_path, fsync) tuple, returning
+    the error message instead of raising so one bad file does not stop a batch.
+    """
+    input_path, output_path, fsync = job
+    start = time.perf_counter()
+    try:
+        return compile_file(input_path, output_path, fsync) + (None,)
+    except Exception as e:
+        return input_path, output_path, time.perf_counter() - start, [], str(e)
+
+
+def collect_inputs(paths):
+    """
+    Expands directories in paths into the *.json files they contain.
+
+    Parameters
+    ----------
+    paths : list[str]
+        Config files and directories.
+
+    Returns
+    -------
+    list[str]
+        The config files, directories expanded in sorted order.
+    """
+    inputs = []
+    for path in paths:
+        if os.path.isdir(path):
+            inputs.extend(sorted(
+                os.path.join(path, name) for name in os.listdir(path)
+                if name.endswith('.json') and os.path.isfile(os.path.join(path, name))
+            ))
+        else:
+            inputs.append(path)
+    return inputs
+
+
+def output_path_for(input_path, output_dir):
+    """
+    Returns the output path used in batch mode: <stem>_rotation_config.txt in
+    output_dir, or next to the input file when output_dir is None.
+    """
+    stem = os.path.splitext(os.path.basename(input_path))[0]
+    directory = output_dir if output_dir is not None else os.path.dirname(input_path)
+    return os.path.join(directory, f"{stem}_rotation_config.txt")
+
+
+def main(argv=None):
+    """
+    Command-line entry point. Returns the process exit code.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m config_compiler",
+        description="Compile saved rotation configs into rotation_config.txt without the GUI."
+    )
+    parser.add_argument('inputs', nargs='+', help="JSON config files or directories of them")
+    parser.add_argument('-o', '--output', help="output file for a single input (default: rotation_config.txt)")
+    parser.add_argument('--output-dir', help="directory for batch outputs (default: next to each input)")
+    parser.add_argument('-j', '--jobs', type=int, default=1, help="number of worker processes (default: 1)")
+    parser.add_argument('--fsync', action='store_true', help="fsync each output before replacing the old file")
+    args = parser.parse_args(argv)
+
+    inputs = collect_inputs(args.inputs)
+    if not inputs:
+        parser.error("no config files found")
+    batch = len(inputs) > 1 or any(os.path.isdir(path) for path in args.inputs)
+    if batch and args.output:
+        parser.error("--output can only be used with a single config file")
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+    if batch:
+        jobs = [(path, output_path_for(path, args.output_dir), args.fsync) for path in inputs]
+    else:
+        output = args.output or os.path.join(args.output_dir or '', DEFAULT_CONFIG_PATH)
+        jobs = [(inputs[0], output, args.fsync)]
+
+    total_start = time.perf_counter()
+    if args.jobs > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+            results = list(executor.map(_compile_job, jobs, chunksize=max(1, len(jobs) // (args.jobs * 4))))
+    else:
+        results = [_compile_job(job) for job in jobs]
+
+    failures = 0
+    for input_path, output_path, elapsed, warnings, error in results:
+        if error is not None:
+            failures += 1
+            print(f"FAILED {input_path} ({elapsed * 1000:.1f} ms): {error}", file=sys.stderr)
+            continue
+        print(f"{input_path} -> {output_path} ({elapsed * 1000:.1f} ms)")
+        for warning in warnings:
+            print(f"  warning: {warning}", file=sys.stderr)
+    print(f"Compiled {len(results) - failures}/{len(results)} configs in "
+          f"{(time.perf_counter() - total_start) * 1000:.1f} ms")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,373 @@
+""" config_format.py
+
+Versioned on-disk format for saved configs.
+
+Version 3 is a compact encoding with a header:
+
+    {"format": "rotation-config", "version": 3, "summary": {...},
+        "command_types": ["Press Key", "Sleep", ...],
+        "makros": [[[[0, "49"], [1, "50"]], ...], ...],
+        "variables": {"name": "value", ...},
+        "spells": [["49", "spellId1", "Fireball"], ...]
+    }
+
+Each makro is a list of keys, each key a list of commands, and each command
+an [index into command_types, parameter, ...] list. A parameter is a string
+for a literal value, or a one-element list [name] for a variable or spell
+reference. Spell slots are [key id, spell id, spell name] lists.
+
+The header fields are written on the first line, ahead of the body, so
+read_summary() can get the counts, spell and variable names and content
+hash of a config with one bounded read, without parsing the body. Version 2
+files have the same body without the summary line.
+
+Files without the header are version 1, the verbose format written by older
+releases. They are converted once by migrate(); `python -m config_format
+FILE...` rewrites older files in place.
+
+orjson is used for parsing and serializing when it is installed.
+"""
+import argparse
+import hashlib
+import sys
+from config_writer import atomic_writer
+from rotation_model import Command, Key, Makro, Parameter, Rotation, SpellSlot
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    import json
+
+FORMAT_NAME = "rotation-config"
+SCHEMA_VERSION = 3
+SUMMARY_VERSION = 3  # First version with a summary line
+HEADER_LIMIT = 64 * 1024  # Maximum number of bytes read by read_summary
+
+
+def loads(text):
+    """
+    Parses JSON text or bytes, with orjson when available.
+    """
+    if orjson is not None:
+        return orjson.loads(text)
+    if isinstance(text, bytes):
+        text = text.decode('utf-8')
+    return json.loads(text)
+
+
+def dumps(data):
+    """
+    Serializes data to compact JSON text, with orjson when available.
+    """
+    if orjson is not None:
+        return orjson.dumps(data).decode('utf-8')
+    return json.dumps(data, separators=(',', ':'))
+
+
+def schema_version(data):
+    """
+    Returns the schema version of loaded config data: 1 for files without a header.
+
+    Raises
+    ------
+    ValueError
+        If the data was written by a newer release.
+    """
+    if isinstance(data, dict) and data.get('format') == FORMAT_NAME:
+        version = data.get('version')
+        if not isinstance(version, int) or version > SCHEMA_VERSION:
+            raise ValueError(f"Unsupported config version {version!r}, this release reads up to {SCHEMA_VERSION}")
+        return version
+    return 1
+
+
+def encode(rotation):
+    """
+    Returns the current version data of a rotation, without the summary.
+
+    Parameters
+    ----------
+    rotation : Rotation
+        The rotation to encode.
+
+    Returns
+    -------
+    dict
+        The data, ready to be serialized with dumps().
+    """
+    type_indices = {}
+    makros = []
+    for makro in rotation.makros:
+        keys = []
+        for key in makro.keys:
+            commands = []
+            for command in key.commands:
+                index = type_indices.setdefault(command.command_type, len(type_indices))
+                encoded = [index]
+                for parameter in command.parameters:
+                    encoded.append([parameter.value] if parameter.type == 'Var' else parameter.value)
+                commands.append(encoded)
+            keys.append(commands)
+        makros.append(keys)
+    return {
+        'format': FORMAT_NAME,
+        'version': SCHEMA_VERSION,
+        'command_types': list(type_indices),
+        'makros': makros,
+        'variables': dict(rotation.variables),
+        'spells': [[slot.key_id, slot.spell_id, slot.spell_name] for slot in rotation.spells],
+    }
+
+
+def summarize(rotation):
+    """
+    Returns the summary of a rotation stored in the header.
+
+    Parameters
+    ----------
+    rotation : Rotation
+        The rotation to summarize.
+
+    Returns
+    -------
+    dict
+        The makro, key and command counts and the names of the selected spells
+        and of the variables.
+    """
+    return {
+        'makros': len(rotation.makros),
+        'keys': sum(len(makro.keys) for makro in rotation.makros),
+        'commands': sum(len(key.commands) for makro in rotation.makros for key in makro.keys),
+        'spells': [slot.spell_name for slot in rotation.spells if slot.spell_name],
+        'variables': list(rotation.variables),
+    }
+
+
+def dumps_rotation(rotation):
+    """
+    Serializes a rotation in the current version, header line first.
+
+    The result is a single JSON object whose first line holds the format,
+    version and summary fields. The summary's 'hash' is the SHA-1 of the
+    body, so identical configs have identical hashes.
+
+    Parameters
+    ----------
+    rotation : Rotation
+        The rotation to serialize.
+
+    Returns
+    -------
+    str
+        The file content.
+    """
+    data = encode(rotation)
+    body = dumps({name: value for name, value in data.items() if name not in ('format', 'version')})
+    summary = summarize(rotation)
+    summary['hash'] = hashlib.sha1(body.encode('utf-8')).hexdigest()
+    header = dumps({'format': data['format'], 'version': data['version'], 'summary': summary})
+    return header[:-1] + ',\n' + body[1:]
+
+
+def read_summary(path):
+    """
+    Returns the summary of a saved config, reading at most HEADER_LIMIT bytes.
+
+    Parameters
+    ----------
+    path : str
+        The config file.
+
+    Returns
+    -------
+    dict or None
+        The summary, see dumps_rotation, or None if the file has no summary
+        line, e.g. because it was saved by an older release.
+    """
+    with open(path, 'rb') as f:
+        head = f.read(HEADER_LIMIT)
+    line, newline, _ = head.partition(b'\n')
+    if not newline or not line.endswith(b','):
+        return None
+    try:
+        header = loads(line[:-1] + b'}')
+    except ValueError:
+        return None
+    if not isinstance(header, dict) or header.get('format') != FORMAT_NAME:
+        return None
+    if not isinstance(header.get('version'), int) or header['version'] < SUMMARY_VERSION:
+        return None
+    return header.get('summary')
+
+
+def decode(data, command_types):
+    """
+    Creates a rotation from version 2 or later data.
+
+    Parameter names are taken from command_types. Missing parameters are
+    left empty and surplus ones are dropped, as when loading older configs.
+
+    Parameters
+    ----------
+    data : dict
+        Version 2 or later data, see encode().
+    command_types : dict
+        The dictionary of available command types.
+
+    Returns
+    -------
+    Rotation
+        The decoded rotation.
+    """
+    # Parameter names per interned command type, looked up once per type
+    type_table = []
+    for command_type in data.get('command_types', []):
+        params = command_types[command_type].get('params', []) if command_type else []
+        type_table.append((command_type, [param.lower() for param in params]))
+
+    makros = []
+    for keys_data in data.get('makros', []):
+        keys = []
+        for commands_data in keys_data:
+            commands = []
+            for command_data in commands_data:
+                command_type, names = type_table[command_data[0]]
+                values = command_data[1:]
+                parameters = []
+                for i, name in enumerate(names):
+                    if i >= len(values):
+                        parameters.append(Parameter(name))
+                    elif isinstance(values[i], list):
+                        parameters.append(Parameter(name, 'Var', values[i][0]))
+                    else:
+                        parameters.append(Parameter(name, 'Value', values[i]))
+                commands.append(Command(command_type, parameters))
+            keys.append(Key(commands))
+        makros.append(Makro(keys))
+    spells = [SpellSlot(*slot_data) for slot_data in data.get('spells', [])]
+    return Rotation(makros, dict(data.get('variables', {})), spells)
+
+
+def migrate(data, command_types):
+    """
+    Converts version 1 data into current version data.
+
+    This is the only place that understands the version 1 quirks: parameters
+    saved as plain strings by very old releases, and missing or malformed
+    spell lists.
+
+    Parameters
+    ----------
+    data : dict
+        Version 1 data, as written by older releases.
+    command_types : dict
+        The dictionary of available command types.
+
+    Returns
+    -------
+    dict
+        The equivalent current version data.
+    """
+    if not isinstance(data, dict):
+        data = {}
+    for makro_data in data.get('MAKRO', []):
+        for key_data in makro_data.get('Keys', []):
+            for command_data in key_data.get('commands', []):
+                command_data['parameters'] = [
+                    param_data if isinstance(param_data, dict) else {'type': 'Value', 'value': param_data}
+                    for param_data in command_data.get('parameters', [])
+                ]
+    return encode(Rotation.from_dict(data, command_types))
+
+
+def load_data(data, command_types):
+    """
+    Creates a rotation from loaded config data of any supported version.
+
+    Parameters
+    ----------
+    data : dict
+        The parsed config file.
+    command_types : dict
+        The dictionary of available command types.
+
+    Returns
+    -------
+    Rotation
+        The rotation.
+    """
+    if schema_version(data) == 1:
+        data = migrate(data, command_types)
+    return decode(data, command_types)
+
+
+def read_rotation(path, command_types):
+    """
+    Reads a saved config file of any supported version.
+
+    Parameters
+    ----------
+    path : str
+        The config file.
+    command_types : dict
+        The dictionary of available command types.
+
+    Returns
+    -------
+    Rotation
+        The rotation.
+    """
+    with open(path, 'rb') as f:
+        return load_data(loads(f.read()), command_types)
+
+
+def write_rotation(path, rotation, fsync=False):
+    """
+    Saves a rotation in the current version, replacing path atomically.
+
+    Returns
+    -------
+    int
+        The size of the written file in bytes.
+    """
+    data = dumps_rotation(rotation).encode('utf-8')
+    with atomic_writer(path, fsync=fsync, binary=True) as f:
+        f.write(data)
+    return len(data)
+
+
+def main(argv=None):
+    """
+    Command-line entry point rewriting older config files in the current
+    version. Returns the process exit code.
+    """
+    from command_types import command_types
+
+    parser = argparse.ArgumentParser(
+        prog="python -m config_format",
+        description="Rewrite saved rotation configs in the current format."
+    )
+    parser.add_argument('files', nargs='+', help="JSON config files to migrate in place")
+    args = parser.parse_args(argv)
+
+    failures = 0
+    for path in args.files:
+        try:
+            with open(path, 'rb') as f:
+                raw = f.read()
+            data = loads(raw)
+            version = schema_version(data)
+            if version == SCHEMA_VERSION:
+                print(f"{path}: already version {SCHEMA_VERSION}")
+                continue
+            size = write_rotation(path, load_data(data, command_types))
+            print(f"{path}: version {version} -> {SCHEMA_VERSION}, {len(raw)} -> {size} bytes")
+        except (OSError, ValueError, KeyError, IndexError, TypeError) as e:
+            failures += 1
+            print(f"FAILED {path}: {e}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
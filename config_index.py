@@ -0,0 +1,117 @@
+""" config_index.py
+
+Index of the saved configs in a directory, with cached per-file metadata.
+
+Files are found with os.scandir and only re-read when their modification
+time or size changed. For configs with a summary line only that line is
+read; older configs are read in full once. The metadata is kept in a small
+cache file, so unchanged configs are not read again after a restart either.
+"""
+import os
+from app_log import logger
+from config_format import dumps, loads, read_rotation, read_summary, summarize
+from config_writer import atomic_writer
+from edit_journal import SNAPSHOT_PATH
+
+INDEX_PATH = '.config_index.json'
+INDEX_VERSION = 2
+
+# JSON files in the config directory that are not saved configs
+EXCLUDED_FILES = {SNAPSHOT_PATH, INDEX_PATH, 'image_data.json'}
+
+
+class ConfigIndex:
+    def __init__(self, command_types, directory='.', index_path=INDEX_PATH):
+        """
+        Initialize the ConfigIndex class.
+
+        Parameters
+        ----------
+        command_types : dict
+            The dictionary of available command types, used to read configs.
+        directory : str
+            The directory holding the saved configs.
+        index_path : str
+            The cache file for the metadata, relative to directory.
+        """
+        self.command_types = command_types
+        self.directory = directory
+        self.index_path = os.path.join(directory, index_path)
+        self.entries = {}  # File name -> metadata dict, see scan_file
+        self.load_index()
+
+    def load_index(self):
+        """
+        Reads the cached metadata. A missing or outdated cache file is ignored.
+        """
+        try:
+            with open(self.index_path, 'rb') as f:
+                data = loads(f.read())
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get('version') == INDEX_VERSION:
+            self.entries = data.get('files', {})
+
+    def save_index(self):
+        """
+        Writes the cached metadata. Failures only cost a re-read next time.
+        """
+        try:
+            with atomic_writer(self.index_path) as f:
+                f.write(dumps({'version': INDEX_VERSION, 'files': self.entries}))
+        except OSError as e:
+            logger.error("Error saving config index: %s", e)
+
+    def scan_file(self, name, stat):
+        """
+        Returns the metadata of a config file: its modification time and size
+        plus its summary, see config_format.dumps_rotation.
+
+        Only the summary line is read when the config has one. Older configs
+        are read in full and have no 'hash'. Files that cannot be read get an
+        'error' entry instead of a summary, so they are listed but not read
+        again until they change.
+        """
+        entry = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+        path = os.path.join(self.directory, name)
+        try:
+            summary = read_summary(path)
+            if summary is None:
+                summary = summarize(read_rotation(path, self.command_types))
+            entry.update(summary)
+        except Exception as e:
+            entry['error'] = str(e)
+        return entry
+
+    def refresh(self):
+        """
+        Brings the index up to date with the directory.
+
+        Only files whose modification time or size changed since they were
+        indexed are read. Does not touch Tk and can run on a worker thread.
+
+        Returns
+        -------
+        dict
+            File names mapped to their metadata, see scan_file.
+        """
+        entries = {}
+        changed = False
+        with os.scandir(self.directory) as it:
+            for dir_entry in it:
+                name = dir_entry.name
+                if not name.endswith('.json') or name.startswith('.') or name in EXCLUDED_FILES:
+                    continue
+                if not dir_entry.is_file():
+                    continue
+                stat = dir_entry.stat()
+                cached = self.entries.get(name)
+                if cached is not None and cached['mtime_ns'] == stat.st_mtime_ns and cached['size'] == stat.st_size:
+                    entries[name] = cached
+                else:
+                    entries[name] = self.scan_file(name, stat)
+                    changed = True
+        if changed or len(entries) != len(self.entries):
+            self.entries = entries
+            self.save_index()
+        return entries
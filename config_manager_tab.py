@@ -1,7 +1,22 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import json
+import logging
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app_log import logger, log_operation
+from command_types import command_types
+from config_format import read_rotation, write_rotation
+from config_index import ConfigIndex
+from rotation_model import Rotation
+
+# Sort order names mapped to (key function of (name, metadata), reverse)
+SORT_KEYS = {
+    'Name': (lambda name, entry: name.lower(), False),
+    'Last Modified': (lambda name, entry: entry['mtime_ns'], True),
+    'Size': (lambda name, entry: entry['size'], True),
+    'Commands': (lambda name, entry: entry.get('commands', -1), True),
+}
 
 class ConfigManagerTab:
     def __init__(self, notebook, load_config_callback):
@@ -13,15 +28,23 @@ class ConfigManagerTab:
         notebook : ttk.Notebook
             The parent notebook.
         load_config_callback : function
-            A callback function that takes a dictionary of config data as an argument.
+            A callback function that loads the Rotation passed as argument, or
+            returns the current Rotation when called with None.
         """
         
         self.config_frame = ttk.Frame(notebook)
         notebook.add(self.config_frame, text="Config Files")
         
         self.load_config_callback = load_config_callback
-        self.config_files = []
+        self.config_files = []  # File names in listbox order
+        self.config_entries = {}  # File name -> metadata of the last index refresh
         self.current_config = None
+
+        # The index is refreshed on a worker thread so large libraries do not block the UI
+        self.index = ConfigIndex(command_types)
+        self.index_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='config-index')
+        self.refresh_future = None
+        self.refresh_requested = False
         
         self.create_widgets()
         self.load_config_list()
@@ -33,11 +56,31 @@ class ConfigManagerTab:
 
         This function creates the following widgets:
 
-        - A Listbox widget to display the list of config files
+        - A filter entry and a sort order combobox
+        - A Listbox widget to display the list of config files and their metadata
+        - A preview label showing the summary of the selected config
         - Four buttons: New Config, Load Config, Save Current Config, Delete Config
         """
-        self.config_listbox = tk.Listbox(self.config_frame, width=50)
+        filter_frame = ttk.Frame(self.config_frame)
+        filter_frame.pack(fill=tk.X, padx=10, pady=(10, 0))
+
+        ttk.Label(filter_frame, text="Filter:").pack(side=tk.LEFT)
+        self.filter_var = tk.StringVar()
+        self.filter_var.trace_add('write', lambda *args: self.show_config_list())
+        ttk.Entry(filter_frame, textvariable=self.filter_var, width=30).pack(side=tk.LEFT, padx=5)
+
+        ttk.Label(filter_frame, text="Sort by:").pack(side=tk.LEFT, padx=(10, 0))
+        self.sort_combobox = ttk.Combobox(filter_frame, values=list(SORT_KEYS), width=15, state='readonly')
+        self.sort_combobox.set('Name')
+        self.sort_combobox.bind("<<ComboboxSelected>>", lambda event: self.show_config_list())
+        self.sort_combobox.pack(side=tk.LEFT, padx=5)
+
+        self.config_listbox = tk.Listbox(self.config_frame, width=50, font='TkFixedFont', exportselection=False)
         self.config_listbox.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
+        self.config_listbox.bind("<<ListboxSelect>>", lambda event: self.show_preview())
+
+        self.preview_label = ttk.Label(self.config_frame, text="", anchor='w', justify=tk.LEFT, wraplength=900)
+        self.preview_label.pack(fill=tk.X, padx=10)
 
         # Buttons
         button_frame = ttk.Frame(self.config_frame)
@@ -50,31 +93,123 @@ class ConfigManagerTab:
 
     def load_config_list(self):
         """
-        Load the list of config files into the Listbox widget.
+        Refreshes the list of config files in the Listbox widget.
+
+        The config index is brought up to date on a worker thread: it scans
+        the current directory with os.scandir and only reads the configs that
+        changed since they were last indexed. The autosave snapshot and other
+        non-config JSON files are left out. The Listbox is filled by
+        show_config_list once the refresh is done. A refresh requested while
+        one is running is run right after it.
+        """
+        if self.refresh_future is not None:
+            self.refresh_requested = True
+            return
+        self.refresh_future = self.index_executor.submit(self.index.refresh)
+        self.config_frame.after(20, self.poll_config_list)
+
+    def poll_config_list(self):
+        """
+        Waits for the index refresh started by load_config_list and shows its result.
+        """
+        if not self.refresh_future.done():
+            self.config_frame.after(20, self.poll_config_list)
+            return
+        future, self.refresh_future = self.refresh_future, None
+        try:
+            self.config_entries = future.result()
+            self.show_config_list()
+        except OSError as e:
+            logger.error("Error listing configs: %s", e)
+        if self.refresh_requested:
+            self.refresh_requested = False
+            self.load_config_list()
+
+    def show_config_list(self):
+        """
+        Fills the Listbox widget with the indexed config files, keeping the selection.
 
-        This function reads the files in the current directory, filters out
-        non-JSON files and the image_data.json file, and loads the remaining
-        files into the Listbox widget for the user to select from.
+        Only configs matching the filter text are shown: it is matched against
+        the file name and the spell and variable names of the config's summary.
+        The configs are ordered by the selected sort key. Nothing is read from
+        disk, so this runs on every keystroke in the filter entry.
         """
-        self.config_files = [f for f in os.listdir() if f.endswith('.json') and f != 'images/image_data.json']
+        entries = self.config_entries
+        selection = self.get_selected_config()
+        needle = self.filter_var.get().strip().lower()
+        names = [name for name in entries if not needle or needle in self.search_text(name, entries[name])]
+        sort_key, reverse = SORT_KEYS[self.sort_combobox.get()]
+        names.sort(key=lambda name: sort_key(name, entries[name]), reverse=reverse)
+
+        self.config_files = names
         self.config_listbox.delete(0, tk.END)
-        for config in self.config_files:
-            self.config_listbox.insert(tk.END, config)
+        for name in names:
+            self.config_listbox.insert(tk.END, self.describe_config(name, entries[name]))
+        if selection in names:
+            self.config_listbox.selection_set(names.index(selection))
+        self.show_preview()
+
+    def search_text(self, name, entry):
+        """
+        Returns the lower-cased text the filter is matched against for a config.
+        """
+        return ' '.join([name] + entry.get('spells', []) + entry.get('variables', [])).lower()
+
+    def show_preview(self):
+        """
+        Shows the summary of the selected config below the Listbox widget.
+        """
+        name = self.get_selected_config()
+        entry = self.config_entries.get(name)
+        if entry is None or 'error' in entry:
+            self.preview_label.config(text="")
+            return
+        lines = [
+            f"{name}: {entry['makros']} makros, {entry['keys']} keys, {entry['commands']} commands",
+            f"Spells: {', '.join(entry['spells']) or '-'}",
+            f"Variables: {', '.join(entry.get('variables', [])) or '-'}",
+        ]
+        if entry.get('hash'):
+            lines.append(f"Content hash: {entry['hash']}")
+        self.preview_label.config(text='\n'.join(lines))
+
+    def describe_config(self, name, entry):
+        """
+        Returns the Listbox line for a config file: its name, counts, spells, modification time and size.
+
+        :param name: str - The file name.
+        :param entry: dict - The file's metadata, see ConfigIndex.
+        """
+        modified = time.strftime('%Y-%m-%d %H:%M', time.localtime(entry['mtime_ns'] / 1e9))
+        size = f"{entry['size'] / 1024:.1f} KB"
+        if 'error' in entry:
+            return f"{name:<30} unreadable: {entry['error']}  |  {modified}  {size}"
+        spells = ', '.join(entry['spells']) or 'no spells'
+        return (f"{name:<30} {entry['makros']} makros, {entry['keys']} keys, {entry['commands']} commands"
+                f"  |  {modified}  {size}  |  {spells}")
+
+    def get_selected_config(self):
+        """
+        Returns the file name of the selected config, or None if nothing is selected.
+        """
+        selection = self.config_listbox.curselection()
+        if not selection or selection[0] >= len(self.config_files):
+            return None
+        return self.config_files[selection[0]]
 
     def new_config(self):
         """
         Opens a file dialog for the user to select a filename to save a new config file to.
-        If the user selects a filename, it will create a new file with an empty JSON object and
+        If the user selects a filename, it will create a new file with an empty rotation and
         load the new config file into the listbox. It will also set the current config to the
-        new file and call the load_config_callback function with an empty dictionary.
+        new file and call the load_config_callback function with an empty rotation.
         """
         filename = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON files", "*.json")])
         if filename:
-            with open(filename, 'w') as f:
-                json.dump({}, f)
+            write_rotation(filename, Rotation())
             self.load_config_list()
             self.current_config = filename
-            self.load_config_callback({})
+            self.load_config_callback(Rotation())
 
     def load_selected_config(self):
         """
@@ -88,9 +223,9 @@ class ConfigManagerTab:
 
         This function is called when the user clicks the "Load Config" button.
         """
-        if self.config_listbox.curselection():
-            selected_config = self.config_listbox.get(self.config_listbox.curselection())
-            print(f"Selected config: {selected_config}")  # Debug print
+        selected_config = self.get_selected_config()
+        if selected_config:
+            logger.debug("Selected config: %s", selected_config)
             self.load_config(selected_config)
         else:
             messagebox.showinfo("Info", "Please select a configuration file to load.")
@@ -100,9 +235,10 @@ class ConfigManagerTab:
         Loads the selected config file into the application.
 
         If the filename parameter is not None or an empty string, this function
-        will load the selected config file into the application by opening the
-        file and parsing it as a JSON object. It will then call the
-        load_config_callback function with the loaded data. If there is an error
+        will load the selected config file into the application by reading it
+        with config_format, which also converts configs saved by older
+        releases. It will then call the load_config_callback function with the
+        loaded rotation. If there is an error
         loading the configuration file, a message box will appear with an error
         message. If the filename parameter is None or an empty string, this
         function does nothing.
@@ -115,15 +251,17 @@ class ConfigManagerTab:
         """
         if filename:
             try:
-                print(f"Loading config from file: {filename}")  # Debug print
-                with open(filename, 'r') as f:
-                    data = json.load(f)
-                print(f"Loaded data: {data}")  # Debug print
+                logger.debug("Loading config from file: %s", filename)
+                with log_operation('load_file', file=filename) as sizes:
+                    rotation = read_rotation(filename, command_types)
+                    sizes['bytes'] = os.path.getsize(filename)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Loaded data: %r", rotation.to_dict())
                 self.current_config = filename
-                self.load_config_callback(data)
+                self.load_config_callback(rotation)
                 messagebox.showinfo("Success", f"Loaded configuration from {filename}")
             except Exception as e:
-                print(f"Error loading config: {str(e)}")  # Debug print
+                logger.error("Error loading config %s: %s", filename, e)
                 messagebox.showerror("Error", f"Failed to load configuration: {str(e)}")
                 
     def save_current_config(self):
@@ -136,10 +274,10 @@ class ConfigManagerTab:
         load_config method with the selected filename. It will also call the
         load_config_callback function with the loaded data.
 
-        If the current config is set, this function will save the current data
-        from the main app into the current config file by calling the
+        If the current config is set, this function will save the current
+        rotation from the main app into the current config file by calling the
         load_config_callback function with None as the argument, and then
-        writing the loaded data to the current config file. It will then show a
+        writing it in the current config_format version. It will then show a
         message box with a success message.
 
         This function is called when the user clicks the "Save Config" button.
@@ -147,9 +285,9 @@ class ConfigManagerTab:
         if not self.current_config:
             self.current_config = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON files", "*.json")])
         if self.current_config:
-            data = self.load_config_callback(None)  # Get current data from main app
-            with open(self.current_config, 'w') as f:
-                json.dump(data, f)
+            with log_operation('save', file=self.current_config) as sizes:
+                rotation = self.load_config_callback(None)  # Get current rotation from main app
+                sizes['bytes'] = write_rotation(self.current_config, rotation)
             messagebox.showinfo("Success", f"Saved configuration to {self.current_config}")
             self.load_config_list()
 
@@ -162,15 +300,15 @@ class ConfigManagerTab:
         confirms the deletion, it will delete the selected config file and
         reload the list of config files. If the current config is the deleted
         config, it will reset the current config to None and call the
-        load_config_callback function with an empty dictionary.
+        load_config_callback function with an empty rotation.
 
         This function is called when the user clicks the "Delete Config" button.
         """
-        if self.config_listbox.curselection():
-            selected_config = self.config_listbox.get(self.config_listbox.curselection())
+        selected_config = self.get_selected_config()
+        if selected_config:
             if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete {selected_config}?"):
                 os.remove(selected_config)
                 self.load_config_list()
                 if self.current_config == selected_config:
                     self.current_config = None
-                    self.load_config_callback({})
\ No newline at end of file
+                    self.load_config_callback(Rotation())
\ No newline at end of file
@@ -0,0 +1,364 @@
+""" config_optimizer.py
+
+Optional passes over a rotation that make the generated config cheaper for
+the client to evaluate without changing what it does: reorder_conditions
+puts cheap checks first, and peephole removes commands and keys that have
+no effect.
+
+The passes never change the model being edited: they return a new Rotation
+sharing the unchanged Command objects, plus a list of explanations, one per
+change, so every change in the generated config can be traced back.
+"""
+import re
+from command_types import command_types
+from cost_report import DEFAULT_PASS_RATE, JUMP_COMMANDS, command_cost, is_pure_condition, jump_target
+from rotation_model import Command, Key, Makro, Parameter, Rotation, render_config
+
+# Command types without a condition flag whose text may still hold one, e.g.
+# a Custom Command "kd87" or a variable holding "cts123,1"
+OPAQUE_COMMANDS = ('Custom Command', 'Retrieve Variable', 'Call Function')
+
+# A variable value holding a Go To, e.g. endKeyNumber=gt16; any command
+# running the variable jumps to a key number the passes cannot see
+JUMP_VALUE = re.compile(r'(?<![A-Za-z])gt\d+')
+
+
+def condition_rank(cost, pass_rate):
+    """
+    Returns the sort key of a condition in a run of pure conditions.
+
+    For a chain of independent conditions that stops at the first failure,
+    the expected cost is lowest when conditions are sorted by cost divided
+    by the chance of failing. A condition that never fails goes last.
+    """
+    fail_rate = 1.0 - pass_rate
+    if fail_rate <= 0:
+        return float('inf')
+    return cost / fail_rate
+
+
+def reorder_key(commands, types=command_types, pass_rate=None):
+    """
+    Reorders the runs of pure conditions of a key line.
+
+    Other commands, e.g. Press Key, Store Variable, Sleep or Go To, are
+    barriers: they keep their position and no condition moves across them.
+    Within a run, conditions are sorted by condition_rank; ties keep their
+    original order, so the result is deterministic.
+
+    Parameters
+    ----------
+    commands : list[Command]
+        The commands of the key.
+    types : dict
+        The dictionary of available command types.
+    pass_rate : callable, optional
+        Called with the 0-based command index, returns the chance that the
+        condition passes. DEFAULT_PASS_RATE for every condition if not given.
+
+    Returns
+    -------
+    tuple[list[Command], list[tuple[int, list[int]]]]
+        The reordered commands, and for each reordered run its first index
+        and the original indices in their new order.
+    """
+    result = []
+    moves = []
+    index = 0
+    while index < len(commands):
+        if not is_pure_condition(commands[index], types):
+            result.append(commands[index])
+            index += 1
+            continue
+        end = index
+        while end < len(commands) and is_pure_condition(commands[end], types):
+            end += 1
+        run = list(range(index, end))
+        order = sorted(run, key=lambda i: (
+            condition_rank(command_cost(commands[i], types)[0], pass_rate(i) if pass_rate else DEFAULT_PASS_RATE), i
+        ))
+        if order != run:
+            moves.append((index, order))
+        result.extend(commands[i] for i in order)
+        index = end
+    return result, moves
+
+
+def reorder_conditions(rotation, types=command_types, pass_rates=None):
+    """
+    Returns a copy of a rotation whose key lines check their cheapest and
+    most often failing conditions first. See reorder_key.
+
+    Parameters
+    ----------
+    rotation : Rotation
+        The rotation to optimize. It is not changed.
+    types : dict
+        The dictionary of available command types.
+    pass_rates : dict, optional
+        Measured pass rates of conditions, keyed by 1-based (makro, key,
+        command) numbers. Conditions without one use DEFAULT_PASS_RATE.
+
+    Returns
+    -------
+    tuple[Rotation, list[str]]
+        The optimized rotation and one explanation per reordered run.
+    """
+    pass_rates = pass_rates or {}
+    makros = []
+    explanations = []
+    for makro_number, makro in enumerate(rotation.makros, start=1):
+        keys = []
+        for key_number, key in enumerate(makro.keys, start=1):
+            def pass_rate(index, makro_number=makro_number, key_number=key_number):
+                return pass_rates.get((makro_number, key_number, index + 1), DEFAULT_PASS_RATE)
+
+            commands, moves = reorder_key(key.commands, types, pass_rate)
+            if not moves:
+                keys.append(key)
+                continue
+            keys.append(Key(commands))
+            for start, order in moves:
+                described = ", ".join(
+                    f"#{i + 1} '{key.commands[i].command_type}' (cost {command_cost(key.commands[i], types)[0]:g}, "
+                    f"passes {pass_rate(i):.0%})"
+                    for i in order
+                )
+                explanations.append(
+                    f"Makro {makro_number}, key {key_number}: commands {start + 1}-{start + len(order)} "
+                    f"now run as {described}"
+                )
+        makros.append(Makro(keys))
+    return Rotation(makros, rotation.variables, rotation.spells), explanations
+
+
+def reads_variable(command, name):
+    """
+    Returns True if any value parameter of a command may read the variable
+    name. The first parameter, the name a command stores to, is not read.
+    """
+    for parameter in command.parameters[1:]:
+        if parameter.value == name or f"(VAR % {name})" in parameter.value:
+            return True
+    return False
+
+
+def peephole_key(commands):
+    """
+    Simplifies the commands of a key line.
+
+    No Operation commands and commands without a type are dropped, runs of
+    Sleeps with literal durations become one Sleep, a Store Variable
+    directly followed by another store to the same literal name that does
+    not read it is dropped, and commands after a Go To are dropped since
+    they never run. Commands of the model are never changed; merged Sleeps
+    are new commands.
+
+    Parameters
+    ----------
+    commands : list[Command]
+        The commands of the key.
+
+    Returns
+    -------
+    tuple[list[Command], list[str]]
+        The simplified commands and a description of each change.
+    """
+    result = []
+    notes = []
+    for number, command in enumerate(commands, start=1):
+        command_type = command.command_type
+        if not command_type:
+            continue
+        if command_type == 'No Operation':
+            notes.append(f"dropped No Operation #{number}")
+            continue
+        previous = result[-1] if result else None
+        if (command_type == 'Sleep' and previous is not None and previous.command_type == 'Sleep'
+                and previous.parameters[0].type == 'Value' and previous.parameters[0].value.isdigit()
+                and command.parameters[0].type == 'Value' and command.parameters[0].value.isdigit()):
+            total = int(previous.parameters[0].value) + int(command.parameters[0].value)
+            result[-1] = Command('Sleep', [Parameter(previous.parameters[0].name, 'Value', str(total))])
+            notes.append(f"merged Sleep #{number} into the Sleep before it ({total} ms)")
+            continue
+        if (command_type == 'Store Variable' and previous is not None and previous.command_type == 'Store Variable'
+                and previous.parameters[0].type == 'Value'
+                and command.parameters[0].signature() == previous.parameters[0].signature()
+                and not reads_variable(command, previous.parameters[0].value)):
+            result[-1] = command
+            notes.append(f"dropped the Store Variable before #{number}, overwritten by it")
+            continue
+        result.append(command)
+        if command_type in JUMP_COMMANDS:
+            if number < len(commands):
+                notes.append(f"dropped {len(commands) - number} command(s) after the Go To #{number}")
+            break
+    return result, notes
+
+
+def may_fail(command, types=command_types):
+    """
+    Returns True if a command may skip the rest of its key line: conditions,
+    opaque commands (see OPAQUE_COMMANDS) and commands of unknown type.
+    """
+    spec = types.get(command.command_type)
+    return spec is None or spec.get('condition', False) or command.command_type in OPAQUE_COMMANDS
+
+
+def ends_with_unconditional_jump(commands, types=command_types):
+    """
+    Returns True if a simplified key line always jumps: it ends in a Go To
+    and no command before it may fail, see may_fail.
+    """
+    if not commands or commands[-1].command_type not in JUMP_COMMANDS:
+        return False
+    return not any(may_fail(command, types) for command in commands[:-1])
+
+
+def has_hidden_jumps(keys, variables, types=command_types):
+    """
+    Returns True if a makro may jump without a literal Go To: it has an
+    opaque command or a command of unknown type, or a variable holds a Go
+    To. Variables are checked whether or not the makro names them, since a
+    condition such as Check Range runs a variable given as a literal value.
+    """
+    if any(JUMP_VALUE.search(value) for value in variables.values()):
+        return True
+    return any(command.command_type in OPAQUE_COMMANDS or command.command_type not in types
+               for commands in keys for command in commands)
+
+
+def reachable_keys(keys, types=command_types, variables=None):
+    """
+    Returns the 0-based indices of the keys a pass can reach.
+
+    A pass starts at the first key; a key can be reached from the key before
+    it unless that one always jumps, and from every Go To targeting it. If a
+    Go To of the makro has a target that is not a literal number, or the
+    makro may jump otherwise (see has_hidden_jumps), every key counts as
+    reachable.
+    """
+    if has_hidden_jumps(keys, variables or {}, types):
+        return set(range(len(keys)))
+    targets = []
+    for commands in keys:
+        if commands and commands[-1].command_type in JUMP_COMMANDS:
+            target = jump_target(commands[-1])
+            if target is None:
+                return set(range(len(keys)))
+            targets.append(target - 1)
+        else:
+            targets.append(None)
+
+    reachable = set()
+    pending = [0] if keys else []
+    while pending:
+        index = pending.pop()
+        if index in reachable or not 0 <= index < len(keys):
+            continue
+        reachable.add(index)
+        if targets[index] is not None:
+            pending.append(targets[index])
+        if not ends_with_unconditional_jump(keys[index], types):
+            pending.append(index + 1)
+    return reachable
+
+
+def renumber_jump(command, kept):
+    """
+    Returns a Go To command whose literal target is renumbered for the kept
+    keys, given as their sorted 0-based old indices. Targets past the last
+    key stay past it.
+    """
+    target = jump_target(command)
+    if target is None:
+        return command
+    new_target = 1 + sum(1 for index in kept if index < target - 1)
+    if new_target == target:
+        return command
+    return Command(command.command_type, [Parameter(command.parameters[0].name, 'Value', str(new_target))])
+
+
+def peephole(rotation, types=command_types):
+    """
+    Returns a copy of a rotation without commands and keys that have no
+    effect, see peephole_key and reachable_keys.
+
+    Unreachable keys are removed and the Go To targets of the remaining
+    keys are renumbered, since keys are numbered by position. Makros that
+    may jump to a key number the pass cannot renumber keep all their keys.
+
+    Parameters
+    ----------
+    rotation : Rotation
+        The rotation to optimize. It is not changed.
+    types : dict
+        The dictionary of available command types.
+
+    Returns
+    -------
+    tuple[Rotation, list[str]]
+        The optimized rotation and one explanation per changed key or makro.
+    """
+    makros = []
+    explanations = []
+    for makro_number, makro in enumerate(rotation.makros, start=1):
+        keys = []
+        for key_number, key in enumerate(makro.keys, start=1):
+            commands, notes = peephole_key(key.commands)
+            keys.append(commands)
+            if notes:
+                explanations.append(f"Makro {makro_number}, key {key_number}: " + "; ".join(notes))
+
+        kept = sorted(reachable_keys(keys, types, rotation.variables))
+        if len(kept) < len(keys):
+            removed = [index + 1 for index in range(len(keys)) if index not in kept]
+            explanations.append(
+                f"Makro {makro_number}: removed unreachable key(s) {', '.join(map(str, removed))} "
+                f"and renumbered the Go To targets"
+            )
+            renumbered = []
+            for index in kept:
+                commands = keys[index]
+                if commands and commands[-1].command_type in JUMP_COMMANDS:
+                    commands = commands[:-1] + [renumber_jump(commands[-1], kept)]
+                renumbered.append(commands)
+            keys = renumbered
+        makros.append(Makro([Key(commands) for commands in keys]))
+    return Rotation(makros, rotation.variables, rotation.spells), explanations
+
+
+def command_count(rotation):
+    """
+    Returns the number of commands with a type, the ones that are generated.
+    """
+    return sum(1 for makro in rotation.makros for key in makro.keys for command in key.commands
+               if command.command_type)
+
+
+def optimization_summary(original, optimized, templates, optimized_size=None):
+    """
+    Returns a before/after summary of the generated size and command count.
+
+    Parameters
+    ----------
+    original, optimized : Rotation
+        The rotation before and after the optimization passes.
+    templates : dict[str, CommandTemplate]
+        The compiled command templates, used to render the configs.
+    optimized_size : int, optional
+        The size of the optimized config if it was already generated.
+
+    Returns
+    -------
+    str
+        The summary.
+    """
+    def skip(command, e):
+        pass  # Failing commands are reported when the config is generated
+
+    original_size = len(render_config(original, templates, skip))
+    if optimized_size is None:
+        optimized_size = len(render_config(optimized, templates, skip))
+    return (f"{original_size} -> {optimized_size} characters, "
+            f"{command_count(original)} -> {command_count(optimized)} commands")
@@ -0,0 +1,88 @@
+""" config_writer.py
+
+Streams generated configs to disk atomically.
+
+The text is written to a temp file next to the target and renamed over it,
+so a crash or a game client reading the file never sees a half-written
+rotation_config.txt.
+"""
+import os
+from contextlib import contextmanager
+from rotation_model import iter_config
+
+DEFAULT_CONFIG_PATH = "rotation_config.txt"
+
+
+@contextmanager
+def atomic_writer(path, fsync=False, buffer_size=64 * 1024, binary=False):
+    """
+    Context manager yielding a buffered file that replaces path on success.
+
+    The file is a temp file in the directory of path. When the body ends
+    without an exception, it is flushed, optionally fsynced, and renamed over
+    path. On an exception the temp file is removed and path is left untouched.
+
+    Parameters
+    ----------
+    path : str
+        The file to replace.
+    fsync : bool
+        Whether to fsync the file (and, where supported, its directory) before
+        and after the rename, making the new content durable across a power loss.
+    buffer_size : int
+        The write buffer size in bytes.
+    binary : bool
+        Whether to yield a binary file instead of a text file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    temp_path = os.path.join(directory, f".{os.path.basename(path)}.{os.getpid()}.tmp")
+    f = open(temp_path, 'wb' if binary else 'w', buffering=buffer_size)
+    try:
+        yield f
+        f.flush()
+        if fsync:
+            os.fsync(f.fileno())
+        f.close()
+        os.replace(temp_path, path)
+    except BaseException:
+        f.close()
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    if fsync and hasattr(os, 'O_DIRECTORY'):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def write_config(rotation, templates, path=DEFAULT_CONFIG_PATH, on_error=None, fsync=False):
+    """
+    Streams the rotation_config.txt text of a rotation into path atomically.
+
+    Parameters
+    ----------
+    rotation : Rotation
+        The rotation to render.
+    templates : dict[str, CommandTemplate]
+        The compiled command templates, see command_templates.
+    path : str
+        The file to write, e.g. rotation_config.txt in a client's directory.
+    on_error : callable, optional
+        Passed on to render_key.
+    fsync : bool
+        Passed on to atomic_writer.
+
+    Returns
+    -------
+    int
+        The number of characters written.
+    """
+    written = 0
+    with atomic_writer(path, fsync=fsync) as f:
+        for chunk in iter_config(rotation, templates, on_error):
+            written += f.write(chunk)
+    return written
@@ -0,0 +1,247 @@
+""" cost_report.py
+
+Static estimate of how much work the client does per pass over a rotation.
+
+Every command type in command_types has a "cost": its relative evaluation
+cost, 1 being a variable compare, with hotbar and status checks a few units
+and entity scans and pixel reads tens to a hundred. Conditions are marked
+with "condition": True; when one fails, the client skips the rest of the key
+line. Conditions are pure unless marked with "pure": False, like
+'Wait for Hotbar Slot', which waits.
+
+For each key the report gives the worst case, where every condition passes
+and every command is evaluated, and the expected case, where each condition
+passes with a fixed probability. Forward Go To jumps move the chance of
+reaching a key past the keys they skip; a backward jump is counted as the
+end of the pass. Keys checking an expensive condition before a cheaper one
+in the same run of conditions are flagged, since swapping them saves work
+whenever the cheap check fails.
+
+Usage:
+    python -m cost_report my_config.json
+    python -m cost_report my_config.json --pass-rate 0.3
+"""
+import argparse
+import sys
+from command_types import command_types
+from config_format import read_rotation
+
+# Command types ending the key line with a jump to a key number
+JUMP_COMMANDS = ('Go To', 'Go To Line')
+
+DEFAULT_PASS_RATE = 0.5
+
+
+def command_cost(command, types=command_types):
+    """
+    Returns the cost of a command and whether it is a condition.
+
+    Commands without a type cost nothing; unknown types cost 1.
+
+    Returns
+    -------
+    tuple[float, bool]
+        The cost and the condition flag.
+    """
+    if not command.command_type:
+        return 0, False
+    spec = types.get(command.command_type, {})
+    return spec.get('cost', 1), spec.get('condition', False)
+
+
+def is_pure_condition(command, types=command_types):
+    """
+    Returns True if a command is a condition without side effects, so it
+    can be evaluated in any order with the conditions next to it.
+    """
+    spec = types.get(command.command_type, {})
+    return bool(spec.get('condition', False) and spec.get('pure', True))
+
+
+def jump_target(command):
+    """
+    Returns the key number a Go To command jumps to, or None if it is not a
+    jump or its target is not a literal number.
+    """
+    if command.command_type not in JUMP_COMMANDS or not command.parameters:
+        return None
+    parameter = command.parameters[0]
+    if parameter.type == 'Var' or not parameter.value.isdigit():
+        return None
+    return int(parameter.value)
+
+
+class KeyCost:
+    """
+    The estimated evaluation cost of one key line per pass.
+
+    Attributes
+    ----------
+    worst_conditions, worst_cost : float
+        Conditions evaluated and total cost when every condition passes.
+    expected_conditions, expected_cost : float
+        The same when each condition passes with the pass rate.
+    jump : int or None
+        The key number the line's Go To jumps to, if it has one with a
+        literal target. Commands after a Go To are not counted.
+    jump_chance : float
+        The chance that a Go To is reached, 0 if the line has none.
+    ordering : list[tuple[int, int]]
+        1-based command numbers (i, j) where pure condition i is more
+        expensive than the later pure condition j with no other command
+        between them.
+    """
+    __slots__ = ('worst_conditions', 'worst_cost', 'expected_conditions', 'expected_cost',
+                 'jump', 'jump_chance', 'ordering')
+
+    def __init__(self):
+        self.worst_conditions = 0
+        self.worst_cost = 0
+        self.expected_conditions = 0.0
+        self.expected_cost = 0.0
+        self.jump = None
+        self.jump_chance = 0.0
+        self.ordering = []
+
+
+def key_cost(key, pass_rate=DEFAULT_PASS_RATE, types=command_types):
+    """
+    Estimates the cost of evaluating a key line once.
+
+    Parameters
+    ----------
+    key : Key
+        The key to estimate.
+    pass_rate : float
+        The chance that a condition passes.
+    types : dict
+        The dictionary of available command types.
+
+    Returns
+    -------
+    KeyCost
+        The estimate.
+    """
+    result = KeyCost()
+    reach = 1.0  # Chance that the current command is evaluated
+    run = []  # (command number, cost) of the pure conditions since the last other command
+    for number, command in enumerate(key.commands, start=1):
+        cost, condition = command_cost(command, types)
+        result.worst_cost += cost
+        result.expected_cost += reach * cost
+        if condition:
+            result.worst_conditions += 1
+            result.expected_conditions += reach
+            reach *= pass_rate
+        if is_pure_condition(command, types):
+            for earlier, earlier_cost in run:
+                if earlier_cost > cost:
+                    result.ordering.append((earlier, number))
+                    break
+            run.append((number, cost))
+        elif command.command_type:
+            run = []
+            if command.command_type in JUMP_COMMANDS:
+                # The rest of the line is never evaluated
+                result.jump = jump_target(command)
+                result.jump_chance = reach
+                break
+    return result
+
+
+def makro_cost(makro, pass_rate=DEFAULT_PASS_RATE, types=command_types):
+    """
+    Estimates the cost of one pass over a makro.
+
+    Returns
+    -------
+    tuple[list[KeyCost], list[float]]
+        The estimate of each key and the chance that each key is reached.
+    """
+    costs = [key_cost(key, pass_rate, types) for key in makro.keys]
+    reach = [0.0] * len(costs)
+    if costs:
+        reach[0] = 1.0
+    for index, cost in enumerate(costs):
+        chance = reach[index]
+        jumped = chance * cost.jump_chance  # Jumps to unknown or earlier keys end the pass
+        if index + 1 < len(costs):
+            reach[index + 1] += chance - jumped
+        if cost.jump is not None and index < cost.jump - 1 < len(costs):
+            reach[cost.jump - 1] += jumped
+    return costs, reach
+
+
+def cost_report(rotation, pass_rate=DEFAULT_PASS_RATE, types=command_types):
+    """
+    Returns the cost report of a rotation as text lines.
+
+    Parameters
+    ----------
+    rotation : Rotation
+        The rotation to estimate.
+    pass_rate : float
+        The chance that a condition passes.
+    types : dict
+        The dictionary of available command types.
+
+    Returns
+    -------
+    list[str]
+        The report.
+    """
+    lines = [f"Costs per pass, conditions passing with chance {pass_rate:g} (1 = one variable compare)"]
+    for makro_number, makro in enumerate(rotation.makros, start=1):
+        costs, reach = makro_cost(makro, pass_rate, types)
+        worst_conditions = sum(cost.worst_conditions for cost in costs)
+        worst_cost = sum(cost.worst_cost for cost in costs)
+        expected_conditions = sum(chance * cost.expected_conditions for chance, cost in zip(reach, costs))
+        expected_cost = sum(chance * cost.expected_cost for chance, cost in zip(reach, costs))
+        lines.append("")
+        lines.append(f"Makro {makro_number}: worst {worst_conditions} conditions / cost {worst_cost:g}, "
+                     f"expected {expected_conditions:.1f} conditions / cost {expected_cost:.1f}")
+        for key_number, (cost, chance) in enumerate(zip(costs, reach), start=1):
+            lines.append(f"  key {key_number:>3}: worst {cost.worst_conditions:>3} / {cost.worst_cost:>6g}  "
+                         f"expected {chance * cost.expected_conditions:>6.2f} / {chance * cost.expected_cost:>8.2f}  "
+                         f"reached {chance:.0%}")
+            commands = makro.keys[key_number - 1].commands
+            for earlier, later in cost.ordering:
+                lines.append(
+                    f"    reorder: '{commands[earlier - 1].command_type}' (#{earlier}, cost "
+                    f"{command_cost(commands[earlier - 1], types)[0]:g}) is checked before the cheaper "
+                    f"'{commands[later - 1].command_type}' (#{later}, cost {command_cost(commands[later - 1], types)[0]:g})"
+                )
+    return lines
+
+
+def main(argv=None):
+    """
+    Command-line entry point. Returns the process exit code.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m cost_report",
+        description="Estimate the per-pass evaluation cost of saved rotation configs."
+    )
+    parser.add_argument('inputs', nargs='+', help="JSON config files")
+    parser.add_argument('--pass-rate', type=float, default=DEFAULT_PASS_RATE,
+                        help=f"chance that a condition passes (default: {DEFAULT_PASS_RATE})")
+    args = parser.parse_args(argv)
+    if not 0 <= args.pass_rate <= 1:
+        parser.error("--pass-rate must be between 0 and 1")
+
+    failures = 0
+    for path in args.inputs:
+        try:
+            rotation = read_rotation(path, command_types)
+        except (OSError, ValueError, KeyError, IndexError, TypeError) as e:
+            failures += 1
+            print(f"FAILED {path}: {e}", file=sys.stderr)
+            continue
+        print(f"{path}:")
+        for line in cost_report(rotation, args.pass_rate):
+            print(line)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,341 @@
+""" edit_journal.py
+
+Crash-safe autosave for the working state.
+
+Edits are appended to a journal file next to the config_data.json snapshot,
+one JSON object per line, so an autosave writes only what changed. The
+journal starts with a header holding the hash of the snapshot it applies to.
+Compaction writes a new snapshot and starts a new journal; if the process
+dies between the two steps, the header no longer matches the snapshot and
+the stale journal is ignored instead of being applied twice.
+"""
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from app_log import logger
+from config_format import dumps_rotation, load_data, loads
+from config_writer import atomic_writer
+from rotation_model import Command, Key, Makro, SpellSlot
+
+SNAPSHOT_PATH = 'config_data.json'
+JOURNAL_PATH = 'config_data.journal'
+
+
+def snapshot_hash(data):
+    """
+    Returns the hash identifying a snapshot's content, given as bytes.
+    """
+    return hashlib.sha1(data).hexdigest()
+
+
+def apply_entry(rotation, entry, command_types):
+    """
+    Applies one journal entry to a rotation.
+
+    Parameters
+    ----------
+    rotation : Rotation
+        The rotation to change in place.
+    entry : dict
+        The journal entry, see EditJournal.
+    command_types : dict
+        The dictionary of available command types.
+
+    Raises
+    ------
+    KeyError, IndexError
+        If the entry does not fit the rotation.
+    """
+    op = entry['op']
+    makros = rotation.makros
+    if op == 'set_command':
+        makros[entry['makro']].keys[entry['key']].commands[entry['index']] = Command.from_dict(entry['data'], command_types)
+    elif op == 'add_command':
+        makros[entry['makro']].keys[entry['key']].commands.append(Command.from_dict(entry['data'], command_types))
+    elif op == 'remove_command':
+        del makros[entry['makro']].keys[entry['key']].commands[entry['index']]
+    elif op == 'add_key':
+        makros[entry['makro']].keys.append(Key.from_dict(entry['data'], command_types))
+    elif op == 'remove_key':
+        makros[entry['makro']].keys.pop()
+    elif op == 'add_makro':
+        makros.append(Makro.from_dict(entry['data'], command_types))
+    elif op == 'remove_makro':
+        del makros[entry['makro']]
+    elif op == 'set_variable':
+        rotation.variables[entry['name']] = entry['value']
+    elif op == 'remove_variable':
+        rotation.variables.pop(entry['name'], None)
+        # The editors clear the selections of a removed variable without journaling them
+        for makro in makros:
+            for key in makro.keys:
+                key.clear_missing_variables(rotation.variables)
+    elif op == 'set_spell':
+        spells = rotation.spells
+        while len(spells) < entry['slot']:
+            spells.append(SpellSlot())
+        spells[entry['slot'] - 1] = SpellSlot.from_dict(entry['data'])
+    else:
+        raise KeyError(op)
+
+
+class EditJournal:
+    def __init__(self, locate_makro, command_types, snapshot_path=SNAPSHOT_PATH, journal_path=JOURNAL_PATH,
+                 fsync=False, compact_after=2000):
+        """
+        Initialize the EditJournal class.
+
+        Parameters
+        ----------
+        locate_makro : callable
+            Returns the index of a Makro model in the rotation.
+        command_types : dict
+            The dictionary of available command types, used when replaying.
+        snapshot_path : str
+            The snapshot file, a saved config in the config_format format.
+        journal_path : str
+            The append-only journal file.
+        fsync : bool
+            Whether flush() also fsyncs the journal.
+        compact_after : int
+            Number of journal entries after which needs_compaction() is True.
+        """
+        self.locate_makro = locate_makro
+        self.command_types = command_types
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path
+        self.fsync = fsync
+        self.compact_after = compact_after
+        self.pending = []  # Entries not yet written to the journal
+        self.entry_count = 0  # Entries in the journal file
+        self.pause_count = 0
+        self.file = None  # Journal opened for appending, None until the journal is started
+        self.key_listeners = []  # Called with (makro, key) for each edit of the keys of a makro
+
+    def add_key_listener(self, callback):
+        """
+        Adds a function called with (makro, key) for each edit of a command of
+        key, or with (makro, None) when a key was added or removed, even while
+        paused.
+        """
+        self.key_listeners.append(callback)
+
+    def key_edited(self, makro, key=None):
+        """
+        Calls the key listeners for an edit of makro.
+        """
+        for callback in self.key_listeners:
+            callback(makro, key)
+
+    @contextmanager
+    def paused(self):
+        """
+        Context manager ignoring edits, e.g. while a config is loaded.
+        """
+        self.pause_count += 1
+        try:
+            yield
+        finally:
+            self.pause_count -= 1
+
+    def record(self, op, **fields):
+        """
+        Queues a journal entry for the next flush().
+
+        A 'set_command' entry replaces a pending entry for the same command,
+        so typing into a parameter entry only writes the final state.
+        """
+        if self.pause_count:
+            return
+        fields['op'] = op
+        if op == 'set_command' and self.pending:
+            last = self.pending[-1]
+            if (last['op'] == 'set_command' and last['makro'] == fields['makro']
+                    and last['key'] == fields['key'] and last['index'] == fields['index']):
+                self.pending[-1] = fields
+                return
+        self.pending.append(fields)
+
+    def command_changed(self, makro, key_index, command):
+        """
+        Records the new state of a command, e.g. after a parameter was edited.
+        """
+        self.key_edited(makro, makro.keys[key_index])
+        index = makro.keys[key_index].commands.index(command)
+        self.record('set_command', makro=self.locate_makro(makro), key=key_index, index=index,
+                    data=command.to_dict())
+
+    def command_added(self, makro, key_index, command):
+        """
+        Records a command appended to a key.
+        """
+        self.key_edited(makro, makro.keys[key_index])
+        self.record('add_command', makro=self.locate_makro(makro), key=key_index, data=command.to_dict())
+
+    def command_removed(self, makro, key_index, index):
+        """
+        Records the removal of the command at index from a key.
+        """
+        self.key_edited(makro, makro.keys[key_index])
+        self.record('remove_command', makro=self.locate_makro(makro), key=key_index, index=index)
+
+    def key_added(self, makro, key):
+        """
+        Records a key appended to a makro.
+        """
+        self.key_edited(makro)
+        self.record('add_key', makro=self.locate_makro(makro), data=key.to_dict())
+
+    def key_removed(self, makro):
+        """
+        Records the removal of the last key of a makro.
+        """
+        self.key_edited(makro)
+        self.record('remove_key', makro=self.locate_makro(makro))
+
+    def makro_added(self, makro):
+        """
+        Records a makro appended to the rotation.
+        """
+        self.record('add_makro', data=makro.to_dict())
+
+    def makro_removed(self, index):
+        """
+        Records the removal of the makro at index.
+        """
+        self.record('remove_makro', makro=index)
+
+    def variable_set(self, name, value):
+        """
+        Records a variable that was added or changed.
+        """
+        self.record('set_variable', name=name, value=value)
+
+    def variable_removed(self, name):
+        """
+        Records a removed variable.
+        """
+        self.record('remove_variable', name=name)
+
+    def spell_slot_changed(self, slot_number, slot):
+        """
+        Records the new state of the spell slot with the given 1-based number.
+        """
+        self.record('set_spell', slot=slot_number, data=slot.to_dict())
+
+    def flush(self):
+        """
+        Appends the pending entries to the journal. Cost depends only on the
+        size of the edits since the last flush.
+
+        Returns
+        -------
+        int
+            The number of entries written.
+        """
+        if not self.pending or self.file is None:
+            return 0
+        pending, self.pending = self.pending, []
+        self.file.write(''.join(json.dumps(entry) + '\n' for entry in pending))
+        self.file.flush()
+        if self.fsync:
+            os.fsync(self.file.fileno())
+        self.entry_count += len(pending)
+        return len(pending)
+
+    def needs_compaction(self):
+        """
+        Returns True when the journal got long enough to be folded into a new snapshot.
+        """
+        return self.entry_count >= self.compact_after
+
+    def start(self, digest):
+        """
+        Starts an empty journal for the snapshot with the given hash.
+        """
+        if self.file is not None:
+            self.file.close()
+        self.pending = []
+        self.entry_count = 0
+        with atomic_writer(self.journal_path, fsync=self.fsync) as f:
+            f.write(json.dumps({'snapshot': digest}) + '\n')
+        self.file = open(self.journal_path, 'a')
+
+    def compact(self, rotation):
+        """
+        Writes the rotation as the new snapshot and starts an empty journal for it.
+
+        Parameters
+        ----------
+        rotation : Rotation
+            The complete current rotation.
+
+        Returns
+        -------
+        int
+            The size of the snapshot in bytes.
+        """
+        data = dumps_rotation(rotation).encode('utf-8')
+        with atomic_writer(self.snapshot_path, fsync=self.fsync, binary=True) as f:
+            f.write(data)
+        self.start(snapshot_hash(data))
+        return len(data)
+
+    def load(self):
+        """
+        Reads the snapshot and replays the journal onto it.
+
+        Replay stops at the first entry that cannot be read or applied, e.g.
+        a line cut short by a crash. When entries were replayed, the result is
+        compacted into a new snapshot; otherwise an empty journal is started.
+
+        Returns
+        -------
+        Rotation or None
+            The recovered rotation, or None if there is no snapshot. The
+            journal is not started in that case; call compact() with the
+            current rotation.
+        """
+        try:
+            with open(self.snapshot_path, 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return None
+        rotation = load_data(loads(raw), self.command_types)
+        digest = snapshot_hash(raw)
+
+        replayed = 0
+        try:
+            with open(self.journal_path, 'r') as f:
+                header = json.loads(f.readline() or '{}')
+                if header.get('snapshot') == digest:
+                    for line in f:
+                        try:
+                            apply_entry(rotation, json.loads(line), self.command_types)
+                        except (ValueError, KeyError, IndexError, TypeError) as e:
+                            logger.warning("Stopped journal replay after %d entries: %s", replayed, e)
+                            break
+                        replayed += 1
+                else:
+                    logger.info("Ignoring journal of an older snapshot")
+        except FileNotFoundError:
+            pass
+        except ValueError as e:
+            logger.warning("Ignoring unreadable journal: %s", e)
+
+        if replayed:
+            logger.info("Recovered %d edits from the journal", replayed)
+            self.compact(rotation)
+        else:
+            self.start(digest)
+        return rotation
+
+    def close(self):
+        """
+        Writes the pending entries and closes the journal.
+        """
+        self.flush()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
@@ -0,0 +1,131 @@
+""" icon_cache.py
+
+Two-level cache for spell icon thumbnails: an in-memory LRU of ready
+PhotoImages and an on-disk cache of pre-resized PNGs.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from PIL import Image, ImageTk
+from app_log import logger
+
+
+class IconCache:
+    def __init__(self, cache_dir='.icon_cache', max_photos=64):
+        """
+        Initialize the IconCache class.
+
+        Parameters
+        ----------
+        cache_dir : str
+            Directory for the pre-resized thumbnails. Created on first write.
+        max_photos : int
+            Maximum number of PhotoImages kept in memory.
+        """
+        self.cache_dir = cache_dir
+        self.max_photos = max_photos
+        self.photos = OrderedDict()  # (path, size) -> ImageTk.PhotoImage
+
+    @staticmethod
+    def normalize_path(path):
+        """
+        Returns the path with Windows separators from image_data.json replaced
+        by the separators of the running platform.
+        """
+        return os.path.normpath(path.replace('\\', '/'))
+
+    def thumbnail_path(self, path, size, stat):
+        """
+        Returns the on-disk thumbnail path for a source image.
+
+        The source's mtime and file size are part of the name, so a changed
+        source never matches an old thumbnail.
+        """
+        digest = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(
+            self.cache_dir, f"{digest}_{size[0]}x{size[1]}_{stat.st_mtime_ns}_{stat.st_size}.png"
+        )
+
+    def load_image(self, path, size=(32, 32)):
+        """
+        Returns the source image resized to size as a PIL image.
+
+        The resized image is read from the disk cache when it is up to date,
+        otherwise the source is decoded, resized with LANCZOS and written to
+        the disk cache. This does not touch Tk and can run on any thread.
+
+        Parameters
+        ----------
+        path : str
+            The source image path.
+        size : tuple[int, int]
+            The thumbnail size.
+
+        Returns
+        -------
+        PIL.Image.Image
+            The resized image.
+        """
+        path = self.normalize_path(path)
+        stat = os.stat(path)
+        thumbnail_path = self.thumbnail_path(path, size, stat)
+        try:
+            with Image.open(thumbnail_path) as cached:
+                cached.load()
+                return cached.copy()
+        except (OSError, ValueError):
+            pass  # Not cached yet, or the cached file is unreadable
+
+        with Image.open(path) as source:
+            image = source.resize(size, Image.LANCZOS)
+        self.store_thumbnail(thumbnail_path, image)
+        return image
+
+    def store_thumbnail(self, thumbnail_path, image):
+        """
+        Writes a thumbnail to the disk cache and removes outdated thumbnails of
+        the same source and size. Failures only cost a cache miss next time.
+        """
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            prefix = os.path.basename(thumbnail_path).rsplit('_', 2)[0] + '_'
+            for name in os.listdir(self.cache_dir):
+                if name.startswith(prefix) and name.endswith('.png'):
+                    try:
+                        os.remove(os.path.join(self.cache_dir, name))
+                    except FileNotFoundError:
+                        pass
+            temp_path = f"{thumbnail_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            image.save(temp_path, format='PNG')
+            os.replace(temp_path, thumbnail_path)
+        except OSError as e:
+            logger.warning("Error caching thumbnail %s: %s", thumbnail_path, e)
+
+    def get_cached_photo(self, path, size=(32, 32)):
+        """
+        Returns the PhotoImage for (path, size) from memory, or None if it is not cached.
+        """
+        key = (self.normalize_path(path), size)
+        photo = self.photos.get(key)
+        if photo is not None:
+            self.photos.move_to_end(key)
+        return photo
+
+    def put_photo(self, path, image, size=(32, 32)):
+        """
+        Creates a PhotoImage from a PIL image and keeps it in the in-memory LRU.
+        Must run on the Tk thread.
+
+        Returns
+        -------
+        ImageTk.PhotoImage
+            The created PhotoImage.
+        """
+        key = (self.normalize_path(path), size)
+        photo = ImageTk.PhotoImage(image)
+        self.photos[key] = photo
+        self.photos.move_to_end(key)
+        while len(self.photos) > self.max_photos:
+            self.photos.popitem(last=False)
+        return photo
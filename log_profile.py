@@ -0,0 +1,308 @@
+""" log_profile.py
+
+Profile-guided optimization from client console logs.
+
+Free-form dbg messages cannot be told apart reliably, so profiling uses an
+instrumented build of the config: instrument() adds a probe message
+"dbg % prof:M.K.0" at the start of every key line and "dbg % prof:M.K.C"
+right after every condition C, so the client logs each line it evaluates and
+each condition that passed. Key and makro numbers are those of the original
+rotation, which keeps its key numbering and Go To targets.
+
+read_logs() streams the logs in fixed-size blocks and only keeps one counter
+per probe, so multi-gigabyte logs are read in constant memory. From the
+counts, Profile gives how often each key was evaluated, fired (all the
+conditions before its first action passed) or fell through, and the
+measured pass rate of every condition, which config_optimizer uses to put
+the conditions that fail most often per unit of cost first.
+
+Key lines are reported but never moved: their order decides which key fires
+first in a pass, and Go To targets refer to their numbers.
+
+Usage:
+    python -m log_profile instrument my_config.json -o rotation_config.txt
+    python -m log_profile report my_config.json client.log [more.log ...]
+    python -m log_profile optimize my_config.json client.log -o rotation_config.txt
+"""
+import argparse
+import re
+import sys
+from collections import Counter
+from command_templates import command_templates
+from command_types import command_types
+from config_format import read_rotation
+from config_optimizer import reorder_conditions
+from config_writer import DEFAULT_CONFIG_PATH, write_config
+from rotation_model import Command, Key, Makro, Rotation
+
+PROBE_PREFIX = 'prof:'
+PROBE_PATTERN = re.compile(rb'prof:(\d+)\.(\d+)\.(\d+)')
+READ_BLOCK_SIZE = 1024 * 1024
+# Longest probe message kept when a line without newline is cut short
+MAX_PROBE_LENGTH = 64
+
+
+def is_condition(command, types=command_types):
+    """
+    Returns True if a command can fail and skip the rest of its line.
+    """
+    return bool(types.get(command.command_type, {}).get('condition', False))
+
+
+def probe(makro_number, key_number, command_number, types=command_types):
+    """
+    Returns a Debug Message command logging the given probe.
+    """
+    command = Command()
+    command.set_command_type('Debug Message', types)
+    command.parameters[0].value = f"{PROBE_PREFIX}{makro_number}.{key_number}.{command_number}"
+    return command
+
+
+def instrument(rotation, types=command_types):
+    """
+    Returns a copy of a rotation with probes, see the module docstring.
+
+    Parameters
+    ----------
+    rotation : Rotation
+        The rotation to profile. It is not changed.
+    types : dict
+        The dictionary of available command types.
+
+    Returns
+    -------
+    Rotation
+        The instrumented rotation.
+    """
+    makros = []
+    for makro_number, makro in enumerate(rotation.makros, start=1):
+        keys = []
+        for key_number, key in enumerate(makro.keys, start=1):
+            commands = [probe(makro_number, key_number, 0, types)]
+            for command_number, command in enumerate(key.commands, start=1):
+                commands.append(command)
+                if is_condition(command, types):
+                    commands.append(probe(makro_number, key_number, command_number, types))
+            keys.append(Key(commands))
+        makros.append(Makro(keys))
+    return Rotation(makros, rotation.variables, rotation.spells)
+
+
+def scan_log(f, counts, block_size=READ_BLOCK_SIZE):
+    """
+    Adds the probes found in a binary file object to counts.
+
+    The file is read in blocks; only the unfinished last line of a block is
+    carried over to the next one. When that line grows longer than a block,
+    the probes in it are counted and only its last MAX_PROBE_LENGTH bytes,
+    which may hold the start of a probe, are carried over.
+
+    Parameters
+    ----------
+    f : file
+        The log, opened in binary mode.
+    counts : Counter
+        Probe (makro, key, command) tuples mapped to how often they were logged.
+    block_size : int
+        The number of bytes read at a time.
+    """
+    tail = b''
+    while True:
+        block = f.read(block_size)
+        if not block:
+            break
+        block = tail + block
+        end = block.rfind(b'\n') + 1
+        tail = block[end:]
+        for match in PROBE_PATTERN.finditer(block, 0, end):
+            counts[(int(match.group(1)), int(match.group(2)), int(match.group(3)))] += 1
+        if len(tail) > max(block_size, MAX_PROBE_LENGTH):
+            # Keep memory bounded for logs without newlines
+            keep = len(tail) - MAX_PROBE_LENGTH
+            for match in PROBE_PATTERN.finditer(tail):
+                if match.end() == len(tail):
+                    break  # The probe may go on in the next block
+                counts[(int(match.group(1)), int(match.group(2)), int(match.group(3)))] += 1
+                keep = max(keep, match.end())
+            tail = tail[keep:]
+    for match in PROBE_PATTERN.finditer(tail):
+        counts[(int(match.group(1)), int(match.group(2)), int(match.group(3)))] += 1
+
+
+def read_logs(paths):
+    """
+    Returns the probe counts of the given log files, see scan_log.
+    """
+    counts = Counter()
+    for path in paths:
+        with open(path, 'rb') as f:
+            scan_log(f, counts)
+    return counts
+
+
+class Profile:
+    def __init__(self, rotation, counts, types=command_types):
+        """
+        Measured frequencies of the keys and conditions of a rotation.
+
+        Parameters
+        ----------
+        rotation : Rotation
+            The rotation that was profiled, without probes.
+        counts : Counter
+            The probe counts, see read_logs.
+        types : dict
+            The dictionary of available command types.
+        """
+        self.rotation = rotation
+        self.counts = counts
+        self.types = types
+
+    def evaluated(self, makro_number, key_number):
+        """
+        Returns how often a key line was evaluated.
+        """
+        return self.counts[(makro_number, key_number, 0)]
+
+    def fired(self, makro_number, key_number):
+        """
+        Returns how often all conditions before the first action of a key passed.
+        """
+        key = self.rotation.makros[makro_number - 1].keys[key_number - 1]
+        last = 0
+        for command_number, command in enumerate(key.commands, start=1):
+            if not command.command_type:
+                continue
+            if not is_condition(command, self.types):
+                break
+            last = command_number
+        return self.counts[(makro_number, key_number, last)]
+
+    def pass_rates(self):
+        """
+        Returns the measured pass rate of every condition that was evaluated.
+
+        Returns
+        -------
+        dict[tuple[int, int, int], float]
+            Pass rates keyed by 1-based (makro, key, command) numbers, as
+            taken by config_optimizer.reorder_conditions.
+        """
+        rates = {}
+        for makro_number, makro in enumerate(self.rotation.makros, start=1):
+            for key_number, key in enumerate(makro.keys, start=1):
+                previous = 0  # Probe logged right before the next condition is evaluated
+                for command_number, command in enumerate(key.commands, start=1):
+                    if not is_condition(command, self.types):
+                        continue
+                    evaluated = self.counts[(makro_number, key_number, previous)]
+                    if evaluated:
+                        rates[(makro_number, key_number, command_number)] = (
+                            self.counts[(makro_number, key_number, command_number)] / evaluated
+                        )
+                    previous = command_number
+        return rates
+
+    def report(self, top=10):
+        """
+        Returns the profile report as text lines: per-key counts, the hottest
+        keys, and the keys that were never reached or never fired.
+        """
+        lines = []
+        rows = []
+        for makro_number, makro in enumerate(self.rotation.makros, start=1):
+            lines.append(f"Makro {makro_number}:")
+            for key_number in range(1, len(makro.keys) + 1):
+                evaluated = self.evaluated(makro_number, key_number)
+                fired = self.fired(makro_number, key_number)
+                rows.append((fired, makro_number, key_number, evaluated))
+                rate = f"{fired / evaluated:.1%}" if evaluated else "-"
+                lines.append(f"  key {key_number:>3}: evaluated {evaluated:>10}  fired {fired:>10}  "
+                             f"fell through {evaluated - fired:>10}  fire rate {rate}")
+
+        hot = sorted((row for row in rows if row[0]), key=lambda row: (-row[0], row[1], row[2]))[:top]
+        lines.append("")
+        lines.append("Hot keys:")
+        lines.extend(f"  Makro {m}, key {k}: fired {fired} times" for fired, m, k, _ in hot)
+        if not hot:
+            lines.append("  none")
+
+        unreached = [(m, k) for fired, m, k, evaluated in rows if not evaluated]
+        never_fired = [(m, k) for fired, m, k, evaluated in rows if evaluated and not fired]
+        lines.append("Dead keys:")
+        lines.extend(f"  Makro {m}, key {k}: never reached" for m, k in unreached)
+        lines.extend(f"  Makro {m}, key {k}: reached but never fired" for m, k in never_fired)
+        if not unreached and not never_fired:
+            lines.append("  none")
+        return lines
+
+
+def generate(rotation, path):
+    """
+    Writes the config of a rotation, reporting commands that fail to render
+    on stderr and skipping them, as config_compiler does.
+    """
+    write_config(
+        rotation, command_templates, path,
+        on_error=lambda command, e: print(
+            f"  warning: Failed to generate command '{command.command_type}': {e}", file=sys.stderr
+        )
+    )
+
+
+def main(argv=None):
+    """
+    Command-line entry point. Returns the process exit code.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m log_profile",
+        description="Profile rotations from client console logs and optimize them with the measured frequencies."
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    instrument_parser = commands.add_parser('instrument', help="generate a config that logs probe messages")
+    instrument_parser.add_argument('config', help="the JSON config")
+    instrument_parser.add_argument('-o', '--output', default=DEFAULT_CONFIG_PATH, help="the file to generate")
+
+    report_parser = commands.add_parser('report', help="report per-key counts, hot and dead keys")
+    report_parser.add_argument('config', help="the JSON config that was instrumented")
+    report_parser.add_argument('logs', nargs='+', help="client console logs")
+    report_parser.add_argument('--top', type=int, default=10, help="number of hot keys listed (default: 10)")
+
+    optimize_parser = commands.add_parser('optimize', help="generate a config with conditions reordered by the profile")
+    optimize_parser.add_argument('config', help="the JSON config that was instrumented")
+    optimize_parser.add_argument('logs', nargs='+', help="client console logs")
+    optimize_parser.add_argument('-o', '--output', default=DEFAULT_CONFIG_PATH, help="the file to generate")
+    args = parser.parse_args(argv)
+
+    try:
+        rotation = read_rotation(args.config, command_types)
+        if args.command == 'instrument':
+            generate(instrument(rotation), args.output)
+            print(f"Wrote instrumented config to {args.output}")
+            return 0
+        profile = Profile(rotation, read_logs(args.logs))
+    except (OSError, ValueError, KeyError, IndexError, TypeError) as e:
+        print(f"FAILED: {e}", file=sys.stderr)
+        return 1
+
+    if args.command == 'report':
+        for line in profile.report(args.top):
+            print(line)
+        return 0
+
+    optimized, explanations = reorder_conditions(rotation, command_types, profile.pass_rates())
+    try:
+        generate(optimized, args.output)
+    except OSError as e:
+        print(f"FAILED: {e}", file=sys.stderr)
+        return 1
+    for explanation in explanations:
+        print(f"Reordered {explanation}")
+    print(f"Wrote {args.output} with {len(explanations)} reordered run(s) of conditions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
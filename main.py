@@ -1,8 +1,10 @@
 """ main.py """
 import tkinter as tk
+from app_log import configure_logging
 from rotation_config_generator import RotationConfigGenerator
 
 if __name__ == "__main__":
+    configure_logging()
     root = tk.Tk()
     app = RotationConfigGenerator(root)
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,367 @@
+# makro_editor.py
+import bisect
+import tkinter as tk
+from tkinter import ttk
+from command_frame import CommandFrame
+from rotation_model import Command, Key
+
+# Row kinds of the flattened makro
+KEY_ROW = 'key'
+COMMAND_ROW = 'command'
+ADD_ROW = 'add'
+
+# Height estimates in pixels, replaced by measured heights once a row of the
+# same kind (and parameter count, for commands) has been shown
+DEFAULT_ROW_HEIGHTS = {KEY_ROW: 24, ADD_ROW: 36, COMMAND_ROW: 34}
+PARAMETER_ROW_HEIGHT = 30
+
+
+class KeyHeaderRow(ttk.Frame):
+    def __init__(self, parent):
+        """
+        Row editor showing the "Key <number>:" label of a key.
+
+        Parameters:
+            parent (tk.Canvas): The canvas the row is placed on.
+        """
+        super().__init__(parent)
+        self.label = ttk.Label(self, text="")
+        self.label.pack(side='left', padx=5)
+
+    def bind_key(self, key_number):
+        """
+        Shows the label for the given 1-based key number.
+        """
+        self.label.config(text=f"Key {key_number}:")
+
+
+class AddCommandRow(ttk.Frame):
+    def __init__(self, parent):
+        """
+        Row editor holding the "Add Command" button below the commands of a key.
+
+        Parameters:
+            parent (tk.Canvas): The canvas the row is placed on.
+        """
+        super().__init__(parent)
+        self.add_callback = None
+        self.add_command_button = ttk.Button(self, text="Add Command", command=lambda: self.add_callback())
+        self.add_command_button.pack(pady=5)
+
+    def bind_key(self, add_callback):
+        """
+        Makes the button call add_callback.
+        """
+        self.add_callback = add_callback
+
+
+class MakroEditor(ttk.Frame):
+    def __init__(self, parent, makro, command_types, spells_tab, variable_names, render_scheduler=None, journal=None):
+        """
+        Virtualized editor for the keys and commands of a makro.
+
+        The makro is flattened into rows (a header per key, a row per command
+        and an "Add Command" row per key). Only the rows inside the visible
+        part of the canvas get widgets; a small pool of row editors is rebound
+        to other rows of the model while scrolling.
+
+        Parameters:
+            parent (ttk.Frame): The parent widget.
+            makro (Makro): The makro model to edit.
+            command_types (dict): A dictionary of command types.
+            spells_tab (SpellsTab): The SpellsTab instance.
+            variable_names (VariableNames): The shared list of variable names.
+            render_scheduler (RenderScheduler): Passed on to the command editors.
+            journal (EditJournal): Records the edits of the makro for autosave, if given.
+        """
+        super().__init__(parent)
+        self.makro = makro
+        self.render_scheduler = render_scheduler
+        self.command_types = command_types
+        self.spells_tab = spells_tab
+        self.variable_names = variable_names
+        self.journal = journal
+
+        self.rows = []  # (kind, key_index, command) tuples in display order
+        self.offsets = [0]  # y offset of each row, plus the total height at the end
+        self.row_heights = dict(DEFAULT_ROW_HEIGHTS)  # Measured heights per row class
+        self.visible = {}  # row identity -> (editor, window id)
+        self.free_editors = {KEY_ROW: [], COMMAND_ROW: [], ADD_ROW: []}
+        self.layout_scheduled = False
+
+        self.canvas = tk.Canvas(self, highlightthickness=0)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self.on_scroll)
+        self.canvas.bind("<Configure>", lambda e: self.schedule_layout())
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.rebuild_rows()
+
+    def row_class(self, row):
+        """
+        Returns the key used to look up the height of a row in row_heights.
+        """
+        kind, _, command = row
+        if kind != COMMAND_ROW:
+            return kind
+        return (COMMAND_ROW, len(command.parameters))
+
+    def row_height(self, row):
+        """
+        Returns the measured or estimated height of a row.
+        """
+        row_class = self.row_class(row)
+        height = self.row_heights.get(row_class)
+        if height is None:
+            # Unmeasured command row, estimate from its parameter count
+            height = max(self.row_heights[COMMAND_ROW], len(row[2].parameters) * PARAMETER_ROW_HEIGHT)
+        return height
+
+    def rebuild_rows(self):
+        """
+        Flattens the makro model into rows and recomputes their offsets.
+
+        Call this after keys or commands were added to or removed from the
+        model outside of this editor.
+        """
+        rows = []
+        for key_index, key in enumerate(self.makro.keys):
+            rows.append((KEY_ROW, key_index, key))
+            for command in key.commands:
+                rows.append((COMMAND_ROW, key_index, command))
+            rows.append((ADD_ROW, key_index, key))
+        self.rows = rows
+        self.compute_offsets()
+        self.schedule_layout()
+
+    def compute_offsets(self):
+        """
+        Recomputes the y offset of every row and the scroll region.
+        """
+        offsets = [0]
+        y = 0
+        for row in self.rows:
+            y += self.row_height(row)
+            offsets.append(y)
+        self.offsets = offsets
+        self.canvas.configure(scrollregion=(0, 0, 0, y))
+
+    def on_scroll(self, first, last):
+        """
+        Called by the canvas when its view changes. Updates the scrollbar and
+        binds row editors to the rows that became visible.
+        """
+        self.scrollbar.set(first, last)
+        self.schedule_layout()
+
+    def schedule_layout(self):
+        """
+        Schedules a layout pass at idle time, coalescing repeated requests.
+        """
+        if not self.layout_scheduled:
+            self.layout_scheduled = True
+            self.after_idle(self.layout)
+
+    def take_editor(self, kind):
+        """
+        Returns a free row editor of the given kind, creating one if the pool is empty.
+        """
+        pool = self.free_editors[kind]
+        if pool:
+            return pool.pop()
+        if kind == KEY_ROW:
+            editor = KeyHeaderRow(self.canvas)
+        elif kind == ADD_ROW:
+            editor = AddCommandRow(self.canvas)
+        else:
+            editor = CommandFrame(
+                self.canvas, self.command_types, None, self.spells_tab, self.variable_names,
+                render_scheduler=self.render_scheduler
+            )
+            editor.parameters_changed_callback = self.on_parameters_changed
+        window = self.canvas.create_window(0, 0, window=editor, anchor='nw', state='hidden')
+        return editor, window
+
+    def bind_row(self, editor, row):
+        """
+        Binds a row editor to a row of the model.
+        """
+        kind, key_index, item = row
+        if kind == KEY_ROW:
+            editor.bind_key(key_index + 1)
+        elif kind == ADD_ROW:
+            editor.bind_key(lambda key_index=key_index: self.add_command(key_index))
+        else:
+            editor.command_changed_callback = (
+                lambda command, key_index=key_index: self.on_command_changed(key_index, command)
+            )
+            editor.bind_command(item, lambda key_index=key_index, command=item: self.remove_command(key_index, command))
+
+    def layout(self):
+        """
+        Binds row editors to the rows inside the visible part of the canvas.
+
+        Editors of rows that scrolled out of view go back to the pool. Rows
+        that stay visible keep their editor. After binding, the real heights
+        of the shown rows are measured; if they differ from the estimates the
+        offsets are recomputed and the rows are placed again. Layout requests
+        made while the pass runs are covered by the pass itself.
+        """
+        try:
+            for _ in range(2):
+                top = self.canvas.canvasy(0)
+                bottom = top + max(self.canvas.winfo_height(), 1)
+                first = max(bisect.bisect_right(self.offsets, top) - 1, 0)
+                last = min(bisect.bisect_left(self.offsets, bottom), len(self.rows))
+
+                wanted = {}
+                for index in range(first, last):
+                    row = self.rows[index]
+                    wanted[(row[0], id(row[2]), row[1])] = (index, row)
+
+                # Return editors of rows that are no longer visible to the pool
+                for identity in list(self.visible):
+                    if identity not in wanted:
+                        editor, window = self.visible.pop(identity)
+                        self.canvas.itemconfigure(window, state='hidden')
+                        self.free_editors[identity[0]].append((editor, window))
+
+                width = self.canvas.winfo_width()
+                for identity, (index, row) in wanted.items():
+                    if identity not in self.visible:
+                        editor, window = self.take_editor(row[0])
+                        self.bind_row(editor, row)
+                        self.visible[identity] = (editor, window)
+                    editor, window = self.visible[identity]
+                    self.canvas.coords(window, 0, self.offsets[index])
+                    if width > 1:
+                        self.canvas.itemconfigure(window, state='normal', width=width)
+                    else:
+                        self.canvas.itemconfigure(window, state='normal')
+
+                # Measure the shown rows and correct the height table
+                self.update_idletasks()
+                changed = False
+                for identity, (index, row) in wanted.items():
+                    height = self.visible[identity][0].winfo_reqheight()
+                    row_class = self.row_class(row)
+                    if self.row_heights.get(row_class) != height:
+                        self.row_heights[row_class] = height
+                        changed = True
+                if not changed:
+                    break
+                self.compute_offsets()
+        finally:
+            self.layout_scheduled = False
+
+    def on_parameters_changed(self):
+        """
+        Called by a command editor when the user changed its command type, which
+        can change the height of its row.
+        """
+        self.compute_offsets()
+        self.schedule_layout()
+
+    def on_command_changed(self, key_index, command):
+        """
+        Called by a command editor after the user edited its command.
+        """
+        if self.journal is not None:
+            self.journal.command_changed(self.makro, key_index, command)
+
+    def add_key(self, key=None):
+        """
+        Appends a key to the makro model and shows it.
+
+        Parameters
+        ----------
+        key : Key, optional
+            The key to append. A new empty key is created if not given.
+        """
+        key = key if key is not None else Key()
+        self.makro.keys.append(key)
+        if self.journal is not None:
+            self.journal.key_added(self.makro, key)
+        self.rebuild_rows()
+
+    def remove_key(self):
+        """
+        Removes the last key of the makro model.
+        """
+        if self.makro.keys:
+            self.makro.keys.pop()
+            if self.journal is not None:
+                self.journal.key_removed(self.makro)
+            self.rebuild_rows()
+
+    def add_command(self, key_index):
+        """
+        Appends a new command to a key of the makro model.
+        """
+        command = Command()
+        self.makro.keys[key_index].commands.append(command)
+        if self.journal is not None:
+            self.journal.command_added(self.makro, key_index, command)
+        self.rebuild_rows()
+
+    def remove_command(self, key_index, command):
+        """
+        Removes a command from a key of the makro model.
+        """
+        commands = self.makro.keys[key_index].commands
+        if command in commands:
+            index = commands.index(command)
+            del commands[index]
+            if self.journal is not None:
+                self.journal.command_removed(self.makro, key_index, index)
+            self.rebuild_rows()
+
+    def replace_keys(self, keys):
+        """
+        Makes the keys of the makro model equal to keys, replacing only the
+        keys whose content differs.
+
+        Unchanged keys keep their model objects, so their visible rows keep
+        their editors; the layout pass rebinds only the rows of replaced keys.
+        'Var' parameters of the new keys whose variable does not exist are
+        cleared, as update_variable_names does for the whole makro.
+
+        Parameters
+        ----------
+        keys : list[Key]
+            The keys to show, e.g. of a makro from a loaded config.
+
+        Returns
+        -------
+        int
+            The number of keys that were replaced, added or removed.
+        """
+        replaced, removed = self.makro.replace_keys(keys)
+        for key in replaced:
+            key.clear_missing_variables(self.variable_names)
+        changed = len(replaced) + removed
+        if changed:
+            self.rebuild_rows()
+        return changed
+
+    def update_variable_names(self, variable_names):
+        """
+        Clears 'Var' parameters whose variable no longer exists.
+
+        Only needed after variables were removed or replaced; the editors
+        share the VariableNames instance and read it when a dropdown opens.
+        The model is cleared for all commands of the makro, but only the
+        currently visible command editors are refreshed.
+
+        Parameters
+        ----------
+        variable_names : VariableNames
+            The shared list of variable names.
+        """
+        self.variable_names = variable_names
+        for key in self.makro.keys:
+            key.clear_missing_variables(variable_names)
+        for editor, _ in self.visible.values():
+            if isinstance(editor, CommandFrame):
+                editor.update_variable_names(variable_names)
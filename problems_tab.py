@@ -0,0 +1,112 @@
+from tkinter import ttk
+from concurrent.futures import ThreadPoolExecutor
+from app_log import logger
+from rotation_linter import RotationLinter, SnapshotCache
+
+
+class ProblemsTab:
+    def __init__(self, notebook, get_rotation):
+        """
+        Initialize the ProblemsTab class.
+
+        Parameters
+        ----------
+        notebook : ttk.Notebook
+            The parent notebook.
+        get_rotation : function
+            Returns the current Rotation model.
+        """
+        self.problems_frame = ttk.Frame(notebook)
+        notebook.add(self.problems_frame, text="Problems")
+        self.notebook = notebook
+        self.get_rotation = get_rotation
+
+        # Checks run on a worker thread; only the snapshot is taken on the Tk thread
+        self.linter = RotationLinter()
+        self.snapshots = SnapshotCache()
+        self.lint_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='rotation-lint')
+        self.lint_future = None
+        self.check_requested = False
+
+        self.create_widgets()
+
+    def create_widgets(self):
+        """
+        Creates a Treeview widget listing the location and description of
+        each problem, with a scrollbar and a summary label.
+        """
+        self.summary_label = ttk.Label(self.problems_frame, text="", anchor='w')
+        self.summary_label.pack(side='bottom', fill='x', padx=10, pady=5)
+
+        self.tree = ttk.Treeview(self.problems_frame, columns=('Location', 'Problem'), show='headings')
+        self.tree.heading('Location', text='Location')
+        self.tree.heading('Problem', text='Problem')
+        self.tree.column('Location', width=200, stretch=False)
+        self.tree.column('Problem', width=700)
+        self.tree.pack(side='left', fill='both', expand=True)
+
+        scrollbar = ttk.Scrollbar(self.problems_frame, orient="vertical", command=self.tree.yview)
+        scrollbar.pack(side='right', fill='y')
+        self.tree.configure(yscrollcommand=scrollbar.set)
+
+    def key_changed(self, makro, key=None):
+        """
+        Records an edit of a key, see SnapshotCache.key_changed. Called for
+        each journaled edit of a makro.
+        """
+        self.snapshots.key_changed(makro, key)
+
+    def invalidate(self):
+        """
+        Makes the next check read every key, e.g. after a load.
+        """
+        self.snapshots.invalidate()
+
+    def request_check(self):
+        """
+        Re-checks the rotation in the background, e.g. after edits or a load.
+
+        A snapshot of the rotation is taken now and checked on the worker
+        thread. Only the keys reported by key_changed since the last check
+        are read on this thread and checked again. A check requested while
+        one is running is run right after it.
+        """
+        if self.lint_future is not None:
+            self.check_requested = True
+            return
+        self.lint_future = self.lint_executor.submit(self.linter.check, self.snapshots.snapshot(self.get_rotation()))
+        self.problems_frame.after(20, self.poll_check)
+
+    def poll_check(self):
+        """
+        Waits for the check started by request_check and shows its result.
+        """
+        if not self.lint_future.done():
+            self.problems_frame.after(20, self.poll_check)
+            return
+        future, self.lint_future = self.lint_future, None
+        try:
+            self.show_problems(future.result())
+        except Exception as e:
+            logger.error("Checking the rotation failed: %s", e)
+        if self.check_requested:
+            self.check_requested = False
+            self.request_check()
+
+    def show_problems(self, problems):
+        """
+        Fills the Treeview with the problems and shows their count in the tab title.
+
+        Parameters
+        ----------
+        problems : list[Problem]
+            The problems found by the linter.
+        """
+        self.tree.delete(*self.tree.get_children())
+        for problem in problems:
+            self.tree.insert('', 'end', values=(problem.location(), problem.message))
+        self.notebook.tab(self.problems_frame, text=f"Problems ({len(problems)})" if problems else "Problems")
+        self.summary_label.config(
+            text=f"{len(problems)} problem(s), {self.linter.checked_keys} key(s) checked" if problems else "No problems found"
+        )
+        logger.debug("Lint found %d problems, checked %d keys", len(problems), self.linter.checked_keys)
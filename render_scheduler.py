@@ -0,0 +1,89 @@
+# render_scheduler.py
+import time
+import tkinter as tk
+from contextlib import contextmanager
+
+
+class RenderScheduler:
+    def __init__(self, widget, interval_ms=16):
+        """
+        Coalesces preview renders into one idle-time pass per frame.
+
+        Widgets call request() as often as they like; each requesting widget
+        is rendered at most once per pass, and passes run at most once every
+        interval_ms milliseconds.
+
+        Parameters
+        ----------
+        widget : tkinter.Misc
+            Any widget of the application, used to schedule callbacks.
+        interval_ms : int
+            Minimum time between two render passes, in milliseconds.
+        """
+        self.widget = widget
+        self.interval_ms = interval_ms
+        self.pending = {}  # id(target) -> target, in request order
+        self.scheduled = False
+        self.suspend_count = 0
+        self.last_flush = 0.0
+
+    def request(self, target):
+        """
+        Requests a call to target.render_preview() in the next render pass.
+
+        Parameters
+        ----------
+        target : object
+            An object with a render_preview() method, usually a CommandFrame.
+        """
+        self.pending[id(target)] = target
+        if self.suspend_count or self.scheduled:
+            return
+        self.scheduled = True
+        wait_ms = self.interval_ms - (time.perf_counter() - self.last_flush) * 1000
+        if wait_ms > 0:
+            self.widget.after(int(wait_ms) + 1, lambda: self.widget.after_idle(self.flush))
+        else:
+            self.widget.after_idle(self.flush)
+
+    def flush(self):
+        """
+        Renders all pending targets once. Does nothing while suspended.
+        """
+        self.scheduled = False
+        if self.suspend_count:
+            return
+        pending, self.pending = self.pending, {}
+        self.last_flush = time.perf_counter()
+        for target in pending.values():
+            try:
+                target.render_preview()
+            except tk.TclError:
+                pass  # The widget was destroyed before the pass ran
+
+    def suspend(self):
+        """
+        Stops render passes until the matching resume(). Requests made in the
+        meantime are kept and rendered once by the first pass after resuming.
+        """
+        self.suspend_count += 1
+
+    def resume(self):
+        """
+        Ends a suspend() and schedules the pending renders.
+        """
+        self.suspend_count -= 1
+        if not self.suspend_count and self.pending and not self.scheduled:
+            self.scheduled = True
+            self.widget.after_idle(self.flush)
+
+    @contextmanager
+    def suspended(self):
+        """
+        Context manager suspending render passes, e.g. while a config is loaded.
+        """
+        self.suspend()
+        try:
+            yield
+        finally:
+            self.resume()
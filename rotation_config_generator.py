@@ -1,11 +1,24 @@
+import sys
+import time
 import tkinter as tk
-from tkinter import ttk, messagebox
-from key_config_frame import KeyConfigFrame
+from tkinter import ttk, messagebox, filedialog
+from makro_editor import MakroEditor
+from render_scheduler import RenderScheduler
 from spells_tab import SpellsTab
 from variables_tab import VariablesTab
 from command_types import command_types
+from command_templates import command_templates, template_problems
 from config_manager_tab import ConfigManagerTab
-import json
+from problems_tab import ProblemsTab
+from rotation_model import Rotation, Makro
+from config_writer import DEFAULT_CONFIG_PATH, write_config
+from config_optimizer import optimization_summary, peephole, reorder_conditions
+from edit_journal import EditJournal
+from app_log import logger, log_operation, operations_enabled
+
+AUTOSAVE_INTERVAL_MS = 2000  # How often edits are appended to the journal
+EDITOR_RELEASE_AFTER_S = 15 * 60  # Editors of makro tabs not shown for this long are released, 0 keeps them
+EDITOR_RELEASE_CHECK_MS = 60 * 1000  # How often idle makro editors are looked for
 
 class RotationConfigGenerator:
     def __init__(self, master):
@@ -23,54 +36,83 @@ class RotationConfigGenerator:
         master.geometry("1200x800")
 
         self.command_types = command_types
+        # Shown even with logging off; the Problems tab lists the commands using these types
+        for problem in template_problems(command_templates):
+            print(f"Warning: {problem}", file=sys.stderr)
+
+        # Coalesces command preview renders and holds them back while loading
+        self.render_scheduler = RenderScheduler(master)
 
         self.notebook = ttk.Notebook(master)
         self.notebook.pack(expand=True, fill='both', padx=10, pady=10)
 
-        self.variables_tab = VariablesTab(self.notebook)
-        self.spells_tab = SpellsTab(self.notebook)
+        # Autosave: edits go to an append-only journal next to config_data.json
+        self.journal = EditJournal(self.makro_index, self.command_types)
+
+        self.variables_tab = VariablesTab(self.notebook, self.journal)
+        self.spells_tab = SpellsTab(self.notebook, self.journal)
         self.create_rotation_tab()
         self.config_manager_tab = ConfigManagerTab(self.notebook, self.handle_config_load)
+        self.problems_tab = ProblemsTab(self.notebook, self.get_rotation)
+        self.journal.add_key_listener(self.problems_tab.key_changed)
 
         self.variables_tab.add_variable_change_callback(self.update_variable_lists)
 
-        self.generate_button = ttk.Button(master, text="Generate Config", command=self.generate_config)
-        self.generate_button.pack(pady=10)
+        generate_frame = ttk.Frame(master)
+        generate_frame.pack(pady=10)
+        self.generate_button = ttk.Button(generate_frame, text="Generate Config", command=self.generate_config)
+        self.generate_button.pack(side='left', padx=5)
+        self.generate_to_button = ttk.Button(generate_frame, text="Generate Config To...", command=self.generate_config_to)
+        self.generate_to_button.pack(side='left', padx=5)
+        # Optional compile passes, off by default, see config_optimizer
+        self.optimize_commands_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            generate_frame, text="Optimize Commands", variable=self.optimize_commands_var
+        ).pack(side='left', padx=5)
+        self.reorder_conditions_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            generate_frame, text="Reorder Conditions", variable=self.reorder_conditions_var
+        ).pack(side='left', padx=5)
 
         self.load_data()
+        self.master.after(AUTOSAVE_INTERVAL_MS, self.autosave)
+        if EDITOR_RELEASE_AFTER_S:
+            self.master.after(EDITOR_RELEASE_CHECK_MS, self.release_idle_editors)
         self.master.protocol("WM_DELETE_WINDOW", self.on_closing)
 
-    def handle_config_load(self, data):
+    def handle_config_load(self, rotation):
         """
         Handles loading of a configuration.
 
-        If data is None, returns the current configuration data for saving.
-        If data is not None, loads the provided data into the application.
+        If rotation is None, returns the current rotation for saving.
+        If rotation is not None, loads the provided rotation into the application.
 
         Parameters
         ----------
-        data : dict or None
-            If None, returns current data for saving.
-            If not None, loads the provided data into the application.
+        rotation : Rotation or None
+            If None, returns the current rotation for saving.
+            If not None, loads the provided rotation into the application.
 
         Returns
         -------
-        dict or None
-            If data is None, returns the current configuration data for saving.
-            If data is not None, returns None.
+        Rotation or None
+            If rotation is None, returns the current rotation for saving.
+            If rotation is not None, returns None.
         """
-        if data is None:
-            # Return current data for saving
-            return self.get_rotation_data()
+        if rotation is None:
+            # Return current rotation for saving
+            return self.get_rotation()
         else:
-            # Load the provided data
-            self.set_rotation_data(data)
+            # Load the provided rotation and make it the new autosave snapshot
+            self.set_rotation_data(rotation)
+            self.journal.compact(self.get_rotation())
 
     def save_data(self):
         """
         Saves the current configuration data to a file named config_data.json.
 
-        This function is called when the application is closed.
+        The file is the autosave snapshot; writing it also empties the edit
+        journal. This function is called when the application is closed.
 
         Parameters
         ----------
@@ -80,16 +122,37 @@ class RotationConfigGenerator:
         -------
         None
         """
-
-        data = self.get_rotation_data()
-        with open('config_data.json', 'w') as f:
-            json.dump(data, f)
+        with log_operation('save', file=self.journal.snapshot_path) as sizes:
+            sizes['bytes'] = self.journal.compact(self.get_rotation())
 
     def load_data(self):
         """
         Loads the current configuration data from a file named config_data.json.
 
-        This function is called when the application is started.
+        Edits journaled since that snapshot was written, e.g. before a crash,
+        are replayed onto it. Without a snapshot, the initial state is written
+        as the first one. This function is called when the application is
+        started.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        rotation = self.journal.load()
+        if rotation is not None:
+            self.set_rotation_data(rotation)
+        else:
+            self.journal.compact(self.get_rotation())
+
+    def autosave(self):
+        """
+        Appends the edits made since the last call to the journal, and folds
+        the journal into a new snapshot once it got long. When there were
+        edits, the rotation is re-checked in the background. Reschedules itself.
 
         Parameters
         ----------
@@ -100,11 +163,16 @@ class RotationConfigGenerator:
         None
         """
         try:
-            with open('config_data.json', 'r') as f:
-                data = json.load(f)
-            self.set_rotation_data(data)
-        except FileNotFoundError:
-            pass  # No data to load
+            with log_operation('autosave') as sizes:
+                sizes['entries'] = self.journal.flush()
+            if sizes['entries']:
+                self.problems_tab.request_check()
+            if self.journal.needs_compaction():
+                with log_operation('compact') as sizes:
+                    sizes['bytes'] = self.journal.compact(self.get_rotation())
+        except OSError as e:
+            logger.error("Autosave failed: %s", e)
+        self.master.after(AUTOSAVE_INTERVAL_MS, self.autosave)
 
     def on_closing(self):
         """
@@ -122,6 +190,7 @@ class RotationConfigGenerator:
         """
 
         self.save_data()
+        self.journal.close()
         self.master.destroy()
 
     def create_rotation_tab(self):
@@ -131,6 +200,8 @@ class RotationConfigGenerator:
         This function creates the Rotation tab within the main notebook and adds a
         notebook to it to hold the makros. It also adds buttons to add and remove
         makros. The self.makro_frames list is initialized to store the makro frames.
+        Makro editors are created when their tab is first selected, see
+        on_makro_tab_changed.
 
         Parameters
         ----------
@@ -147,6 +218,8 @@ class RotationConfigGenerator:
         # Create a notebook within rotation_frame to hold makros
         self.makro_notebook = ttk.Notebook(rotation_frame)
         self.makro_notebook.pack(expand=True, fill='both')
+        self.makro_notebook.bind('<<NotebookTabChanged>>', self.on_makro_tab_changed)
+        self.shown_makro_info = None  # Makro info of the selected makro tab
 
         # Add buttons to add and remove makros
         button_frame = ttk.Frame(rotation_frame)
@@ -163,17 +236,21 @@ class RotationConfigGenerator:
         # Add initial makro
         self.add_makro()
 
-    def add_makro(self):
+    def add_makro(self, makro=None):
         """
         Adds a new makro to the rotation configuration.
 
-        This function creates a new notebook page with a scrollable frame and a
-        frame to hold buttons to add and remove keys. The new makro is added to
-        the end of the self.makro_frames list.
+        This function creates a new notebook page with a frame to hold
+        buttons to add and remove keys. The page's virtualized MakroEditor is
+        only created when the tab is first selected; until then the makro
+        exists only in the model. The new makro is added to the end of the
+        self.makro_frames list.
 
         Parameters
         ----------
-        None
+        makro : Makro, optional
+            The makro model the page edits. A new empty one is created if not
+            given.
 
         Returns
         -------
@@ -181,35 +258,20 @@ class RotationConfigGenerator:
         """
         makro_frame = ttk.Frame(self.makro_notebook)
         makro_name = f"Makro {len(self.makro_frames) + 1}"
+        if makro is None:
+            makro = Makro()
 
         # Store makro info
         makro_info = {
             'makro_frame': makro_frame,
-            'key_frames': [],
+            'makro': makro,
             'makro_name': makro_name,
-            'scrollable_frame': None  # Will set this after creating scrollable_frame
+            'editor': None,  # Created when the tab is selected, see show_makro_editor
+            'last_shown': time.monotonic()
         }
 
         self.makro_notebook.add(makro_frame, text=makro_name)
 
-        # Canvas and scrollbar for each makro frame
-        canvas = tk.Canvas(makro_frame)
-        scrollbar = ttk.Scrollbar(makro_frame, orient="vertical", command=canvas.yview)
-        scrollable_frame = ttk.Frame(canvas)
-
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(
-                scrollregion=canvas.bbox("all")
-            )
-        )
-
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-
-        # Set scrollable_frame in makro_info
-        makro_info['scrollable_frame'] = scrollable_frame
-
         # Create a frame for buttons to add/remove keys
         key_button_frame = ttk.Frame(makro_frame)
         key_button_frame.pack(pady=5)
@@ -220,78 +282,114 @@ class RotationConfigGenerator:
         remove_key_button = ttk.Button(key_button_frame, text="Remove Key", command=lambda mi=makro_info: self.remove_key(mi))
         remove_key_button.pack(side='left', padx=5)
 
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-
         self.makro_frames.append(makro_info)
+        self.journal.makro_added(makro)
 
-    def add_key(self, makro_info):
+    def show_makro_editor(self, makro_info):
         """
-        Adds a new key to the makro configuration.
-
-        This function creates a new KeyConfigFrame instance and adds it to the
-        list of key frames for the makro. The new key is added to the end of the
-        list of key frames.
+        Returns the MakroEditor of a makro page, creating it if the page has none yet.
 
         Parameters
         ----------
         makro_info : dict
-            The dictionary containing the info for the makro to add the key to.
+            The dictionary containing the info for the makro.
+
+        Returns
+        -------
+        MakroEditor
+            The page's editor.
+        """
+        editor = makro_info['editor']
+        if editor is None:
+            # Editor that only creates widgets for the visible keys and commands
+            editor = MakroEditor(
+                makro_info['makro_frame'], makro_info['makro'], self.command_types, self.spells_tab,
+                self.variables_tab.variable_names, self.render_scheduler, self.journal
+            )
+            editor.pack(fill='both', expand=True)
+            makro_info['editor'] = editor
+            logger.debug("Created the editor of %s", makro_info['makro_name'])
+        return editor
+
+    def on_makro_tab_changed(self, event):
+        """
+        Creates the editor of the selected makro tab if it has none yet.
+
+        Parameters
+        ----------
+        event : tkinter.Event
+            The <<NotebookTabChanged>> event of the makro notebook.
 
         Returns
         -------
         None
         """
-        
-        key_number = len(makro_info['key_frames']) + 1
-        key_frame = KeyConfigFrame(
-            makro_info['scrollable_frame'], key_number, self.command_types, self.spells_tab, self.variables_tab.get_variable_names()
-        )
-        key_frame.pack(fill='x', padx=5, pady=5)
-        makro_info['key_frames'].append(key_frame)
-        self.update_key_numbers(makro_info)
+        now = time.monotonic()
+        if self.shown_makro_info is not None:
+            self.shown_makro_info['last_shown'] = now
+        self.shown_makro_info = None
+        selected = self.makro_notebook.select()
+        if not selected:
+            return
+        makro_info = self.makro_frames[self.makro_notebook.index(selected)]
+        makro_info['last_shown'] = now
+        self.shown_makro_info = makro_info
+        self.show_makro_editor(makro_info)
+
+    def release_idle_editors(self):
+        """
+        Destroys the editors of makro tabs that were not shown for
+        EDITOR_RELEASE_AFTER_S seconds, keeping their makros in the model
+        only, and reschedules itself. A released editor is created again
+        when its tab is selected.
 
-    def remove_key(self, makro_info):
+        Returns
+        -------
+        None
         """
-        Removes a key from the makro configuration.
+        deadline = time.monotonic() - EDITOR_RELEASE_AFTER_S
+        for makro_info in self.makro_frames:
+            if (makro_info['editor'] is not None and makro_info is not self.shown_makro_info
+                    and makro_info['last_shown'] < deadline):
+                makro_info['editor'].destroy()
+                makro_info['editor'] = None
+                logger.debug("Released the editor of %s", makro_info['makro_name'])
+        self.master.after(EDITOR_RELEASE_CHECK_MS, self.release_idle_editors)
 
-        This function removes the last key from the list of key frames for the
-        makro and updates the key numbers of the remaining keys.
+    def add_key(self, makro_info):
+        """
+        Adds a new key to the makro configuration.
+
+        This function appends a new empty key to the makro model and shows it
+        in the makro's editor. Keys are numbered by their position.
 
         Parameters
         ----------
         makro_info : dict
-            The dictionary containing the info for the makro to remove the key from.
+            The dictionary containing the info for the makro to add the key to.
 
         Returns
         -------
         None
         """
-        if makro_info['key_frames']:
-            key_frame = makro_info['key_frames'].pop()
-            key_frame.destroy()
-            self.update_key_numbers(makro_info)
+        self.show_makro_editor(makro_info).add_key()
 
-    def update_key_numbers(self, makro_info):
+    def remove_key(self, makro_info):
         """
-        Updates the key numbers of the key frames in the makro configuration.
+        Removes a key from the makro configuration.
 
-        This function updates the key numbers of the key frames in the makro
-        configuration by calling the update_key_number method of each key frame.
+        This function removes the last key from the makro model and its editor.
 
         Parameters
         ----------
         makro_info : dict
-            The dictionary containing the info for the makro to update the key
-            numbers in.
+            The dictionary containing the info for the makro to remove the key from.
 
         Returns
         -------
         None
         """
-        
-        for idx, key_frame in enumerate(makro_info['key_frames'], start=1):
-            key_frame.update_key_number(idx)
+        self.show_makro_editor(makro_info).remove_key()
 
     def remove_makro(self):
         """
@@ -311,155 +409,232 @@ class RotationConfigGenerator:
         """
         if self.makro_frames:
             current_tab = self.makro_notebook.index(self.makro_notebook.select())
+            makro_info = self.makro_frames.pop(current_tab)
+            if makro_info is self.shown_makro_info:
+                self.shown_makro_info = None
             self.makro_notebook.forget(current_tab)
-            del self.makro_frames[current_tab]
+            self.journal.makro_removed(current_tab)
 
-    def get_rotation_data(self):
+    def makro_index(self, makro):
         """
-        Gets the rotation data from the rotation configuration.
+        Returns the index of a makro model in the rotation, used to address journal entries.
 
-        This function generates the rotation data by iterating over the makro
-        frames and collecting the key configuration data from each key frame.
-        The function then adds the variables and spells data from the
-        variables and spells tabs to the rotation data.
+        Parameters
+        ----------
+        makro : Makro
+            The makro model.
 
         Returns
         -------
-        dict
-            The generated rotation data.
+        int
+            The index of the makro's page.
         """
-        data = {
-            'MAKRO': []
-        }
-
-        for makro_info in self.makro_frames:
-            key_frames = makro_info['key_frames']
-            makro_data = {
-                'Keys': []
-            }
-            for key_frame in key_frames:
-                key_data = key_frame.get_key_config_data()
-                makro_data['Keys'].append(key_data)
-            data['MAKRO'].append(makro_data)
+        for index, makro_info in enumerate(self.makro_frames):
+            if makro_info['makro'] is makro:
+                return index
+        raise ValueError("makro is not part of the rotation")
 
-        # Add variables and spells data
-        data['variables'] = self.variables_tab.get_variables_data()
-        data['spells'] = self.spells_tab.get_spells_data()
+    def get_rotation(self):
+        """
+        Returns the in-memory model of the rotation configuration.
 
-        return data
+        The widgets keep the makro, variable and spell models up to date on
+        every edit, so this does not read any widget.
 
-    def set_rotation_data(self, data):
+        Returns
+        -------
+        Rotation
+            The rotation model.
         """
-        Sets the rotation data from a given data dictionary.
-
-        This function will set the rotation data by clearing all existing makros
-        and then adding new makros from the given data. The data dictionary should
-        have a key 'MAKRO' whose value is a list of makro data dictionaries. Each
-        makro data dictionary should have a key 'Keys' whose value is a list of key
-        configuration data dictionaries. The function will then add each key
-        configuration to the corresponding makro.
+        return Rotation(
+            [makro_info['makro'] for makro_info in self.makro_frames],
+            self.variables_tab.variables,
+            self.spells_tab.spell_slots
+        )
 
-        The function will also set the variables and spells data from the given
-        data.
+    def set_rotation_data(self, rotation):
+        """
+        Loads a rotation model into the application.
+
+        The rotation is diffed against the open one, makro by makro and key by
+        key: existing makro pages are kept, and only keys whose content differs
+        are replaced in their makro, so flipping between near-identical
+        variants only rebinds the rows that changed. Pages are added or
+        destroyed for the makros beyond the shorter of the two rotations.
+        Makros whose page has no editor yet are only changed in the model. No
+        widget is created before the whole rotation was read, and geometry and
+        preview updates are deferred to the event loop instead of being forced
+        while loading. The load time and the number of changed keys are
+        recorded by the operation log.
+
+        The function will also set the variables and, if the rotation has
+        any, the spell slots.
 
         Parameters
         ----------
-        data : dict
-            The data dictionary containing the rotation data to set.
+        rotation : Rotation
+            The rotation to load, e.g. from config_format.read_rotation.
 
         Returns
         -------
         None
         """
-        print("Setting rotation data:", data)  # Debug print
-
-        # Clear existing makros
-        for makro_info in self.makro_frames[:]:
-            index = self.makro_notebook.index(makro_info['makro_frame'])
-            self.makro_notebook.forget(index)
-            self.makro_frames.remove(makro_info)
-
-        makro_list = data.get('MAKRO', [])
-        print(f"Loading {len(makro_list)} makros")  # Debug print
-        for makro_data in makro_list:
-            self.add_makro()
-            makro_info = self.makro_frames[-1]
-            keys_list = makro_data.get('Keys', [])
-            print(f"Loading {len(keys_list)} keys for makro")  # Debug print
-            for key_data in keys_list:
-                self.add_key(makro_info)
-                key_frame = makro_info['key_frames'][-1]
-                key_frame.set_key_config_data(key_data)
-            self.update_key_numbers(makro_info)
-
-        # Set variables
-        self.variables_tab.set_variables_data(data.get('variables', {}))
-
-        # Set spells
-        spells_data = data.get('spells', [])
-        print(f"Setting spells data: {spells_data}")  # Debug print
-        if isinstance(spells_data, list) and len(spells_data) > 0 and isinstance(spells_data[0], dict):
-            self.spells_tab.set_spells_data(spells_data)
-        else:
-            print("Invalid spells data structure")  # Debug print
+        with log_operation('load') as sizes, self.journal.paused():
+            self._set_rotation_data(rotation, sizes)
 
-        print("Finished setting rotation data")  # Debug print
-        self.master.update()  # Force update of the main window
+    def _set_rotation_data(self, rotation, sizes):
+        """
+        Does the work of set_rotation_data, adding the loaded counts to sizes.
+        """
+        # Previews are rendered once after loading instead of once per widget change
+        with self.render_scheduler.suspended():
+            # Set variables first, so the keys of the rotation can be checked against them
+            self.variables_tab.set_variables_data(rotation.variables)
+
+            makros = rotation.makros
+            changed_keys = 0
+            variable_names = self.variables_tab.variable_names
+            for index, makro in enumerate(makros):
+                if index < len(self.makro_frames):
+                    # Keep the page and its model, replacing only the keys that differ
+                    makro_info = self.makro_frames[index]
+                    if makro_info['editor'] is not None:
+                        changed_keys += makro_info['editor'].replace_keys(makro.keys)
+                        continue
+                    replaced, removed = makro_info['makro'].replace_keys(makro.keys)
+                    changed_keys += len(replaced) + removed
+                else:
+                    self.add_makro(makro)
+                    replaced = makro.keys
+                    changed_keys += len(replaced)
+                for key in replaced:
+                    key.clear_missing_variables(variable_names)
+
+            # Destroy pages of makros the rotation does not have, which also removes them from the notebook
+            for makro_info in self.makro_frames[len(makros):]:
+                changed_keys += len(makro_info['makro'].keys)
+                if makro_info is self.shown_makro_info:
+                    self.shown_makro_info = None
+                makro_info['makro_frame'].destroy()
+            del self.makro_frames[len(makros):]
+
+            # Set spells
+            if rotation.spells:
+                self.spells_tab.set_spells_data([slot.to_dict() for slot in rotation.spells])
+            else:
+                logger.debug("Rotation has no spell slots, keeping the current ones")
+
+        if operations_enabled():
+            sizes['changed_keys'] = changed_keys
+            sizes['makros'] = len(makros)
+            sizes['keys'] = sum(len(makro.keys) for makro in makros)
+            sizes['commands'] = sum(len(key.commands) for makro in makros for key in makro.keys)
+
+        self.problems_tab.invalidate()
+        self.problems_tab.request_check()
 
     def update_variable_lists(self, variable_names):
         """
-        Updates the variable names for each key frame in the rotation configuration.
+        Clears selections of removed variables in each makro editor, and in
+        the models of makros without an editor.
 
-        This function takes a list of variable names and updates the variable names
-        for each key frame in the rotation configuration.
+        Called by the VariablesTab when variables are removed or replaced.
+        Added variables need no update, the editors share the VariableNames
+        instance and read it when a dropdown opens.
 
         Parameters
         ----------
-        variable_names : list
-            The list of variable names to update the key frames with.
+        variable_names : VariableNames
+            The shared list of variable names.
 
         Returns
         -------
         None
         """
-        
         for makro_info in self.makro_frames:
-            for key_frame in makro_info['key_frames']:
-                key_frame.update_variable_names(variable_names)
-
-    def generate_config(self):
+            if makro_info['editor'] is not None:
+                makro_info['editor'].update_variable_names(variable_names)
+            else:
+                for key in makro_info['makro'].keys:
+                    key.clear_missing_variables(variable_names)
+        # Cleared selections are not journaled
+        self.problems_tab.invalidate()
+
+    def generate_config(self, path=None, fsync=False):
         """
-        Generates the configuration string for the rotation configuration.
+        Generates the configuration file for the rotation configuration.
+
+        This function streams the variables config, spells config, and key
+        config for each makro of the rotation model into a temp file that is
+        then renamed over the target, so a game client never reads a
+        half-written file. The target is 'rotation_config.txt' in the current
+        directory unless another path is given.
 
-        This function will generate a configuration string by concatenating the
-        variables config, spells config, and key config for each makro. The
-        generated configuration string will be written to a file named
-        'rotation_config.txt' in the current directory.
+        When "Reorder Conditions" is checked, the pure conditions of each key
+        line are reordered so cheap checks run first, see
+        config_optimizer.reorder_conditions. The model is not changed, and
+        each reordering is logged at INFO level.
+
+        When "Optimize Commands" is checked, commands and keys without effect
+        are removed first, see config_optimizer.peephole, and a before/after
+        summary of the size and command count is logged and shown.
+
+        Parameters
+        ----------
+        path : str, optional
+            The file to write, e.g. rotation_config.txt in a client's directory.
+        fsync : bool
+            Whether to fsync the file before replacing the old one.
 
         Returns
         -------
         None
         """
-        config = "[variables]\n"
-        config += self.variables_tab.get_variables_config()
-        config += "\n"
-
-        config += self.spells_tab.get_spell_config()
-
-        # Iterate over makros
-        for idx, makro_info in enumerate(self.makro_frames, start=1):
-            config += f"\n[Makro {idx}]\n"
-            key_frames = makro_info['key_frames']
-            for key_frame in key_frames:
-                key_config = key_frame.get_config()
-                if key_config:
-                    config += key_config + "\n"
-
-        # Additional config settings if needed
-        config += "repeat=1\n"
-        config += "endkeys=dbg % stopped|store % releaseTimer,0|!eq % key,0|(VAR % key)u|store % key,0\n"
-
-        with open("rotation_config.txt", "w") as f:
-            f.write(config)
+        path = path or DEFAULT_CONFIG_PATH
+        original = rotation = self.get_rotation()
+        optimized = []
+        if self.optimize_commands_var.get():
+            rotation, optimized = peephole(rotation, self.command_types)
+            for explanation in optimized:
+                logger.info("Optimized %s", explanation)
+        explanations = []
+        if self.reorder_conditions_var.get():
+            rotation, explanations = reorder_conditions(rotation, self.command_types)
+            for explanation in explanations:
+                logger.info("Reordered %s", explanation)
+        try:
+            with log_operation('generate', file=path, reordered=len(explanations),
+                               optimized=len(optimized)) as sizes:
+                sizes['chars'] = write_config(
+                    rotation, command_templates, path,
+                    on_error=lambda command, e: messagebox.showerror("Error", f"Failed to generate command: {e}"),
+                    fsync=fsync
+                )
+        except OSError as e:
+            messagebox.showerror("Error", f"Failed to write config file '{path}': {e}")
+            return
+
+        message = f"Config file '{path}' has been generated."
+        if self.optimize_commands_var.get():
+            summary = optimization_summary(original, rotation, command_templates, sizes['chars'])
+            logger.info("Optimized config: %s", summary)
+            message += f"\n\nOptimized: {summary}"
+            if optimized:
+                message += "\n" + "\n".join(optimized)
+        if explanations:
+            message += f"\n\n{len(explanations)} run(s) of conditions were reordered:\n" + "\n".join(explanations)
+        messagebox.showinfo("Success", message)
+
+    def generate_config_to(self):
+        """
+        Asks for a target file, e.g. in a game client's directory, and generates the configuration into it.
 
-        messagebox.showinfo("Success", "Config file 'rotation_config.txt' has been generated.")
\ No newline at end of file
+        Returns
+        -------
+        None
+        """
+        path = filedialog.asksaveasfilename(
+            defaultextension=".txt", initialfile=DEFAULT_CONFIG_PATH, filetypes=[("Text files", "*.txt")]
+        )
+        if path:
+            self.generate_config(path)
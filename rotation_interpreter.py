@@ -0,0 +1,707 @@
+""" rotation_interpreter.py
+
+Headless interpreter for the rotation_config.txt language, for checking what
+a rotation does without the game client.
+
+A config is parsed into a Program: the [variables] section (including the
+spellN and slotNspell lines), the key lines of each [Makro N] section and
+the repeat and endkeys lines. Every command of a key line is compiled once
+into a closure taking the Interpreter; it returns False when the rest of the
+line is skipped, either because a condition failed or because of a jump.
+Commands holding (VAR % name) references are resolved when they run and the
+resolved text is compiled once and cached.
+
+Everything the client would ask the game (conditions such as ch, hp or pse)
+or do in the game (key presses, mouse and camera moves, targeting) goes to a
+game state object. MockGameState is a scriptable one; any object with the
+same methods can be passed instead.
+
+One tick is one pass over the key lines of the makro, following Go To jumps.
+Interpreter.step() runs a single command and returns a TraceEntry for it.
+
+Usage:
+    python -m rotation_interpreter rotation_config.txt --ticks 100000
+    python -m rotation_interpreter rotation_config.txt --trace 40 --true ch hp
+"""
+import argparse
+import bisect
+import random
+import re
+import sys
+import time
+from collections import Counter, deque
+
+VAR_REFERENCE = re.compile(r'\(VAR % ([^)]*)\)')
+KEY_ACTION = re.compile(r'^(\S+?)([du])$')
+MAKRO_SECTION = re.compile(r'^\[Makro (\d+)\]$')
+
+# Lines run in one tick before the tick is taken for an endless Go To loop
+MAX_LINES_PER_TICK = 10000
+
+# Cached compiled commands per interpreter, cleared when exceeded
+COMPILE_CACHE_LIMIT = 4096
+
+# Commands asking the game a question, passed to GameState.condition
+CONDITION_OPCODES = (
+    'ch*', 'chid', 'ch', 'kd*', 'kd', 'it', 'ibt', 'td', 'hp', 'mp', 'sta', 'pse', 'ia', 'att', 'wpn*',
+    'wpn', 'cnm', 'ctnm', 'cmhp', 'cphp', 'cthp', 'cnpw', 'cts', 'ctw', 'gp', 'cne',
+)
+
+# Commands acting in the game, passed to GameState.action
+ACTION_OPCODES = (
+    'm', 'rm', 'c', 'cy', 'te', 'tcm', 'tcp', 'tmhp', 'tphp', 'tcpw', 'tce', 'lt', 'lt-', 'ign', 'tct',
+    'tpt', 'tar', 'mt', 'mtm', 'ms', 'lwf', 'call', 'cc', 'to',
+)
+
+# Commands run by the interpreter itself, without a " % " separator
+BUILTIN_OPCODES = ('gt', 's', 'rs', 'rand', 'rkd', 'rku', 'nop', 'cmp')
+
+# Opcodes whose argument may start with a letter, e.g. "toF3"
+ALPHA_ARGUMENT_OPCODES = ('to',)
+
+# All opcodes without " % ", longest first so "chid" wins over "ch"
+PREFIX_OPCODES = sorted(set(CONDITION_OPCODES + ACTION_OPCODES + BUILTIN_OPCODES), key=len, reverse=True)
+
+
+class Program:
+    """
+    A parsed rotation_config.txt.
+
+    Attributes
+    ----------
+    variables : dict[str, str]
+        The [variables] section, including the spellN and slotNspell lines.
+    makros : dict[int, list[tuple[int, list[str]]]]
+        The (key number, command texts) lines of each makro, by makro number.
+    repeat : bool
+        Whether the makro starts over after its last key line.
+    endkeys : list[str]
+        The commands run when the makro is stopped.
+    """
+    __slots__ = ('variables', 'makros', 'repeat', 'endkeys')
+
+    def __init__(self, variables=None, makros=None, repeat=True, endkeys=None):
+        self.variables = variables if variables is not None else {}
+        self.makros = makros if makros is not None else {}
+        self.repeat = repeat
+        self.endkeys = endkeys if endkeys is not None else []
+
+
+def split_commands(text):
+    """
+    Returns the non-empty commands of a pipe-separated line.
+    """
+    return [command for command in text.split('|') if command.strip()]
+
+
+def parse_config(text):
+    """
+    Parses the text written by generate_config.
+
+    Parameters
+    ----------
+    text : str
+        The rotation_config.txt content.
+
+    Returns
+    -------
+    Program
+        The parsed config.
+
+    Raises
+    ------
+    ValueError
+        If a line is neither a section header nor a name=value line.
+    """
+    program = Program()
+    makro = None
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith('['):
+            match = MAKRO_SECTION.match(line)
+            if match:
+                makro = program.makros.setdefault(int(match.group(1)), [])
+            elif line == '[variables]':
+                makro = None
+            else:
+                raise ValueError(f"line {line_number}: unknown section {line!r}")
+            continue
+        name, separator, value = line.partition('=')
+        if not separator:
+            raise ValueError(f"line {line_number}: expected name=value, got {line!r}")
+        if name == 'repeat':
+            program.repeat = value.strip() != '0'
+        elif name == 'endkeys':
+            program.endkeys = split_commands(value)
+        elif makro is not None and name.startswith('keys'):
+            key_number = int(name[4:]) if name[4:] else 1
+            makro.append((key_number, split_commands(value)))
+        else:
+            program.variables[name] = value
+    return program
+
+
+def format_number(number):
+    """
+    Returns a number as stored in a variable: without ".0" for whole numbers.
+    """
+    if number == int(number):
+        return str(int(number))
+    return repr(number)
+
+
+def to_number(text):
+    """
+    Returns text as a float, or None if it is not a number.
+    """
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def compare(left, right):
+    """
+    Returns -1, 0 or 1 comparing two values, numerically when both are numbers.
+    """
+    left_number = to_number(left)
+    right_number = to_number(right)
+    if left_number is not None and right_number is not None:
+        left, right = left_number, right_number
+    return (left > right) - (left < right)
+
+
+def split_arguments(text):
+    """
+    Returns the comma-separated arguments of a command, stripped.
+    """
+    return [argument.strip() for argument in text.split(',')] if text.strip() else []
+
+
+def match_opcode(body):
+    """
+    Splits a command without " % " into its opcode and argument text.
+
+    Returns
+    -------
+    tuple[str, str] or None
+        The opcode and the rest of the command, or None if no opcode matches.
+    """
+    for opcode in PREFIX_OPCODES:
+        if body.startswith(opcode):
+            rest = body[len(opcode):]
+            if not rest or not rest[0].isalpha() or opcode in ALPHA_ARGUMENT_OPCODES:
+                return opcode, rest
+    return None
+
+
+def compile_command(text):
+    """
+    Compiles one command into a closure.
+
+    The closure takes the Interpreter and returns True to go on with the
+    line, or False to skip the rest of it.
+
+    Parameters
+    ----------
+    text : str
+        The command text, e.g. "!eq % key,0" or "(VAR % key)u".
+
+    Returns
+    -------
+    callable
+        The compiled command.
+    """
+    text = text.strip()
+    if '(VAR %' in text:
+        return compile_dynamic(text)
+
+    negate = text.startswith('!')
+    body = text[1:] if negate else text
+    if ' % ' in body or body.endswith(' %'):
+        opcode, _, argument = body.partition(' %')
+        function = compile_percent_command(opcode.strip(), argument.strip())
+    else:
+        match = match_opcode(body)
+        if match is not None:
+            function = compile_prefix_command(match[0], match[1].strip())
+        else:
+            function = compile_other(body)
+    if negate:
+        return lambda vm, function=function: not function(vm)
+    return function
+
+
+def compile_dynamic(text):
+    """
+    Compiles a command holding (VAR % name) references. The references are
+    resolved with the current variables each time it runs.
+    """
+    def run(vm):
+        variables = vm.variables
+        resolved = text
+        for _ in range(8):  # Values may hold references themselves
+            if '(VAR %' not in resolved:
+                break
+            resolved = VAR_REFERENCE.sub(lambda match: variables.get(match.group(1), ''), resolved)
+        return vm.compiled(resolved)(vm)
+    return run
+
+
+def compile_percent_command(opcode, argument):
+    """
+    Compiles a command of the form "<opcode> % <arguments>".
+    """
+    arguments = split_arguments(argument)
+
+    if opcode == 'eq':
+        name, value = (arguments + ['', ''])[:2]
+        return lambda vm: compare(vm.value(name), vm.value(value)) == 0
+    if opcode == 'cmp':
+        left, right = (arguments + ['', ''])[:2]
+        return lambda vm: compare(vm.value(left), vm.value(right)) < 0
+    if opcode == 'ct':
+        name = argument
+        return lambda vm: vm.state.now >= vm.timers.get(name, 0)
+    if opcode == 'st':
+        name, delay = (arguments + ['', '0'])[:2]
+
+        def set_timer(vm):
+            vm.timers[name] = vm.state.now + float(vm.value(delay))
+            return True
+        return set_timer
+    if opcode == 'store':
+        name, value = (arguments + ['', ''])[:2]
+
+        def store(vm):
+            vm.variables[name] = vm.value(value)
+            return True
+        return store
+    if opcode in ('add', 'sub', 'mul', 'div'):
+        name, value = (arguments + ['', '0'])[:2]
+        operation = {
+            'add': lambda a, b: a + b,
+            'sub': lambda a, b: a - b,
+            'mul': lambda a, b: a * b,
+            'div': lambda a, b: a / b,
+        }[opcode]
+
+        def arithmetic(vm):
+            current = to_number(vm.variables.get(name, '0')) or 0.0
+            vm.variables[name] = format_number(operation(current, float(vm.value(value))))
+            return True
+        return arithmetic
+    if opcode == 'dbg':
+        message = argument
+
+        def debug(vm):
+            vm.state.debug(message)
+            return True
+        return debug
+    if opcode == 'or':
+        alternatives = [compile_command(part) for part in argument.split('(') if part.strip()]
+        return lambda vm: any(alternative(vm) for alternative in alternatives)
+    if opcode in CONDITION_OPCODES:
+        return lambda vm: vm.state.condition(opcode, arguments)
+
+    def action(vm):
+        vm.state.action(opcode, arguments)
+        return True
+    return action
+
+
+def compile_prefix_command(opcode, argument):
+    """
+    Compiles a command made of an opcode glued to its arguments, e.g. "gt16".
+    """
+    arguments = split_arguments(argument)
+
+    if opcode == 'gt':
+        target = int(argument)
+
+        def jump(vm):
+            vm.jump = target
+            return False
+        return jump
+    if opcode == 's':
+        milliseconds = float(argument)
+
+        def sleep(vm):
+            vm.state.sleep(milliseconds)
+            return True
+        return sleep
+    if opcode == 'rs':
+        low, high = (float(arguments[0]), float(arguments[1]))
+
+        def random_sleep(vm):
+            vm.state.sleep(vm.state.random.uniform(low, high))
+            return True
+        return random_sleep
+    if opcode == 'rand':
+        low, high = (int(arguments[0]), int(arguments[1]))
+
+        def random_number(vm):
+            vm.variables['RAND'] = str(vm.state.random.randint(low, high))
+            return True
+        return random_number
+    if opcode == 'rkd':
+        def random_key_down(vm):
+            vm.random_key = vm.state.random.choice(arguments)
+            vm.state.key_down(vm.random_key)
+            return True
+        return random_key_down
+    if opcode == 'rku':
+        def random_key_up(vm):
+            if vm.random_key is not None:
+                vm.state.key_up(vm.random_key)
+                vm.random_key = None
+            return True
+        return random_key_up
+    if opcode == 'nop':
+        return lambda vm: True
+    if opcode == 'cmp':
+        left, right = (arguments + ['', ''])[:2]
+        return lambda vm: compare(vm.value(left), vm.value(right)) < 0
+    if opcode in CONDITION_OPCODES:
+        return lambda vm: vm.state.condition(opcode, arguments)
+
+    def action(vm):
+        vm.state.action(opcode, arguments)
+        return True
+    return action
+
+
+def compile_other(body):
+    """
+    Compiles a key press or release ("87d", "spell1u"), or a bare variable
+    name whose value is run as a command.
+    """
+    match = KEY_ACTION.match(body)
+    token, direction = match.groups() if match is not None else (None, None)
+
+    def run(vm):
+        value = vm.variables.get(body)
+        if value is not None:
+            # A variable holding a command, e.g. inRangedAttackRange=cnm1,13000
+            return vm.compiled(value)(vm)
+        if direction is None:
+            vm.state.action(body, [])
+            return True
+        code = vm.value(token)
+        if direction == 'd':
+            vm.state.key_down(code)
+        else:
+            vm.state.key_up(code)
+        return True
+    return run
+
+
+class MockGameState:
+    def __init__(self, conditions=None, default=False, seed=None, debug_history=100):
+        """
+        Scriptable game state for the interpreter.
+
+        Conditions are answered from a table. Key presses and actions are
+        counted rather than stored, so long runs use constant memory.
+
+        Parameters
+        ----------
+        conditions : dict, optional
+            Opcodes (e.g. 'ch', 'hp') mapped to True, False or a callable
+            taking the argument list and returning a bool.
+        default : bool
+            The answer for opcodes not in conditions.
+        seed : int, optional
+            Seed of the random numbers used by rand, rs and rkd.
+        debug_history : int
+            Number of recent dbg messages kept.
+        """
+        self.conditions = dict(conditions or {})
+        self.default = default
+        self.random = random.Random(seed)
+        self.now = 0.0  # Game time in milliseconds, advanced by sleeps
+        self.held_keys = set()
+        self.key_presses = Counter()
+        self.actions = Counter()
+        self.debug_messages = deque(maxlen=debug_history)
+
+    def condition(self, opcode, arguments):
+        """
+        Returns the answer to a condition command.
+        """
+        answer = self.conditions.get(opcode, self.default)
+        return bool(answer(arguments)) if callable(answer) else answer
+
+    def action(self, opcode, arguments):
+        """
+        Records an action command, e.g. a camera or mouse move.
+        """
+        self.actions[opcode] += 1
+
+    def key_down(self, code):
+        """
+        Records a key being pressed.
+        """
+        self.held_keys.add(code)
+        self.key_presses[code] += 1
+
+    def key_up(self, code):
+        """
+        Records a key being released.
+        """
+        self.held_keys.discard(code)
+
+    def sleep(self, milliseconds):
+        """
+        Advances the game time.
+        """
+        self.now += milliseconds
+
+    def debug(self, message):
+        """
+        Records a dbg message.
+        """
+        self.debug_messages.append(message)
+
+
+class TraceEntry:
+    """
+    One command run by Interpreter.step().
+
+    Attributes
+    ----------
+    tick : int
+        The number of the tick, counted from 0.
+    key : int
+        The key number of the line.
+    command : int
+        The 1-based command number in the line.
+    text : str
+        The command text.
+    result : bool
+        False if the rest of the line was skipped.
+    jump : int or None
+        The key number jumped to, for Go To commands.
+    """
+    __slots__ = ('tick', 'key', 'command', 'text', 'result', 'jump')
+
+    def __init__(self, tick, key, command, text, result, jump=None):
+        self.tick = tick
+        self.key = key
+        self.command = command
+        self.text = text
+        self.result = result
+        self.jump = jump
+
+    def __str__(self):
+        outcome = f"jump {self.jump}" if self.jump is not None else ("ok" if self.result else "skip line")
+        return f"tick {self.tick} key {self.key} #{self.command}: {self.text} -> {outcome}"
+
+
+class Interpreter:
+    def __init__(self, program, state=None, makro=1):
+        """
+        Initialize the Interpreter class.
+
+        Parameters
+        ----------
+        program : Program
+            The parsed config.
+        state : MockGameState or compatible, optional
+            The game state; a MockGameState with all conditions False if not given.
+        makro : int
+            The number of the makro to run.
+
+        Raises
+        ------
+        KeyError
+            If the config has no such makro.
+        """
+        self.program = program
+        self.state = state if state is not None else MockGameState()
+        self.variables = dict(program.variables)
+        self.timers = {}
+        self.random_key = None
+        self.jump = None  # Key number set by a Go To command
+        self.cache = {}  # Command text -> compiled command
+
+        lines = sorted(program.makros[makro])
+        self.key_numbers = [key_number for key_number, _ in lines]
+        self.texts = [commands for _, commands in lines]
+        self.lines = [tuple(self.compiled(command) for command in commands) for commands in self.texts]
+        self.endkeys = [self.compiled(command) for command in program.endkeys]
+
+        self.ticks = 0
+        self.line_index = 0  # Position of step()
+        self.command_index = 0
+
+    def compiled(self, text):
+        """
+        Returns the compiled command for a command text, compiling it once.
+        """
+        function = self.cache.get(text)
+        if function is None:
+            if len(self.cache) >= COMPILE_CACHE_LIMIT:
+                self.cache.clear()
+            function = self.cache[text] = compile_command(text)
+        return function
+
+    def value(self, token):
+        """
+        Returns the value of a variable, or the token itself if it is not a variable.
+        """
+        return self.variables.get(token, token)
+
+    def line_after_jump(self):
+        """
+        Returns the line index a Go To jumps to: the line of the target key,
+        or the next line after it when the key has no line.
+        """
+        target, self.jump = self.jump, None
+        return bisect.bisect_left(self.key_numbers, target)
+
+    def tick(self):
+        """
+        Runs one pass over the key lines of the makro.
+
+        Raises
+        ------
+        RuntimeError
+            If the pass runs more than MAX_LINES_PER_TICK lines, e.g. because
+            of an endless Go To loop.
+        """
+        lines = self.lines
+        count = len(lines)
+        index = 0
+        budget = MAX_LINES_PER_TICK
+        while index < count:
+            for function in lines[index]:
+                if not function(self):
+                    break
+            if self.jump is not None:
+                index = self.line_after_jump()
+                budget -= 1
+                if not budget:
+                    raise RuntimeError(f"more than {MAX_LINES_PER_TICK} lines run in tick {self.ticks}")
+            else:
+                index += 1
+        self.ticks += 1
+
+    def run(self, ticks):
+        """
+        Runs up to ticks passes; only one unless the config repeats.
+
+        Returns
+        -------
+        int
+            The number of ticks run.
+        """
+        if not self.program.repeat:
+            ticks = min(ticks, 1)
+        for _ in range(ticks):
+            self.tick()
+        return ticks
+
+    def step(self):
+        """
+        Runs the next command and returns its trace.
+
+        Returns
+        -------
+        TraceEntry
+            The command that ran and its outcome.
+        """
+        while self.line_index < len(self.lines) and self.command_index >= len(self.lines[self.line_index]):
+            self.line_index += 1
+            self.command_index = 0
+        if self.line_index >= len(self.lines):
+            self.ticks += 1
+            self.line_index = self.command_index = 0
+            if not self.lines or not any(self.lines):
+                raise RuntimeError("the makro has no commands")
+            return self.step()
+
+        function = self.lines[self.line_index][self.command_index]
+        entry = TraceEntry(self.ticks, self.key_numbers[self.line_index], self.command_index + 1,
+                           self.texts[self.line_index][self.command_index], function(self))
+        if self.jump is not None:
+            entry.jump = self.jump
+            self.line_index = self.line_after_jump()
+            self.command_index = 0
+        elif entry.result:
+            self.command_index += 1
+        else:
+            self.line_index += 1
+            self.command_index = 0
+        return entry
+
+    def stop(self):
+        """
+        Runs the endkeys commands, as the client does when the makro is stopped.
+        """
+        for function in self.endkeys:
+            if not function(self):
+                break
+        self.jump = None
+
+
+def parse_conditions(names):
+    """
+    Returns a conditions table answering True for the given opcodes.
+    """
+    return {name: True for name in names or []}
+
+
+def main(argv=None):
+    """
+    Command-line entry point. Returns the process exit code.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m rotation_interpreter",
+        description="Run a generated rotation_config.txt against a mock game state."
+    )
+    parser.add_argument('config', help="the rotation_config.txt to run")
+    parser.add_argument('--makro', type=int, default=1, help="number of the makro to run (default: 1)")
+    parser.add_argument('--ticks', type=int, default=10000, help="number of passes to run (default: 10000)")
+    parser.add_argument('--trace', type=int, default=0, metavar='N', help="print the first N commands run")
+    parser.add_argument('--true', nargs='*', default=[], metavar='OPCODE',
+                        help="condition opcodes that succeed, e.g. ch hp (others fail)")
+    parser.add_argument('--seed', type=int, default=0, help="seed for rand, rs and rkd (default: 0)")
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.config, 'r') as f:
+            program = parse_config(f.read())
+        interpreter = Interpreter(program, MockGameState(parse_conditions(args.true), seed=args.seed), args.makro)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"FAILED {args.config}: {e}", file=sys.stderr)
+        return 1
+
+    if args.trace:
+        for _ in range(args.trace):
+            print(interpreter.step())
+        return 0
+
+    start = time.perf_counter()
+    try:
+        ticks = interpreter.run(args.ticks)
+    except (RuntimeError, ValueError, IndexError) as e:
+        print(f"FAILED in tick {interpreter.ticks}: {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+    interpreter.stop()
+
+    state = interpreter.state
+    print(f"{ticks} ticks in {elapsed * 1000:.1f} ms ({ticks / max(elapsed, 1e-9) * 60:,.0f} ticks/min), "
+          f"game time {state.now / 1000:.1f} s")
+    for code, count in state.key_presses.most_common():
+        print(f"  key {code}: {count} presses")
+    for opcode, count in state.actions.most_common():
+        print(f"  action {opcode}: {count}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
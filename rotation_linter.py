@@ -0,0 +1,363 @@
+""" rotation_linter.py
+
+Static checks for rotations, run before a config reaches the game client.
+
+The linter flags:
+    - 'Go To' / 'Go To Line' targets past the last key of the makro
+    - (VAR % name) references to variables that are not defined
+    - 'Slot Number' parameters pointing at empty spell slots
+    - commands whose parameter count does not match the placeholders of
+      their format, and commands of a type whose format does not match its
+      params (see CommandTemplate.check), which fail or render wrong text
+
+Keys are checked from their content signature, see Key.signature(). Results
+are cached per signature, so a re-check only looks at the keys that changed
+since the last run; a snapshot of the rotation is taken first, so the checks
+can run on a worker thread while the model is being edited. SnapshotCache
+keeps the signatures between snapshots, so the editing thread only computes
+those of the keys it was told changed.
+
+Usage:
+    python -m rotation_linter my_config.json
+    python -m rotation_linter configs/ --jobs 8
+"""
+import argparse
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from command_templates import command_templates
+from command_types import command_types
+from config_compiler import collect_inputs
+from config_format import read_rotation
+from rotation_model import get_spell_ids
+
+# Command types whose parameter is the 1-based number of a key of the makro
+JUMP_COMMANDS = ('Go To', 'Go To Line')
+
+# Variables set by the game client rather than the [variables] section
+BUILTIN_VARIABLES = frozenset(('RAND', 'TN', 'TID'))
+
+VAR_REFERENCE = re.compile(r'\(VAR % ([^)]*)\)')
+
+
+class Problem:
+    """
+    A problem found by the linter.
+
+    Attributes
+    ----------
+    makro : int or None
+        The 1-based makro number, or None for a problem in the variables.
+    key : int or None
+        The 1-based key number in the makro.
+    command : int or None
+        The 1-based command number in the key.
+    message : str
+        The description of the problem.
+    """
+    __slots__ = ('makro', 'key', 'command', 'message')
+
+    def __init__(self, makro, key, command, message):
+        self.makro = makro
+        self.key = key
+        self.command = command
+        self.message = message
+
+    def location(self):
+        """
+        Returns the location of the problem, e.g. "Makro 1, key 3, command 2".
+        """
+        if self.makro is None:
+            return "Variables"
+        return f"Makro {self.makro}, key {self.key}, command {self.command}"
+
+    def __str__(self):
+        return f"{self.location()}: {self.message}"
+
+
+def snapshot(rotation):
+    """
+    Returns an immutable copy of what the linter reads from a rotation.
+
+    Taking the snapshot is the only step that touches the model, so it is
+    done on the Tk thread and the snapshot is checked on a worker thread.
+
+    Parameters
+    ----------
+    rotation : Rotation
+        The rotation to check.
+
+    Returns
+    -------
+    tuple
+        The key signatures per makro, the variables as (name, value) pairs,
+        and the spell labels and names per slot.
+    """
+    return (
+        tuple(tuple(key.signature() for key in makro.keys) for makro in rotation.makros),
+    ) + context_snapshot(rotation)
+
+
+def context_snapshot(rotation):
+    """
+    Returns the parts of a snapshot besides the key signatures: the variables
+    as (name, value) pairs, and the spell labels and names per slot.
+    """
+    return (
+        tuple(rotation.variables.items()),
+        tuple(get_spell_ids(rotation.spells)),
+        tuple(slot.spell_name for slot in rotation.spells),
+    )
+
+
+class SnapshotCache:
+    """
+    Takes snapshots like snapshot(), computing only the signatures of keys
+    that changed since the last one.
+
+    Edits must be reported with key_changed(); changes that are not, e.g.
+    loading a rotation or clearing removed variables from commands, with
+    invalidate(). Makros and keys are told apart by identity.
+    """
+    __slots__ = ('makros', 'changed')
+
+    def __init__(self):
+        self.makros = {}  # Makro -> (signatures, {Key: signature}) of the last snapshot
+        self.changed = {}  # Makro -> set of changed keys, None for keys added or removed
+
+    def key_changed(self, makro, key=None):
+        """
+        Records an edit of a key of a makro; key is None when keys were added
+        or removed.
+        """
+        changed = self.changed.setdefault(makro, set())
+        if key is not None:
+            changed.add(key)
+
+    def invalidate(self):
+        """
+        Forgets all signatures, so the next snapshot computes them again.
+        """
+        self.makros = {}
+        self.changed = {}
+
+    def snapshot(self, rotation):
+        """
+        Returns the snapshot of a rotation, see snapshot().
+        """
+        makros = {}
+        signatures = []
+        for makro in rotation.makros:
+            cached = self.makros.get(makro)
+            changed = self.changed.get(makro)
+            if cached is None or changed is not None:
+                known = cached[1] if cached is not None else {}
+                key_signatures = {}
+                for key in makro.keys:
+                    signature = None if changed and key in changed else known.get(key)
+                    key_signatures[key] = signature if signature is not None else key.signature()
+                cached = (tuple(key_signatures[key] for key in makro.keys), key_signatures)
+            makros[makro] = cached
+            signatures.append(cached[0])
+        self.makros = makros
+        self.changed = {}
+        return (tuple(signatures),) + context_snapshot(rotation)
+
+
+class RotationLinter:
+    def __init__(self, types=command_types, templates=command_templates):
+        """
+        Initialize the RotationLinter class.
+
+        Parameters
+        ----------
+        types : dict
+            The dictionary of available command types, used for parameter names.
+        templates : dict[str, CommandTemplate]
+            The compiled command templates, used for placeholder counts.
+        """
+        self.command_types = types
+        self.templates = templates
+        self.context = None  # Variable names and spell slots the cache was built for
+        self.cache = {}  # (key signature, key count) -> list of (command number, message)
+        self.checked_keys = 0  # Keys checked by the last run, the others came from the cache
+
+    def lint(self, rotation):
+        """
+        Checks a rotation. Must be called on the thread that edits the rotation.
+
+        Returns
+        -------
+        list[Problem]
+            The problems in makro, key and command order, then those of the variables.
+        """
+        return self.check(snapshot(rotation))
+
+    def check(self, rotation_snapshot):
+        """
+        Checks a snapshot taken by snapshot(). Can run on a worker thread,
+        but not concurrently with itself.
+
+        Keys whose signature and makro size were already checked against the
+        same variable names and spell slots are taken from the cache.
+
+        Returns
+        -------
+        list[Problem]
+            The problems in makro, key and command order, then those of the variables.
+        """
+        makros, variables, spell_labels, spell_names = rotation_snapshot
+        names = frozenset(name for name, _ in variables) | BUILTIN_VARIABLES
+        context = (names, spell_labels, spell_names)
+        if context != self.context:
+            self.context = context
+            self.cache = {}
+
+        # Only entries of keys that still exist are kept for the next run
+        cache, self.cache = self.cache, {}
+        self.checked_keys = 0
+        problems = []
+        for makro_number, keys in enumerate(makros, start=1):
+            for key_number, signature in enumerate(keys, start=1):
+                entry = (signature, len(keys))
+                key_problems = self.cache.get(entry)
+                if key_problems is None:
+                    key_problems = cache.get(entry)
+                    if key_problems is None:
+                        key_problems = self.check_key(signature, len(keys), names, spell_labels, spell_names)
+                        self.checked_keys += 1
+                    self.cache[entry] = key_problems
+                for command_number, message in key_problems:
+                    problems.append(Problem(makro_number, key_number, command_number, message))
+
+        for name, value in variables:
+            for reference in VAR_REFERENCE.findall(value):
+                if reference not in names:
+                    problems.append(Problem(None, None, None,
+                                            f"'{name}' refers to undefined variable '{reference}'"))
+        return problems
+
+    def check_key(self, signature, key_count, names, spell_labels, spell_names):
+        """
+        Checks the commands of one key.
+
+        Parameters
+        ----------
+        signature : tuple
+            The key signature, see Key.signature().
+        key_count : int
+            The number of keys of the makro, the last valid jump target.
+        names : frozenset[str]
+            The defined variable names.
+        spell_labels : tuple[str]
+            The labels of the selected spells, see spell_label.
+        spell_names : tuple[str]
+            The spell name of every slot, '' for an empty slot.
+
+        Returns
+        -------
+        list[tuple[int, str]]
+            The 1-based command number and message of each problem.
+        """
+        problems = []
+        for command_number, (command_type, parameters) in enumerate(signature, start=1):
+            if not command_type:
+                continue
+            template = self.templates.get(command_type)
+            if template is None:
+                problems.append((command_number, f"unknown command type '{command_type}'"))
+                continue
+            if template.problems:
+                problems.extend((command_number, problem) for problem in template.problems)
+            elif command_type != "Custom Command" and len(parameters) != template.arity:
+                problems.append((command_number,
+                                 f"'{command_type}' has {len(parameters)} input(s) but its format "
+                                 f"{template.format!r} has {template.arity} placeholder(s)"))
+
+            param_names = template.params
+            for index, (parameter_type, value) in enumerate(parameters):
+                param_name = param_names[index] if index < len(param_names) else ''
+                is_slot = param_name.lower() == 'slot number'
+                if parameter_type == 'Var':
+                    if is_slot:
+                        if value not in spell_labels:
+                            problems.append((command_number, f"'{param_name}' refers to an empty spell slot"))
+                    elif not value:
+                        problems.append((command_number, f"'{param_name}' has no variable selected"))
+                    elif value not in names:
+                        problems.append((command_number, f"'{param_name}' refers to undefined variable '{value}'"))
+                    continue
+
+                if is_slot and value.isdigit():
+                    slot_number = int(value)
+                    if not 1 <= slot_number <= len(spell_names) or not spell_names[slot_number - 1]:
+                        problems.append((command_number, f"'{param_name}' refers to empty spell slot {slot_number}"))
+                if command_type in JUMP_COMMANDS and value.isdigit():
+                    target = int(value)
+                    if not 1 <= target <= key_count:
+                        problems.append((command_number,
+                                         f"jumps to key {target}, but the makro has {key_count} key(s)"))
+                for reference in VAR_REFERENCE.findall(value):
+                    if reference not in names:
+                        problems.append((command_number, f"refers to undefined variable '{reference}'"))
+        return problems
+
+
+def lint_file(path):
+    """
+    Lints a saved config file, returning the error message instead of raising
+    so one bad file does not stop a batch.
+
+    Returns
+    -------
+    tuple[str, list[str], str or None]
+        The path, the problems as text and the error message.
+    """
+    try:
+        rotation = read_rotation(path, command_types)
+    except Exception as e:
+        return path, [], str(e)
+    return path, [str(problem) for problem in RotationLinter().lint(rotation)], None
+
+
+def main(argv=None):
+    """
+    Command-line entry point. Returns the process exit code: 0 when no
+    problems were found, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m rotation_linter",
+        description="Check saved rotation configs for mistakes that only show up in the game."
+    )
+    parser.add_argument('inputs', nargs='+', help="JSON config files or directories of them")
+    parser.add_argument('-j', '--jobs', type=int, default=1, help="number of worker processes (default: 1)")
+    args = parser.parse_args(argv)
+
+    inputs = collect_inputs(args.inputs)
+    if not inputs:
+        parser.error("no config files found")
+
+    if args.jobs > 1 and len(inputs) > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+            results = list(executor.map(lint_file, inputs, chunksize=max(1, len(inputs) // (args.jobs * 4))))
+    else:
+        results = [lint_file(path) for path in inputs]
+
+    failures = 0
+    total = 0
+    for path, problems, error in results:
+        if error is not None:
+            failures += 1
+            print(f"FAILED {path}: {error}", file=sys.stderr)
+            continue
+        if problems:
+            failures += 1
+        total += len(problems)
+        for problem in problems:
+            print(f"{path}: {problem}")
+    print(f"{total} problem(s) in {len(results)} config(s)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,527 @@
+""" rotation_model.py """
+
+
+class Parameter:
+    """
+    A single command parameter.
+
+    Attributes
+    ----------
+    name : str
+        The lower-cased parameter name from command_types, e.g. 'slot number'.
+    type : str
+        Either 'Value' for a literal or 'Var' for a variable/spell reference.
+    value : str
+        The literal value, variable name or spell label.
+    """
+    __slots__ = ('name', 'type', 'value')
+
+    def __init__(self, name='', type='Value', value=''):
+        self.name = name
+        self.type = type
+        self.value = value
+
+    def to_dict(self):
+        """
+        Returns the parameter in the saved config format.
+        """
+        return {'type': self.type, 'value': self.value}
+
+    def signature(self):
+        """
+        Returns a hashable value that is equal for parameters with equal content.
+        """
+        return (self.type, self.value)
+
+
+class Command:
+    """
+    A command inside a key line.
+
+    Attributes
+    ----------
+    command_type : str
+        The name of the command in command_types, or '' when unset.
+    parameters : list[Parameter]
+        One Parameter per entry in the command's 'params' list.
+    """
+    __slots__ = ('command_type', 'parameters')
+
+    def __init__(self, command_type='', parameters=None):
+        self.command_type = command_type
+        self.parameters = parameters if parameters is not None else []
+
+    def set_command_type(self, command_type, command_types):
+        """
+        Changes the command type and recreates empty parameters for it.
+
+        Parameters
+        ----------
+        command_type : str
+            The new command type.
+        command_types : dict
+            The dictionary of available command types.
+        """
+        self.command_type = command_type
+        if command_type:
+            params = command_types[command_type].get('params', [])
+            self.parameters = [Parameter(param.lower()) for param in params]
+        else:
+            self.parameters = []
+
+    def signature(self):
+        """
+        Returns a hashable value that is equal for commands with equal content.
+
+        Models compare by identity, so editors can tell apart equal commands;
+        use signatures to compare content, e.g. when diffing two rotations.
+        """
+        return (self.command_type, tuple(parameter.signature() for parameter in self.parameters))
+
+    def to_dict(self):
+        """
+        Returns the command in the saved config format.
+        """
+        return {
+            'command_type': self.command_type,
+            'parameters': [parameter.to_dict() for parameter in self.parameters]
+        }
+
+    @classmethod
+    def from_dict(cls, data, command_types):
+        """
+        Creates a command from the saved config format.
+
+        Parameter names are taken from command_types. Configs from releases
+        that saved parameters as plain strings are converted beforehand by
+        config_format.migrate.
+
+        Parameters
+        ----------
+        data : dict
+            The command data dictionary.
+        command_types : dict
+            The dictionary of available command types.
+
+        Returns
+        -------
+        Command
+            The created command.
+        """
+        command = cls()
+        command.set_command_type(data.get('command_type', ''), command_types)
+        for parameter, param_data in zip(command.parameters, data.get('parameters', [])):
+            parameter.type = param_data.get('type', 'Value')
+            parameter.value = param_data.get('value', '')
+        return command
+
+
+class Key:
+    """
+    A key line of a makro, holding an ordered list of commands.
+    """
+    __slots__ = ('commands',)
+
+    def __init__(self, commands=None):
+        self.commands = commands if commands is not None else []
+
+    def signature(self):
+        """
+        Returns a hashable value that is equal for keys with equal content.
+        """
+        return tuple(command.signature() for command in self.commands)
+
+    def clear_missing_variables(self, variable_names):
+        """
+        Clears 'Var' parameters whose variable is not in variable_names.
+        """
+        for command in self.commands:
+            for parameter in command.parameters:
+                if parameter.type == 'Var' and parameter.name != 'slot number' and parameter.value not in variable_names:
+                    parameter.value = ''
+
+    def to_dict(self):
+        """
+        Returns the key in the saved config format.
+        """
+        return {'commands': [command.to_dict() for command in self.commands]}
+
+    @classmethod
+    def from_dict(cls, data, command_types):
+        """
+        Creates a key from the saved config format.
+        """
+        return cls([Command.from_dict(command_data, command_types) for command_data in data.get('commands', [])])
+
+
+class Makro:
+    """
+    A makro, holding an ordered list of keys.
+    """
+    __slots__ = ('keys',)
+
+    def __init__(self, keys=None):
+        self.keys = keys if keys is not None else []
+
+    def replace_keys(self, keys):
+        """
+        Makes the keys equal to keys, replacing only the keys whose content
+        differs. Unchanged keys keep their Key objects.
+
+        Returns
+        -------
+        tuple[list[Key], int]
+            The keys that were replaced or added, and the number of keys removed.
+        """
+        current = self.keys
+        replaced = []
+        for key_index, key in enumerate(keys):
+            if key_index >= len(current):
+                current.append(key)
+                replaced.append(key)
+            elif current[key_index].signature() != key.signature():
+                current[key_index] = key
+                replaced.append(key)
+        removed = max(len(current) - len(keys), 0)
+        del current[len(keys):]
+        return replaced, removed
+
+    def to_dict(self):
+        """
+        Returns the makro in the saved config format.
+        """
+        return {'Keys': [key.to_dict() for key in self.keys]}
+
+    @classmethod
+    def from_dict(cls, data, command_types):
+        """
+        Creates a makro from the saved config format.
+        """
+        return cls([Key.from_dict(key_data, command_types) for key_data in data.get('Keys', [])])
+
+
+class SpellSlot:
+    """
+    One of the spell slots of the Spells tab.
+
+    Attributes
+    ----------
+    key_id : str
+        The key code used to cast the spell.
+    spell_id : str
+        The variable name holding the spell's id.
+    spell_name : str
+        The title of the selected spell, or '' when the slot is empty.
+    """
+    __slots__ = ('key_id', 'spell_id', 'spell_name')
+
+    def __init__(self, key_id='', spell_id='', spell_name=''):
+        self.key_id = key_id
+        self.spell_id = spell_id
+        self.spell_name = spell_name
+
+    def to_dict(self):
+        """
+        Returns the slot in the saved config format.
+        """
+        return {
+            'spell_entry': self.key_id,
+            'spell_id_entry': self.spell_id,
+            'spell_var': self.spell_name,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Creates a slot from the saved config format.
+        """
+        return cls(data.get('spell_entry', ''), data.get('spell_id_entry', ''), data.get('spell_var', ''))
+
+
+class Rotation:
+    """
+    The complete rotation: makros, variables and spell slots.
+
+    Attributes
+    ----------
+    makros : list[Makro]
+        The makros in tab order.
+    variables : dict
+        Variable names mapped to their values.
+    spells : list[SpellSlot]
+        The spell slots in slot order.
+    """
+    __slots__ = ('makros', 'variables', 'spells')
+
+    def __init__(self, makros=None, variables=None, spells=None):
+        self.makros = makros if makros is not None else []
+        self.variables = variables if variables is not None else {}
+        self.spells = spells if spells is not None else []
+
+    def to_dict(self):
+        """
+        Returns the rotation in the format written by save_current_config.
+        """
+        return {
+            'MAKRO': [makro.to_dict() for makro in self.makros],
+            'variables': dict(self.variables),
+            'spells': [slot.to_dict() for slot in self.spells],
+        }
+
+    @classmethod
+    def from_dict(cls, data, command_types):
+        """
+        Creates a rotation from the format written by save_current_config.
+
+        Parameters
+        ----------
+        data : dict
+            The config data dictionary.
+        command_types : dict
+            The dictionary of available command types.
+
+        Returns
+        -------
+        Rotation
+            The created rotation.
+        """
+        spells_data = data.get('spells', [])
+        if not (isinstance(spells_data, list) and spells_data and isinstance(spells_data[0], dict)):
+            spells_data = []
+        return cls(
+            [Makro.from_dict(makro_data, command_types) for makro_data in data.get('MAKRO', [])],
+            dict(data.get('variables', {})),
+            [SpellSlot.from_dict(spell_data) for spell_data in spells_data],
+        )
+
+
+def spell_label(slot_number, slot):
+    """
+    Returns the label "<slot>: <spell name>" that 'Slot Number' parameters
+    store when they are switched to 'Var'.
+    """
+    return f"{slot_number}: {slot.spell_name}"
+
+
+def get_selected_spells(spell_slots):
+    """
+    Returns (label, spell id) tuples for all spell slots with a selected spell.
+
+    Parameters
+    ----------
+    spell_slots : list[SpellSlot]
+        The spell slots in slot order.
+
+    Returns
+    -------
+    list[tuple[str, str]]
+        The selected spells, labelled as by spell_label.
+    """
+    return [(spell_label(i, slot), slot.spell_id)
+            for i, slot in enumerate(spell_slots, start=1)
+            if slot.spell_name]
+
+
+def get_spell_ids(spell_slots):
+    """
+    Returns a dictionary mapping the label of every selected spell to its spell id.
+
+    Parameters
+    ----------
+    spell_slots : list[SpellSlot]
+        The spell slots in slot order.
+
+    Returns
+    -------
+    dict[str, str]
+        Spell labels mapped to spell ids.
+    """
+    return dict(get_selected_spells(spell_slots))
+
+
+def format_parameters(command, spell_ids):
+    """
+    Resolves the parameters of a command into the strings passed to its format.
+
+    Literal values are used as-is. Variables become "(VAR % name)", and spell
+    labels on 'Slot Number' parameters are resolved to their spell id.
+
+    Parameters
+    ----------
+    command : Command
+        The command whose parameters to resolve.
+    spell_ids : dict[str, str]
+        Spell labels mapped to spell ids, see get_spell_ids.
+
+    Returns
+    -------
+    list[str]
+        The resolved parameter strings.
+    """
+    params = []
+    for parameter in command.parameters:
+        if parameter.type == 'Var':
+            if parameter.name == 'slot number':
+                # Get spell_id from spell name, leaving it empty for a missing spell
+                params.append(f"(VAR % {spell_ids.get(parameter.value, '')})")
+            else:
+                params.append(f"(VAR % {parameter.value})" if parameter.value else "")
+        else:
+            params.append(parameter.value)
+    return params
+
+
+def render_command(command, templates, spell_ids):
+    """
+    Returns the config text for a command.
+
+    Raises IndexError when the command has fewer parameters than its format
+    needs, so callers can decide how to report it.
+
+    Parameters
+    ----------
+    command : Command
+        The command to render.
+    templates : dict[str, CommandTemplate]
+        The compiled command templates, see command_templates.
+    spell_ids : dict[str, str]
+        Spell labels mapped to spell ids, see get_spell_ids.
+
+    Returns
+    -------
+    str
+        The rendered command, or '' when no command type is set.
+    """
+    if not command.command_type:
+        return ""
+    if command.command_type == "Custom Command":
+        return command.parameters[0].value if command.parameters else ""
+    return templates[command.command_type].render(format_parameters(command, spell_ids))
+
+
+def render_key(key, key_number, templates, spell_ids, on_error=None):
+    """
+    Returns the config line for a key.
+
+    The line has the form "keys=<command>|<command>|..." for the first key
+    and "keysX=..." for key number X otherwise.
+
+    Parameters
+    ----------
+    key : Key
+        The key to render.
+    key_number : int
+        The 1-based number of the key in its makro.
+    templates : dict[str, CommandTemplate]
+        The compiled command templates, see command_templates.
+    spell_ids : dict[str, str]
+        Spell labels mapped to spell ids, see get_spell_ids.
+    on_error : callable, optional
+        Called with (command, exception) for commands that fail to render;
+        those commands are skipped. When not given, the exception propagates.
+
+    Returns
+    -------
+    str
+        The rendered line, or '' when the key has no non-empty commands.
+    """
+    commands = []
+    for command in key.commands:
+        try:
+            text = render_command(command, templates, spell_ids)
+        except Exception as e:
+            if on_error is None:
+                raise
+            on_error(command, e)
+            continue
+        if text:
+            commands.append(text)
+    if not commands:
+        return ""
+
+    # Generate key identifier based on key number
+    key_identifier = 'keys' if key_number == 1 else f'keys{key_number}'
+
+    return f"{key_identifier}=" + "|".join(commands)
+
+
+def format_variables_config(variables):
+    """
+    Returns the [variables] section body, one "name=value" line per variable
+    with a non-empty value.
+    """
+    return "\n".join(f"{var}={value}" for var, value in variables.items() if value)
+
+
+def format_spell_config(spell_slots):
+    """
+    Returns the spell section, a "spell<i>=<key_id>" and a
+    "slot<i>spell=chid<i>,(VAR % <spell_id>)" line per spell slot.
+    """
+    config = ""
+    for i, slot in enumerate(spell_slots, 1):
+        config += f"spell{i}={slot.key_id}\n"
+        config += f"slot{i}spell=chid{i},(VAR % {slot.spell_id})\n"
+    return config
+
+
+def iter_config(rotation, templates, on_error=None):
+    """
+    Yields the rotation_config.txt text of a rotation section by section.
+
+    The chunks are the variables section, the spells section, each makro and
+    the trailing repeat/endkeys lines, so a writer can stream them to a file
+    without building the whole text.
+
+    Parameters
+    ----------
+    rotation : Rotation
+        The rotation to render.
+    templates : dict[str, CommandTemplate]
+        The compiled command templates, see command_templates.
+    on_error : callable, optional
+        Passed on to render_key.
+
+    Yields
+    ------
+    str
+        The next chunk of the config text.
+    """
+    spell_ids = get_spell_ids(rotation.spells)
+
+    yield "[variables]\n" + format_variables_config(rotation.variables) + "\n"
+    yield format_spell_config(rotation.spells)
+
+    # Iterate over makros
+    for idx, makro in enumerate(rotation.makros, start=1):
+        lines = [f"\n[Makro {idx}]\n"]
+        for key_number, key in enumerate(makro.keys, start=1):
+            key_config = render_key(key, key_number, templates, spell_ids, on_error)
+            if key_config:
+                lines.append(key_config + "\n")
+        yield "".join(lines)
+
+    # Additional config settings if needed
+    yield "repeat=1\n"
+    yield "endkeys=dbg % stopped|store % releaseTimer,0|!eq % key,0|(VAR % key)u|store % key,0\n"
+
+
+def render_config(rotation, templates, on_error=None):
+    """
+    Returns the complete rotation_config.txt text for a rotation.
+
+    Parameters
+    ----------
+    rotation : Rotation
+        The rotation to render.
+    templates : dict[str, CommandTemplate]
+        The compiled command templates, see command_templates.
+    on_error : callable, optional
+        Passed on to render_key.
+
+    Returns
+    -------
+    str
+        The generated config text.
+    """
+    return "".join(iter_config(rotation, templates, on_error))
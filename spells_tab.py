@@ -1,16 +1,32 @@
 import tkinter as tk
 from tkinter import ttk
 import json
-from PIL import Image, ImageTk
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from icon_cache import IconCache
+from rotation_model import SpellSlot, format_spell_config, spell_label
+from app_log import logger
 
 class SpellsTab:
-    def __init__(self, notebook):
+    def __init__(self, notebook, journal=None):
+        self.journal = journal  # Records spell slot changes for autosave, if given
         self.spells_frame = ttk.Frame(notebook)
         notebook.add(self.spells_frame, text="Spells")
 
         self.load_spell_data()
+        self.icon_cache = IconCache()
+        # Icons are decoded on worker threads; results come back through a queue
+        # that the Tk thread drains with after()
+        self.icon_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='icon')
+        self.icon_results = queue.Queue()
+        self.icon_requests = {}  # spell index -> id of the latest icon request
+        self.icon_request_counter = 0
+        self.icon_poll_scheduled = False
+        self.icon_placeholder = tk.PhotoImage(width=32, height=32)
         self.spell_entries = []
-        self.selected_spells = []  # New list to keep track of selected spells
+        self.spell_slots = []  # SpellSlot models, kept in sync with the widgets
+        self.spell_ids = {}  # Label of each selected spell -> spell id
+        self.selected_spells = []  # (label, spell id) tuples in slot order
 
         self.create_ui()
 
@@ -45,8 +61,14 @@ class SpellsTab:
             spell_id_entry = ttk.Entry(frame, width=22)
             spell_id_entry.pack(side='left', padx=(0, 2))
             spell_id_entry.insert(0, f"spellId{i}")
+
+            self.spell_slots.append(SpellSlot(str(48 + i), f"spellId{i}"))
+            for event in ("<KeyRelease>", "<FocusOut>"):
+                spell_entry.bind(event, lambda e, i=i: self.update_slot(i, key_id=e.widget.get()))
+                spell_id_entry.bind(event, lambda e, i=i: self.update_slot(i, spell_id=e.widget.get()))
             
             spell_var = tk.StringVar()
+            spell_var.trace_add('write', lambda *args, i=i, spell_var=spell_var: self.update_slot(i, spell_name=spell_var.get()))
             spell_dropdown = ttk.Combobox(frame, textvariable=spell_var, values=self.spell_options, width=30)
             spell_dropdown.pack(side='left', padx=(0, 2))
             spell_dropdown.bind('<<ComboboxSelected>>', lambda event, i=i: self.update_spell_icon(event, i))
@@ -60,19 +82,15 @@ class SpellsTab:
         """
         Returns a string containing the current spell configuration.
 
-        This function iterates over the list of spell entries, and for each entry, it
+        This function iterates over the spell slot models, and for each slot, it
         constructs a string in the format "spell<i>=<key_id>\nslot<i>spell=chid<i>,(VAR % <spell_id>)\n"
-        where <i> is the 1-based index of the spell entry, <key_id> is the value of the key ID
-        entry, and <spell_id> is the value of the spell ID entry.
+        where <i> is the 1-based index of the spell slot, <key_id> is the key ID of the slot,
+        and <spell_id> is the spell ID of the slot.
 
         The resulting strings are concatenated together to form the final string, which is
         returned by the function.
         """
-        config = ""
-        for i, (spell_entry, spell_id_entry, spell_var, _, _) in enumerate(self.spell_entries, 1):
-            config += f"spell{i}={spell_entry.get()}\n"
-            config += f"slot{i}spell=chid{i},(VAR % {spell_id_entry.get()})\n"
-        return config
+        return format_spell_config(self.spell_slots)
           
     def load_spell_data(self):
         """
@@ -85,6 +103,38 @@ class SpellsTab:
         with open('images/image_data.json', 'r') as f:
             self.spell_data = json.load(f)
         self.spell_options = [spell['title'] for spell in self.spell_data]
+        # Index the catalog by title, keeping the first entry for duplicate titles
+        self.spells_by_title = {}
+        for spell in self.spell_data:
+            self.spells_by_title.setdefault(spell['title'], spell)
+
+    def update_slot(self, spell_index, **changes):
+        """
+        Updates fields of a spell slot model and keeps the spell id index in sync.
+
+        Only the index entry of the changed slot is replaced, so the cost does
+        not depend on the number of slots or selected spells.
+
+        Parameters
+        ----------
+        spell_index : int
+            The 1-based index of the spell slot.
+        **changes
+            New values for the key_id, spell_id and spell_name fields.
+        """
+        slot = self.spell_slots[spell_index - 1]
+        if all(getattr(slot, field) == value for field, value in changes.items()):
+            return
+        if slot.spell_name:
+            self.spell_ids.pop(spell_label(spell_index, slot), None)
+        for field, value in changes.items():
+            setattr(slot, field, value)
+        if slot.spell_name:
+            self.spell_ids[spell_label(spell_index, slot)] = slot.spell_id
+        if 'spell_name' in changes or 'spell_id' in changes:
+            self.selected_spells = None  # Rebuilt on next get_selected_spells
+        if self.journal is not None:
+            self.journal.spell_slot_changed(spell_index, slot)
 
     def update_spell_icon(self, event, spell_index):
         """
@@ -93,33 +143,73 @@ class SpellsTab:
         This function is called whenever the selected spell changes for a given spell index.
 
         It gets the selected spell name from the spell_var StringVar, and looks up the matching
-        spell info in the spell_data list. If a match is found, it attempts to load the image
-        from the saved location and display it in the icon_label. If the image cannot be loaded,
-        it prints an error message and clears the icon_label.
+        spell info in the spells_by_title index. If a match is found and its 32px thumbnail is in
+        the in-memory icon cache, it is displayed in the icon_label right away. Otherwise a
+        placeholder is shown and the image is decoded and resized on the icon thread pool;
+        process_icon_results shows it once it is ready.
 
-        The function also updates the selected_spells list with tuples of (name, id) for all
-        selected spells.
+        The selected spells are kept in the spell_ids index by update_slot.
         """
         spell_entry, spell_id_entry, spell_var, icon_label, _ = self.spell_entries[spell_index - 1]
         selected_spell = spell_var.get()
-        spell_info = next((spell for spell in self.spell_data if spell['title'] == selected_spell), None)
-        if spell_info:
-            image_path = spell_info['saved_location']
+        spell_info = self.spells_by_title.get(selected_spell)
+        self.icon_requests.pop(spell_index, None)  # Any pending result for this slot is now stale
+        if not spell_info:
+            icon_label.config(image='')
+            icon_label.image = None
+            return
+
+        image_path = spell_info['saved_location']
+        photo = self.icon_cache.get_cached_photo(image_path, (32, 32))
+        if photo is not None:
+            icon_label.config(image=photo)
+            icon_label.image = photo
+            return
+
+        # Show a placeholder until the worker has decoded the icon
+        icon_label.config(image=self.icon_placeholder)
+        icon_label.image = self.icon_placeholder
+        self.icon_request_counter += 1
+        request_id = self.icon_request_counter
+        self.icon_requests[spell_index] = request_id
+        future = self.icon_executor.submit(self.icon_cache.load_image, image_path, (32, 32))
+        future.add_done_callback(
+            lambda f: self.icon_results.put((spell_index, request_id, image_path, f))
+        )
+        if not self.icon_poll_scheduled:
+            self.icon_poll_scheduled = True
+            self.spells_frame.after(10, self.process_icon_results)
+
+    def process_icon_results(self):
+        """
+        Applies decoded icons from the worker threads. Runs on the Tk thread.
+
+        Creates the PhotoImage for each finished icon request and shows it,
+        unless the slot has been given another spell since the request was
+        made. Reschedules itself while requests are still pending.
+        """
+        self.icon_poll_scheduled = False
+        while True:
+            try:
+                spell_index, request_id, image_path, future = self.icon_results.get_nowait()
+            except queue.Empty:
+                break
+            if self.icon_requests.get(spell_index) != request_id:
+                continue  # Stale result, the user picked another spell first
+            icon_label = self.spell_entries[spell_index - 1][3]
             try:
-                image = Image.open(image_path)
-                image = image.resize((32, 32), Image.LANCZOS)
-                photo = ImageTk.PhotoImage(image)
+                photo = self.icon_cache.put_photo(image_path, future.result(), (32, 32))
                 icon_label.config(image=photo)
                 icon_label.image = photo
-                
-                # Update selected_spells list with tuples of (name, id)
-                self.selected_spells = [(f"{i+1}: {spell_var.get()}", spell_id_entry.get()) 
-                                        for i, (_, spell_id_entry, spell_var, _, _) in enumerate(self.spell_entries) 
-                                        if spell_var.get()]
             except Exception as e:
-                print(f"Error loading image: {e}")
-        else:
-            icon_label.config(image='')
+                logger.error("Error loading image %s: %s", image_path, e)
+                icon_label.config(image='')
+                icon_label.image = None
+            del self.icon_requests[spell_index]
+
+        if self.icon_requests:
+            self.icon_poll_scheduled = True
+            self.spells_frame.after(10, self.process_icon_results)
 
     def get_selected_spells(self):
         """
@@ -130,9 +220,16 @@ class SpellsTab:
         
         The list is empty if no spells are selected.
         """
-
+        if self.selected_spells is None:
+            self.selected_spells = sorted(self.spell_ids.items(), key=lambda spell: int(spell[0].split(':', 1)[0]))
         return self.selected_spells
 
+    def get_spell_ids(self):
+        """
+        Returns the dictionary mapping the label of every selected spell to its spell id.
+        """
+        return self.spell_ids
+
     def get_spells_data(self):
         """
         Returns a list of dictionaries containing the data for all selected spells.
@@ -140,14 +237,7 @@ class SpellsTab:
         Each dictionary contains the key, id, and name of a selected spell.
         """
 
-        spells_data = []
-        for spell_entry, spell_id_entry, spell_var, _, _ in self.spell_entries:
-            spells_data.append({
-                'spell_entry': spell_entry.get(),
-                'spell_id_entry': spell_id_entry.get(),
-                'spell_var': spell_var.get(),
-            })
-        return spells_data
+        return [slot.to_dict() for slot in self.spell_slots]
 
     def set_spells_data(self, data):
         """
@@ -163,36 +253,36 @@ class SpellsTab:
         The function also updates the spell icons by calling update_spell_icon for
         each spell entry.
 
-        The function prints debug messages to the console to indicate the values of
-        the spell entries, spell ID entries, and spell dropdowns after setting the
-        data.
+        Slots that already hold the given data are skipped, so reloading a
+        similar config only touches the slots that differ. Details of each
+        changed slot are logged at DEBUG level. Geometry updates are left to the Tk event loop, so loading a config does
+        not force a redraw of the tab.
 
         :param data: A list of dictionaries containing the key, id, and name of all
             selected spells.
         :type data: list[dict[str, str]]
         """
-        print("Setting spells data:", data)  # Debug print
-        print(f"Number of spell entries: {len(self.spell_entries)}")  # Debug print
         for i, spell_data in enumerate(data):
-            print(f"Processing spell data {i}: {spell_data}")  # Debug print
             if i >= len(self.spell_entries):
-                print(f"Warning: More spell data than entries. Skipping data for index {i}")
+                logger.warning("More spell data than entries. Skipping data from index %d", i)
                 break
             spell_entry, spell_id_entry, spell_var, icon_label, spell_dropdown = self.spell_entries[i]
+            slot = self.spell_slots[i]
+            if (slot.key_id, slot.spell_id, slot.spell_name) == (
+                    spell_data.get('spell_entry', ''), spell_data.get('spell_id_entry', ''), spell_data.get('spell_var', '')):
+                continue
+
+            self.update_slot(i + 1, key_id=spell_data.get('spell_entry', ''), spell_id=spell_data.get('spell_id_entry', ''))
+            slot = self.spell_slots[i]
 
             spell_entry.delete(0, tk.END)
-            spell_entry.insert(0, spell_data.get('spell_entry', ''))
-            print(f"Set spell entry {i} to: {spell_entry.get()}")  # Debug print
+            spell_entry.insert(0, slot.key_id)
 
             spell_id_entry.delete(0, tk.END)
-            spell_id_entry.insert(0, spell_data.get('spell_id_entry', ''))
-            print(f"Set spell ID entry {i} to: {spell_id_entry.get()}")  # Debug print
+            spell_id_entry.insert(0, slot.spell_id)
 
             spell_var.set(spell_data.get('spell_var', ''))
             spell_dropdown.set(spell_data.get('spell_var', ''))  # Update the dropdown
-            print(f"Set spell dropdown {i} to: {spell_dropdown.get()}")  # Debug print
 
+            logger.debug("Set spell slot %d: key %s, id %s, spell %s", i + 1, slot.key_id, slot.spell_id, slot.spell_name)
             self.update_spell_icon(None, i+1)
-
-        print("Finished setting spells data")  # Debug print
-        self.spells_frame.update()  # Force update of the frame
\ No newline at end of file
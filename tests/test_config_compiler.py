@@ -0,0 +1,28 @@
+from command_templates import command_templates
+from command_types import command_types
+from config_compiler import compile_file, main
+from config_format import read_rotation, write_rotation
+from rotation_model import Command, Key, Makro, Parameter, Rotation, render_config
+
+
+def sample_rotation():
+    return Rotation([Makro([Key([Command('Press Key', [Parameter('spell number', 'Value', '1')])])])], {'mode': '1'}, [])
+
+
+def test_compile_file_matches_the_gui_output(tmp_path):
+    config = str(tmp_path / 'config.json')
+    output = str(tmp_path / 'rotation_config.txt')
+    write_rotation(config, sample_rotation())
+    _, _, _, warnings = compile_file(config, output)
+    assert warnings == []
+    with open(output) as f:
+        assert f.read() == render_config(read_rotation(config, command_types), command_templates)
+
+
+def test_batch_mode_reports_failures(tmp_path):
+    write_rotation(str(tmp_path / 'good.json'), sample_rotation())
+    (tmp_path / 'bad.json').write_text('not json')
+    out = tmp_path / 'out'
+    assert main([str(tmp_path), '--output-dir', str(out)]) == 1
+    assert (out / 'good_rotation_config.txt').exists()
+    assert not (out / 'bad_rotation_config.txt').exists()
@@ -0,0 +1,73 @@
+import json
+import pytest
+from command_types import command_types
+from config_format import (SCHEMA_VERSION, dumps_rotation, load_data, loads, migrate, read_rotation, read_summary,
+                           schema_version, write_rotation)
+from rotation_model import Command, Key, Makro, Parameter, Rotation, SpellSlot
+
+VERSION_1 = {
+    'MAKRO': [{'Keys': [
+        {'commands': [
+            {'command_type': 'Check Hotbar Slot', 'parameters': [
+                {'type': 'Value', 'value': '1'}, {'type': 'Var', 'value': 'delay'},
+            ]},
+            {'command_type': 'Press Key', 'parameters': ['1']},  # Plain strings, as very old releases wrote
+        ]},
+        {'commands': []},
+    ]}],
+    'variables': {'delay': '500'},
+    'spells': [{'spell_entry': '49', 'spell_id_entry': 'spellId1', 'spell_var': 'Fireball'},
+               {'spell_entry': '', 'spell_id_entry': '', 'spell_var': ''}],
+}
+
+
+def sample_rotation():
+    return Rotation(
+        [Makro([Key([Command('Check Hotbar Slot', [Parameter('hotbar slot', 'Value', '1'),
+                                                   Parameter('timer', 'Var', 'delay')]),
+                     Command('Press Key', [Parameter('spell number', 'Value', '1')])]),
+                Key([])])],
+        {'delay': '500'},
+        [SpellSlot('49', 'spellId1', 'Fireball'), SpellSlot()],
+    )
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / 'config.json')
+    rotation = sample_rotation()
+    write_rotation(path, rotation)
+    assert read_rotation(path, command_types).to_dict() == rotation.to_dict()
+
+
+def test_read_summary(tmp_path):
+    path = tmp_path / 'config.json'
+    write_rotation(str(path), sample_rotation())
+    summary = read_summary(str(path))
+    assert {name: value for name, value in summary.items() if name != 'hash'} == {
+        'makros': 1, 'keys': 2, 'commands': 2, 'spells': ['Fireball'], 'variables': ['delay'],
+    }
+    # The hash only depends on the content
+    other = tmp_path / 'other.json'
+    write_rotation(str(other), sample_rotation())
+    assert read_summary(str(other))['hash'] == summary['hash']
+
+
+def test_read_summary_of_older_files(tmp_path):
+    path = tmp_path / 'config.json'
+    path.write_text(json.dumps(VERSION_1))
+    assert read_summary(str(path)) is None
+
+
+def test_migrate_version_1():
+    assert schema_version(VERSION_1) == 1
+    data = migrate(json.loads(json.dumps(VERSION_1)), command_types)
+    assert data['version'] == SCHEMA_VERSION
+    rotation = load_data(data, command_types)
+    assert rotation.to_dict() == sample_rotation().to_dict()
+    # Migrated data is read back unchanged
+    assert load_data(loads(dumps_rotation(rotation)), command_types).to_dict() == rotation.to_dict()
+
+
+def test_newer_versions_are_rejected():
+    with pytest.raises(ValueError):
+        schema_version({'format': 'rotation-config', 'version': SCHEMA_VERSION + 1})
@@ -0,0 +1,182 @@
+import zlib
+from command_templates import command_templates
+from command_types import command_types
+from config_optimizer import peephole, reorder_conditions
+from rotation_interpreter import CONDITION_OPCODES, Interpreter, MockGameState, parse_config
+from rotation_model import Command, Key, Makro, Rotation, render_config
+
+
+def command(command_type, *values):
+    result = Command()
+    result.set_command_type(command_type, command_types)
+    for parameter, value in zip(result.parameters, values):
+        parameter.value = value
+    return result
+
+
+def rotation(*keys, variables=None):
+    return Rotation([Makro([Key(list(commands)) for commands in keys])], dict(variables or {}), [])
+
+
+def render(rotation):
+    return render_config(rotation, command_templates, on_error=lambda command, e: None)
+
+
+def key_lines(rotation):
+    return [line for line in render(rotation).splitlines() if line.startswith('keys')]
+
+
+def run(rotation, ticks=200):
+    """
+    Runs a rotation in the interpreter and returns everything it did.
+
+    Game conditions are answered by a hash of the opcode, arguments and tick,
+    so runs of the same config make the same choices whatever the order in
+    which the conditions are checked.
+    """
+    tick = [0]
+    conditions = {
+        opcode: (lambda arguments, opcode=opcode: zlib.crc32(f"{opcode}{arguments}{tick[0]}".encode()) % 3 != 0)
+        for opcode in CONDITION_OPCODES
+    }
+    state = MockGameState(conditions, seed=1)
+    interpreter = Interpreter(parse_config(render(rotation)), state)
+    for tick[0] in range(ticks):
+        interpreter.tick()
+    return state.key_presses, state.actions, state.now, state.held_keys, interpreter.variables
+
+
+def test_peephole_drops_commands_without_effect():
+    original = rotation(
+        [command('No Operation'), command('Sleep', '10'), command('Sleep', '20'), command('Press Key', '1')],
+        [command('Store Variable', 'x', '1'), command('Store Variable', 'x', '2'), command('Press Key', '2')],
+        [command('Go To', '5'), command('Press Key', '3')],
+    )
+    optimized, explanations = peephole(original)
+    assert key_lines(optimized) == [
+        'keys=s30| spell1d',
+        'keys2=store % x,2| spell2d',
+        'keys3=gt5',
+    ]
+    assert len(explanations) == 3
+    assert len(original.makros[0].keys[0].commands) == 4  # The model is not changed
+
+
+def test_peephole_keeps_store_read_by_the_next_one():
+    original = rotation([command('Store Variable', 'x', '1'), command('Store Variable', 'x', '(VAR % x)')])
+    optimized, explanations = peephole(original)
+    assert len(optimized.makros[0].keys[0].commands) == 2
+    assert explanations == []
+
+
+def test_peephole_removes_unreachable_keys_and_renumbers_jumps():
+    original = rotation(
+        [command('Press Key', '1'), command('Go To', '3')],
+        [command('Press Key', '2')],
+        [command('Health Percentage', '0.5'), command('Go To', '5')],
+        [command('Press Key', '4')],
+        [command('Press Key', '5')],
+    )
+    optimized, explanations = peephole(original)
+    assert key_lines(optimized) == [
+        'keys= spell1d|gt2',
+        'keys2=hp0.5|gt4',
+        'keys3= spell4d',
+        'keys4= spell5d',
+    ]
+    assert explanations == ["Makro 1: removed unreachable key(s) 2 and renumbered the Go To targets"]
+    assert run(optimized) == run(original)
+
+
+def test_peephole_treats_opaque_commands_as_conditions():
+    # A custom "kd87" only jumps while the key is held, so key 2 is reachable
+    for opaque in (command('Custom Command', 'kd87'), command('Retrieve Variable', 'check'),
+                   command('Call Function', 'check'), Command('Unknown Type')):
+        original = rotation([opaque, command('Go To', '3')], [command('Press Key', '2')], [command('Press Key', '3')])
+        optimized, explanations = peephole(original)
+        assert len(optimized.makros[0].keys) == 3
+        assert explanations == []
+
+
+def test_peephole_keeps_keys_reachable_through_variables():
+    # jumpTo3 holds a Go To, so key 3 is reached although no literal Go To targets it
+    original = rotation(
+        [command('Check Timer', 'x'), command('Retrieve Variable', 'jumpTo3')],
+        [command('Go To', '4')],
+        [command('Sleep', '111')],
+        [command('Sleep', '222')],
+        variables={'jumpTo3': 'gt3'},
+    )
+    optimized, explanations = peephole(original)
+    assert key_lines(optimized) == key_lines(original)
+    assert run(optimized, ticks=1) == run(original, ticks=1)
+    assert run(optimized, ticks=1)[2] == 333
+
+    # A variable holding a Go To may be run by any command naming it, e.g. Check Range
+    original = rotation(
+        [command('Check Range', 'jumpTo3'), command('Go To', '4')],
+        [command('Go To', '4')],
+        [command('Sleep', '111')],
+        [command('Sleep', '222')],
+        variables={'jumpTo3': 'gt3'},
+    )
+    optimized, explanations = peephole(original)
+    assert len(optimized.makros[0].keys) == 4
+    assert run(optimized) == run(original)
+
+
+def test_peephole_does_not_change_behavior():
+    original = rotation(
+        [command('Check Hotbar Slot', '1', '500'), command('No Operation'), command('Press Key', '1'),
+         command('Sleep', '100'), command('Sleep', '50'), command('Go To', '4'), command('Press Key', '9')],
+        [command('Key Down Conditional', '87'), command('Go To', '4')],
+        [command('Store Variable', 'count', '1'), command('Store Variable', 'count', '2'), command('Press Key', '3')],
+        [command('Target'), command('Go To', '6')],
+        [command('Press Key', '5')],
+        [command('Health Percentage', '0.4'), command('Store Variable', 'low', '1'),
+         command('Store Variable', 'low', '(VAR % count)'), command('Press Key', '6')],
+    )
+    optimized, explanations = peephole(original)
+    assert explanations
+    assert len(optimized.makros[0].keys) == 5
+    assert run(optimized) == run(original)
+
+
+def test_reorder_conditions_puts_cheap_checks_first():
+    original = rotation([command('Check Entity by Name', 'Goblin', '100', '50'), command('Health Percentage', '0.5'),
+                         command('Press Key', '1')])
+    optimized, explanations = reorder_conditions(original)
+    assert key_lines(optimized) == ['keys=hp0.5|cne % Goblin,100,50| spell1d']
+    assert len(explanations) == 1
+    assert key_lines(original) == ['keys=cne % Goblin,100,50|hp0.5| spell1d']  # The model is not changed
+
+
+def test_reorder_conditions_uses_pass_rates():
+    original = rotation([command('Health Percentage', '0.5'), command('Target Distance', '100'),
+                         command('Press Key', '1')])
+    assert reorder_conditions(original)[1] == []
+    optimized, explanations = reorder_conditions(original, pass_rates={(1, 1, 1): 0.99, (1, 1, 2): 0.1})
+    assert key_lines(optimized) == ['keys=td100|hp0.5| spell1d']
+
+
+def test_reorder_conditions_keeps_barriers_and_impure_conditions():
+    original = rotation([command('Get Pixel Color', '1', '2', '3', '0'), command('Store Variable', 'x', '1'),
+                         command('Health Percentage', '0.5'), command('Wait for Hotbar Slot', '1', '500'),
+                         command('Weapon Number', '1')])
+    optimized, explanations = reorder_conditions(original)
+    assert explanations == []
+    assert optimized.makros[0].keys[0] is original.makros[0].keys[0]
+
+
+def test_reorder_conditions_does_not_change_behavior():
+    original = rotation(
+        [command('Check Nearby Mobs', '3', '100', '50', ''), command('Check Hotbar Slot', '1', '500'),
+         command('Equal To', 'mode', '1'), command('Press Key', '1'), command('Store Variable', 'mode', '2')],
+        [command('Get Pixel Color', '1', '2', '3', '0'), command('Not Equal To', 'mode', '1'),
+         command('Health Percentage', '0.3'), command('Press Key', '2'), command('Store Variable', 'mode', '1')],
+        [command('If Being Targeted', '1', '100'), command('Target Distance', '50'), command('Target')],
+        variables={'mode': '1'},
+    )
+    optimized, explanations = reorder_conditions(original)
+    assert len(explanations) == 3
+    assert run(optimized) == run(original)
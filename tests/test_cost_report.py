@@ -0,0 +1,28 @@
+import pytest
+from command_types import command_types
+from cost_report import key_cost, makro_cost
+from rotation_model import Command, Key, Makro
+
+
+def command(command_type, *values):
+    result = Command()
+    result.set_command_type(command_type, command_types)
+    for parameter, value in zip(result.parameters, values):
+        parameter.value = value
+    return result
+
+
+def test_key_cost():
+    key = Key([command('Get Pixel Color', '1', '2', '3', '0'), command('Health Percentage', '0.5'),
+               command('Press Key', '1'), command('Go To', '3'), command('Press Key', '2')])
+    cost = key_cost(key, pass_rate=0.5)
+    assert (cost.worst_conditions, cost.worst_cost) == (2, 104)  # The command after the Go To is not counted
+    assert cost.expected_cost == pytest.approx(100 + 0.5 * 2 + 0.25 * 2)
+    assert (cost.jump, cost.jump_chance) == (3, 0.25)
+    assert cost.ordering == [(1, 2)]
+
+
+def test_makro_cost_follows_forward_jumps():
+    makro = Makro([Key([command('Go To', '3')]), Key([command('Press Key', '1')]), Key([command('Press Key', '2')])])
+    _, reach = makro_cost(makro)
+    assert reach == [1.0, 0.0, 1.0]
@@ -0,0 +1,70 @@
+from command_types import command_types
+from edit_journal import EditJournal
+from rotation_model import Command, Key, Makro, Parameter, Rotation, SpellSlot
+
+
+def command(command_type, *values):
+    result = Command()
+    result.set_command_type(command_type, command_types)
+    for parameter, value in zip(result.parameters, values):
+        parameter.value = value
+    return result
+
+
+def journal(tmp_path, rotation):
+    return EditJournal(rotation.makros.index, command_types, snapshot_path=str(tmp_path / 'config_data.json'),
+                       journal_path=str(tmp_path / 'config_data.journal'))
+
+
+def test_replay_matches_live_rotation(tmp_path):
+    rotation = Rotation([Makro([Key([command('Press Key', '1')])])], {'mode': '1', 'delay': '500'}, [SpellSlot()])
+    live = journal(tmp_path, rotation)
+    live.compact(rotation)
+
+    # Edit the rotation as the tabs do, recording each edit
+    makro = rotation.makros[0]
+    checked = command('Check Hotbar Slot', '1', '')
+    checked.parameters[1] = Parameter(checked.parameters[1].name, 'Var', 'delay')
+    makro.keys[0].commands.append(checked)
+    live.command_added(makro, 0, checked)
+    makro.keys[0].commands[0].parameters[0].value = '2'
+    live.command_changed(makro, 0, makro.keys[0].commands[0])
+    key = Key([command('Equal To', 'mode', '1'), command('Sleep', '100')])
+    makro.keys.append(key)
+    live.key_added(makro, key)
+    key.commands.pop(1)
+    live.command_removed(makro, 1, 1)
+    added = Makro([Key([command('Go To', '1')])])
+    rotation.makros.append(added)
+    live.makro_added(added)
+    rotation.variables['range'] = 'cnm1,100'
+    live.variable_set('range', 'cnm1,100')
+    # Removing a variable also clears the selections using it, without journal entries
+    del rotation.variables['delay']
+    live.variable_removed('delay')
+    for edited in rotation.makros:
+        for edited_key in edited.keys:
+            edited_key.clear_missing_variables(rotation.variables)
+    rotation.spells[0] = SpellSlot('49', 'spellId1', 'Fireball')
+    live.spell_slot_changed(1, rotation.spells[0])
+    rotation.makros[1].keys.pop()
+    live.key_removed(rotation.makros[1])
+    assert live.flush() == 9
+    live.file.close()  # Simulates a crash: the journal is not compacted
+
+    recovered = journal(tmp_path, Rotation()).load()
+    assert recovered.to_dict() == rotation.to_dict()
+    assert checked.parameters[1].value == ''
+
+
+def test_stale_journal_is_ignored(tmp_path):
+    rotation = Rotation([Makro([Key([command('Press Key', '1')])])], {}, [])
+    live = journal(tmp_path, rotation)
+    live.compact(rotation)
+    live.variable_set('mode', '1')
+    live.flush()
+    live.file.close()
+    (tmp_path / 'config_data.json').write_bytes((tmp_path / 'config_data.json').read_bytes() + b' ')
+
+    recovered = journal(tmp_path, Rotation()).load()
+    assert recovered.variables == {}
@@ -0,0 +1,78 @@
+import io
+from collections import Counter
+import pytest
+from command_templates import command_templates
+from command_types import command_types
+from log_profile import Profile, instrument, read_logs, scan_log
+from rotation_interpreter import Interpreter, MockGameState, parse_config
+from rotation_model import Command, Key, Makro, Rotation, render_config
+
+
+def command(command_type, *values):
+    result = Command()
+    result.set_command_type(command_type, command_types)
+    for parameter, value in zip(result.parameters, values):
+        parameter.value = value
+    return result
+
+
+def sample_rotation():
+    return Rotation([Makro([
+        Key([command('Health Percentage', '0.5'), command('Check Hotbar Slot', '1', '500'), command('Press Key', '1'),
+             command('Go To', '3')]),
+        Key([command('Press Key', '2')]),
+        Key([command('Mana Percentage', '0.3'), command('Press Key', '3')]),
+    ])], {}, [])
+
+
+LOG = b''.join(f"12:00:{i:02} [dbg] prof:1.{i % 4}.{i % 3}\n".encode() for i in range(199))
+
+
+@pytest.mark.parametrize('block_size', [1, 3, 7, 16, 100, 1 << 20])
+def test_scan_log_counts_probes_across_blocks(block_size):
+    expected = Counter((1, i % 4, i % 3) for i in range(199))
+    counts = Counter()
+    scan_log(io.BytesIO(LOG), counts, block_size)
+    assert counts == expected
+
+    # Logs without newlines keep bounded memory and still count every probe
+    counts = Counter()
+    scan_log(io.BytesIO(LOG.replace(b'\n', b' ')), counts, block_size)
+    assert counts == expected
+
+
+def test_read_logs_adds_up_files(tmp_path):
+    for name in ('a.log', 'b.log'):
+        (tmp_path / name).write_bytes(b"prof:1.2.0\nnoise\nprof:1.2.1")
+    assert read_logs([str(tmp_path / 'a.log'), str(tmp_path / 'b.log')]) == {(1, 2, 0): 2, (1, 2, 1): 2}
+
+
+def test_instrument_keeps_key_numbers():
+    rotation = sample_rotation()
+    instrumented = instrument(rotation)
+    lines = [line for line in render_config(instrumented, command_templates).splitlines() if line.startswith('keys')]
+    assert lines == [
+        'keys=dbg % prof:1.1.0|hp0.5|dbg % prof:1.1.1|ch1,500|dbg % prof:1.1.2| spell1d|gt3',
+        'keys2=dbg % prof:1.2.0| spell2d',
+        'keys3=dbg % prof:1.3.0|mp0.3|dbg % prof:1.3.1| spell3d',
+    ]
+    assert len(rotation.makros[0].keys[0].commands) == 4  # The model is not changed
+
+
+def test_profile_of_an_interpreter_run():
+    rotation = sample_rotation()
+    program = parse_config(render_config(instrument(rotation), command_templates))
+    answers = iter([True, False, True] * 100)
+    state = MockGameState({'hp': lambda arguments: next(answers), 'ch': True, 'mp': False}, debug_history=10000)
+    Interpreter(program, state).run(100)
+    counts = Counter()
+    scan_log(io.BytesIO(''.join(message + '\n' for message in state.debug_messages).encode()), counts)
+
+    profile = Profile(rotation, counts)
+    assert profile.evaluated(1, 1) == 100
+    assert profile.fired(1, 1) == 67  # hp passes 2 times out of 3
+    assert profile.evaluated(1, 2) == 33  # Key 1 jumps over key 2 when it fires
+    assert profile.fired(1, 3) == 0
+    assert profile.pass_rates() == pytest.approx({(1, 1, 1): 0.67, (1, 1, 2): 1.0, (1, 3, 1): 0.0})
+    report = profile.report()
+    assert '  Makro 1, key 3: reached but never fired' in report
@@ -0,0 +1,68 @@
+import pytest
+from rotation_interpreter import Interpreter, MockGameState, parse_config
+
+CONFIG = """\
+[variables]
+spell1=49
+spell2=50
+inRange=cnm1,100
+mode=1
+
+[Makro 1]
+keys=ch1,500| spell1d|store % mode,2
+keys2=eq % mode,2|gt4
+keys3= spell2d
+keys4=inRange|(VAR % spell1)u|s100
+repeat=1
+endkeys=dbg % stopped
+"""
+
+
+def test_parse_config():
+    program = parse_config(CONFIG)
+    assert program.variables['spell1'] == '49'
+    assert [key_number for key_number, _ in program.makros[1]] == [1, 2, 3, 4]
+    assert program.makros[1][0][1] == ['ch1,500', ' spell1d', 'store % mode,2']
+    assert program.repeat
+    assert program.endkeys == ['dbg % stopped']
+
+
+def test_parse_config_rejects_unknown_lines():
+    with pytest.raises(ValueError):
+        parse_config("[variables]\nnot a setting\n")
+
+
+def test_tick_follows_conditions_and_jumps():
+    state = MockGameState({'ch': True, 'cnm': False})
+    interpreter = Interpreter(parse_config(CONFIG), state)
+    interpreter.tick()
+    # Key 2 jumps over key 3, and the variable condition of key 4 fails
+    assert state.key_presses == {'49': 1}
+    assert interpreter.variables['mode'] == '2'
+    assert state.now == 0
+
+    state.conditions['cnm'] = True
+    interpreter.tick()
+    assert state.held_keys == set()  # Released through (VAR % spell1)
+    assert state.now == 100
+
+
+def test_step_traces_each_command():
+    interpreter = Interpreter(parse_config(CONFIG), MockGameState({'ch': False}))
+    entry = interpreter.step()
+    assert (entry.key, entry.command, entry.result) == (1, 1, False)
+    entry = interpreter.step()
+    assert (entry.key, entry.text, entry.result) == (2, 'eq % mode,2', False)
+
+
+def test_endless_loop_is_reported():
+    program = parse_config("[Makro 1]\nkeys=gt2\nkeys2=gt1\n")
+    with pytest.raises(RuntimeError):
+        Interpreter(program).tick()
+
+
+def test_stop_runs_endkeys():
+    state = MockGameState()
+    interpreter = Interpreter(parse_config(CONFIG), state)
+    interpreter.stop()
+    assert list(state.debug_messages) == ['stopped']
@@ -0,0 +1,74 @@
+from command_types import command_types
+from edit_journal import EditJournal
+from rotation_linter import RotationLinter, SnapshotCache, snapshot
+from rotation_model import Command, Key, Makro, Rotation
+
+
+def command(command_type, *values):
+    result = Command()
+    result.set_command_type(command_type, command_types)
+    for parameter, value in zip(result.parameters, values):
+        parameter.value = value
+    return result
+
+
+def messages(rotation):
+    return [str(problem) for problem in RotationLinter().lint(rotation)]
+
+
+def test_jump_targets_and_undefined_variables():
+    rotation = Rotation([Makro([Key([command('Go To', '3')]), Key([command('Debug Message', '(VAR % missing)')])])],
+                        {}, [])
+    assert messages(rotation) == [
+        "Makro 1, key 1, command 1: jumps to key 3, but the makro has 2 key(s)",
+        "Makro 1, key 2, command 1: refers to undefined variable 'missing'",
+    ]
+
+
+def test_commands_of_broken_command_types():
+    rotation = Rotation([Makro([Key([command('Release Key', '87'), command('Get Pixel Color', '1', '2', '3', '0'),
+                                     command('Press Key', '1')])])], {}, [])
+    assert messages(rotation) == [
+        "Makro 1, key 1, command 1: 'Release Key': format '[key code]u' has 0 placeholder(s) but 1 param(s)",
+        "Makro 1, key 1, command 2: 'Get Pixel Color': placeholders 2 and 3 of format 'gp{},{}{},{}' "
+        "have no separator between them",
+    ]
+
+
+def test_snapshot_cache_only_reads_changed_keys(tmp_path, monkeypatch):
+    rotation = Rotation([Makro([Key([command('Press Key', str(i))]) for i in range(1, 6)]),
+                         Makro([Key([command('Sleep', '10')])])], {'mode': '1'}, [])
+    journal = EditJournal(rotation.makros.index, command_types, snapshot_path=str(tmp_path / 'config_data.json'),
+                          journal_path=str(tmp_path / 'config_data.journal'))
+    snapshots = SnapshotCache()
+    journal.add_key_listener(snapshots.key_changed)
+    assert snapshots.snapshot(rotation) == snapshot(rotation)
+
+    read = []
+    signature = Key.signature
+    monkeypatch.setattr(Key, 'signature', lambda key: read.append(key) or signature(key))
+
+    makro = rotation.makros[0]
+    makro.keys[2].commands[0].parameters[0].value = '9'
+    journal.command_changed(makro, 2, makro.keys[2].commands[0])
+    cached = snapshots.snapshot(rotation)
+    assert read == [makro.keys[2]]
+    assert cached == snapshot(rotation)
+
+    read.clear()
+    makro.keys.append(Key([command('Press Key', '6')]))
+    journal.key_added(makro, makro.keys[-1])
+    makro.keys[0].commands.append(command('Sleep', '5'))
+    journal.command_added(makro, 0, makro.keys[0].commands[-1])
+    rotation.makros[1].keys.pop()
+    journal.key_removed(rotation.makros[1])
+    cached = snapshots.snapshot(rotation)
+    assert read == [makro.keys[0], makro.keys[-1]]
+    assert cached == snapshot(rotation)
+
+    read.clear()
+    assert snapshots.snapshot(rotation) == cached
+    assert read == []
+    snapshots.invalidate()
+    assert snapshots.snapshot(rotation) == cached
+    assert len(read) == 6
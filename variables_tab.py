@@ -1,8 +1,76 @@
 import tkinter as tk
 from tkinter import ttk
+from rotation_model import format_variables_config
+
+
+class VariableNames:
+    __slots__ = ('names', 'version', '_values', '_values_version')
+
+    def __init__(self, names=()):
+        """
+        Shared, versioned list of variable names.
+
+        One instance is shared by every command editor. Changing it only bumps
+        the version; comboboxes compare the version when their dropdown opens
+        and copy the names then, so adding a variable costs O(1) no matter
+        how many commands the rotation has.
+
+        Parameters
+        ----------
+        names : iterable of str
+            The initial variable names.
+        """
+        self.names = dict.fromkeys(names)  # Insertion ordered set
+        self.version = 0
+        self._values = None
+        self._values_version = None
+
+    def __contains__(self, name):
+        return name in self.names
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, name):
+        """
+        Adds a name. Does nothing if the name already exists.
+        """
+        if name not in self.names:
+            self.names[name] = None
+            self.version += 1
+
+    def remove(self, name):
+        """
+        Removes a name. Does nothing if the name does not exist.
+        """
+        if name in self.names:
+            del self.names[name]
+            self.version += 1
+
+    def replace(self, names):
+        """
+        Replaces all names, e.g. when a config is loaded.
+        """
+        self.names = dict.fromkeys(names)
+        self.version += 1
+
+    def values(self):
+        """
+        Returns the names as a list, built at most once per version.
+
+        The returned list is shared and must not be modified.
+        """
+        if self._values_version != self.version:
+            self._values = list(self.names)
+            self._values_version = self.version
+        return self._values
+
 
 class VariablesTab:
-    def __init__(self, notebook):
+    def __init__(self, notebook, journal=None):
         """
         Initialize the VariablesTab class.
 
@@ -10,13 +78,17 @@ class VariablesTab:
         ----------
         notebook : ttk.Notebook
             The parent notebook.
+        journal : EditJournal, optional
+            Records added, changed and removed variables for autosave.
 
         """
         self.variables_frame = ttk.Frame(notebook)
         notebook.add(self.variables_frame, text="Variables")
 
         self.variables = {}
+        self.variable_names = VariableNames()  # Shared with the command editors
         self.variable_change_callbacks = []
+        self.journal = journal
         self.create_widgets()
 
     def create_widgets(self):
@@ -94,8 +166,9 @@ class VariablesTab:
         in the Treeview widget. If the variable name does not exist, this function creates a new item in the Treeview
         widget.
 
-        Finally, this function clears the entry widgets and notifies any registered callbacks that the variables have
-        changed.
+        Finally, this function clears the entry widgets and adds the name to the shared variable_names list. No
+        callbacks are notified: adding a variable cannot invalidate a selection, and comboboxes pick up the new name
+        when their dropdown is opened.
 
         Parameters
         ----------
@@ -115,7 +188,9 @@ class VariablesTab:
                 self.tree.insert('', 'end', iid=var_name, values=(var_name, var_value))
             self.var_name_entry.delete(0, tk.END)
             self.var_value_entry.delete(0, tk.END)
-            self.notify_variable_change()
+            self.variable_names.add(var_name)
+            if self.journal is not None:
+                self.journal.variable_set(var_name, var_value)
 
     def remove_variable(self):
         """
@@ -137,6 +212,9 @@ class VariablesTab:
         if selected_item:
             var_name = self.tree.item(selected_item)['values'][0]
             del self.variables[var_name]
+            self.variable_names.remove(var_name)
+            if self.journal is not None:
+                self.journal.variable_removed(var_name)
             self.tree.delete(selected_item)
             self.notify_variable_change()
 
@@ -156,7 +234,7 @@ class VariablesTab:
         str
             The current variable configuration as a string.
         """
-        return "\n".join(f"{var}={value}" for var, value in self.variables.items() if value)
+        return format_variables_config(self.variables)
 
     def get_variable_names(self):
         """
@@ -175,14 +253,15 @@ class VariablesTab:
 
     def add_variable_change_callback(self, callback):
         """
-        Adds a callback function to the list of functions to call when the variables change.
+        Adds a callback function to the list of functions to call when variables are removed or replaced.
 
-        When the variables change, this callback will be called with a list of variable names as the argument.
+        The callback is called with the shared VariableNames as the argument. Added variables are not notified, they
+        only update the shared variable_names list.
 
         Parameters
         ----------
         callback : function
-            A function that takes a list of variable names as an argument.
+            A function that takes the shared VariableNames as an argument.
 
         Returns
         -------
@@ -194,7 +273,7 @@ class VariablesTab:
         """
         Notifies all registered callbacks that the variables have changed.
 
-        Calls each registered callback function with a list of variable names as the argument.
+        Calls each registered callback function with the shared VariableNames as the argument.
 
         Parameters
         ----------
@@ -205,7 +284,7 @@ class VariablesTab:
         None
         """
         for callback in self.variable_change_callbacks:
-            callback(self.get_variable_names())
+            callback(self.variable_names)
 
     def get_variables_data(self):
         """
@@ -226,7 +305,9 @@ class VariablesTab:
         """
         Sets the variables dictionary to the given data and updates the Treeview widget.
 
-        Clears the Treeview widget and populates it with the given data.
+        When the variable names are the same as before, in the same order, only the Treeview items of changed
+        values are updated and no callbacks are notified. Otherwise the Treeview widget is cleared and populated
+        with the given data.
 
         Parameters
         ----------
@@ -237,7 +318,15 @@ class VariablesTab:
         -------
         None
         """
+        if list(data) == list(self.variables):
+            for var_name, var_value in data.items():
+                if self.variables[var_name] != var_value:
+                    self.variables[var_name] = var_value
+                    self.tree.item(var_name, values=(var_name, var_value))
+            return
+
         self.variables = data.copy()
+        self.variable_names.replace(self.variables)
         # Clear the treeview
         for item in self.tree.get_children():
             self.tree.delete(item)
@@ -245,4 +334,4 @@ class VariablesTab:
         for var_name, var_value in self.variables.items():
             self.tree.insert('', 'end', iid=var_name, values=(var_name, var_value))
         self.notify_variable_change()
-        
\ No newline at end of file
+